@@ -8,64 +8,166 @@ Pure functions using list comprehensions, max(), next() for:
 - Listing habits (all/ filtered by periodicity))
 - Streak computations (all/ single habit)
 
-Expects list of Habit objects.
+Expects list of Habit objects or a HabitManager, whose indexes (by ID/ period) are then used for lookups.
+*_cached variants memoize results per HabitManager version (O(1) on unchanged data).
+Time-window analytics (completion rate, per-week/ month counts) are aggregated inside SQLite
+and read stored completions only, no completion history is loaded.
+Alternatively they run with NumPy over a memory-mapped completion archive (archive=, see archive.py).
 ----------------
 """
 
+import functools
+from datetime import date
+from instrumentation import timed
+
+def _habit_list(habits):
+    """Returns plain list of habits from list or HabitManager."""
+    return habits.habits if hasattr(habits, "get_habits_by_period") else habits
+
+@timed("analysis.list_all_habits")
 def list_all_habits(habits):
     """
     Lists all stored habit names using list comprehension.
 
     Args:
-        habits (list [Habit]):  List of Habit objects
+        habits (list [Habit]):  List of Habit objects or HabitManager
 
     Returns:
         list [str]:             List of habit names
     """
-    return [h.name for h in habits]
+    return [h.name for h in _habit_list(habits)]
 
+@timed("analysis.list_habit_by_period")
 def list_habit_by_period(habits, period):
     """
     List habit names filtered by periodicity using list comprehension.
 
     Args:
-        habits (list [Habit]):  List of Habit objects
+        habits (list [Habit]):  List of Habit objects or HabitManager (period index)
         period (str):           'daily' or 'weekly'
 
     Returns:
         list [str]:             List of matching habit names
     """
+    if hasattr(habits, "get_habits_by_period"):
+        return [h.name for h in habits.get_habits_by_period(period)]
     return [h.name for h in habits if h.period == period]
 
+@timed("analysis.longest_streak_of_all")
 def longest_streak_of_all(habits):
     """
     Find habit with longest historical streak across all habits.
 
     Args:
-        habits (list [Habit]):  List of Habit objects.
+        habits (list [Habit]):  List of Habit objects or HabitManager.
 
     Returns:
         list [str, int]:        [habit_name, streak] of maximum or
                                 None if empty.
     """
+    habits = _habit_list(habits)
     if not habits:
         return None
     habit = max(habits, key=lambda h: h.longest_streak)
     return [habit.name, habit.longest_streak]
 
+@timed("analysis.longest_streak_one")
 def longest_streak_one(habits, habit_id):
     """
     Get longest historical streak for a single habit by ID.
 
     Args:
-        habits (list [Habit]):  List of Habit objects
+        habits (list [Habit]):  List of Habit objects or HabitManager (ID index)
         habit_id (str):         Unique habit ID
 
     Returns:
         list [str, int]:        [habit_name, streak] or
                                 None if not found
     """
-    habit = next((h for h in habits if h.habit_id == habit_id), None)
+    if hasattr(habits, "get_habit"):
+        habit = habits.get_habit(habit_id)
+    else:
+        habit = next((h for h in habits if h.habit_id == habit_id), None)
     if habit is None:
         return None
     return [habit.name, habit.longest_streak]
+
+def _storage(source):
+    """Returns storage of a HabitManager (or source itself if it is a storage)."""
+    return getattr(source, "storage", source)
+
+def _periods(source):
+    """Returns {habit_id: period} of a HabitManager's habits (or a storage's stored habits)."""
+    if hasattr(source, "habits"):
+        return {h.habit_id: h.period for h in source.habits}
+    return {row[0]: row[3] for row in source.habit_summaries()}
+
+@timed("analysis.completion_rate")
+def completion_rate(source, start, end, archive=None):
+    """
+    Completion rate per habit over a date range, aggregated in SQL (see DatabaseStorage.completion_rates()).
+
+    Args:
+        source:                 HabitManager (uses its storage) or DatabaseStorage
+        start (date):           First day of range
+        end (date):             Last day of range (inclusive)
+        archive (CompletionArchive, optional): Aggregate with NumPy over this archive instead of SQL
+
+    Returns:
+        dict {int: float}:      habit_id -> completed periods (days/ ISO weeks) / periods in range
+    """
+    if archive is not None:
+        return {row[0]: row[3] for row in archive.completion_rates(start, end, _periods(source))}
+    return {row[0]: row[5] for row in _storage(source).completion_rates(start, end)}
+
+@timed("analysis.completions_per_period")
+def completions_per_period(source, start, end, bucket="week", archive=None):
+    """
+    Completions per habit and calendar week or month, aggregated in SQL (see DatabaseStorage.completion_counts()).
+
+    Args:
+        source:                 HabitManager (uses its storage) or DatabaseStorage
+        start (date):           First day of range
+        end (date):             Last day of range (inclusive)
+        bucket (str):           'week' (keyed by Monday) or 'month' (keyed by 1st day)
+        archive (CompletionArchive, optional): Aggregate with NumPy over this archive instead of SQL
+
+    Returns:
+        dict {int: dict}:       habit_id -> {bucket start (date): completions}, empty buckets omitted
+    """
+    rows = (archive or _storage(source)).completion_counts(start, end, bucket)
+    counts = {}
+    for habit_id, bucket_start, count in rows:
+        counts.setdefault(habit_id, {})[date.fromisoformat(bucket_start)] = count
+    return counts
+
+
+def cached(func):
+    """
+    Memoizes analysis function per HabitManager mutation version.
+
+    Args:
+        func (callable):    Analysis function taking habits (here: HabitManager) as first argument.
+
+    Returns:
+        callable:           func(manager, *args) with results stored in manager.result_cache, which the
+                            manager clears whenever its version changes. Returned lists are shared, don't modify.
+
+    Note:
+        The version changes with every manager method and every change a held habit makes itself
+        (e.g. habit.complete_habit(), rename). Writes by other processes (e.g. `main.py complete`) are not
+        seen until the habits are reloaded, the same as for the uncached functions over in-memory habits.
+    """
+    @functools.wraps(func)
+    def wrapper(manager, *args):
+        key = (func.__name__, args)
+        cache = manager.result_cache
+        if key not in cache:
+            cache[key] = func(manager, *args)
+        return cache[key]
+    return wrapper
+
+list_all_habits_cached = cached(list_all_habits)
+list_habit_by_period_cached = cached(list_habit_by_period)
+longest_streak_of_all_cached = cached(longest_streak_of_all)
+longest_streak_one_cached = cached(longest_streak_one)
@@ -0,0 +1,213 @@
+"""
+--------------
+Archive Module
+--------------
+Exports a user's completions into a columnar archive file for long-horizon analytics with NumPy.
+Rows are sorted by (habit_id, date); habits and offsets index each habit's row range, so a habit's
+history is the slice ordinals[offsets[i]:offsets[i + 1]]. The file is memory-mapped and all columns
+are zero-copy views of it.
+
+refresh_archive() brings the file up to date: only completions rows with ids above the archive's watermark
+are read and merged in. Deleted completions (DatabaseStorage.completion_version()), another database or
+another user make it rebuild the archive from all rows instead.
+
+Layout (little-endian): header, then 8-byte aligned sections
+    habit_ids           int64 [rows]        habit per completion
+    ordinals            int32 [rows]        date ordinal per completion
+    habits              int64 [habits]      distinct habit ids, ascending
+    offsets             int64 [habits + 1]  first row of each habit, rows at the end
+--------------
+"""
+
+import os
+import struct
+from datetime import date
+import numpy as np
+from instrumentation import timed
+from periods import PERIODS
+from snapshot import padded
+
+MAGIC = b"HABARCH1"
+_HEADER = struct.Struct("<8sqqqqqq")   # magic, database_id, completion_deletes, watermark, user_id, rows, habits
+_NAMES = tuple(PERIODS)
+_CODES = {name: code for code, name in enumerate(_NAMES)}
+
+
+def archive_path(storage):
+    """Returns archive file of a storage's database and user, next to the database file."""
+    return f"{storage.db_name}.user{storage.user_id}.archive"
+
+
+class CompletionArchive:
+    """Read-only view of an archive file: NumPy columns over a memory map."""
+
+    def __init__(self, path):
+        """
+        Maps an archive file.
+
+        Args:
+            path (str):     Archive file written by refresh_archive().
+
+        Raises:
+            ValueError:     File is not a complete archive.
+        """
+        raw = np.memmap(path, dtype=np.uint8, mode="r")
+        if len(raw) < _HEADER.size:
+            raise ValueError(f"not a completion archive: {path}")
+        magic, self.database_id, self.deletes, self.watermark, self.user_id, rows, habits = (
+            _HEADER.unpack(raw[:_HEADER.size].tobytes()))
+        offset = _HEADER.size
+        columns = []
+        for dtype, count in (("<i8", rows), ("<i4", rows), ("<i8", habits), ("<i8", habits + 1)):
+            size = np.dtype(dtype).itemsize * count
+            columns.append(raw[offset:offset + size].view(dtype))
+            offset += size + (-size % 8)
+        if magic != MAGIC or offset != len(raw):
+            raise ValueError(f"not a completion archive: {path}")
+        self.path = path
+        self.habit_ids, self.ordinals, self.habits, self.offsets = columns
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def history(self, habit_id):
+        """Returns sorted date ordinals of a habit (view into the archive, empty if not archived)."""
+        i = np.searchsorted(self.habits, habit_id)
+        if i == len(self.habits) or self.habits[i] != habit_id:
+            return self.ordinals[:0]
+        return self.ordinals[self.offsets[i]:self.offsets[i + 1]]
+
+    def _window(self, start, end):
+        """Returns (habit_ids, ordinals) of the completions in [start, end], still sorted."""
+        ordinals = self.ordinals
+        rows = (ordinals >= start.toordinal()) & (ordinals <= end.toordinal())
+        return self.habit_ids[rows], ordinals[rows]
+
+    @timed("archive.completion_rates")
+    def completion_rates(self, start, end, periods):
+        """
+        Computes completion rate per habit over a date range, as DatabaseStorage.completion_rates().
+
+        Args:
+            start (date):               First day of range.
+            end (date):                 Last day of range (inclusive).
+            periods (dict {int: str}):  Period per habit id; rates are returned for these habits.
+
+        Returns:
+            list [tuple]:               (habit_id, completed periods, periods in range, rate) per habit, ordered by ID.
+        """
+        ids = np.array(sorted(periods), dtype=np.int64)
+        habit_ids, ordinals = self._window(start, end)
+        known = np.isin(habit_ids, ids)
+        habit_ids, ordinals = habit_ids[known], ordinals[known]
+        index = np.searchsorted(ids, habit_ids)
+
+        # Period bucket per completion (unknown periods count days), distinct buckets per habit
+        rules = [PERIODS.get(periods[habit_id], PERIODS["daily"]) for habit_id in ids.tolist()]
+        codes = np.array([_CODES[rule.name] for rule in rules], dtype=np.int64)[index]
+        keys = ordinals.astype(np.int64)
+        for code in np.unique(codes).tolist():
+            if code != _CODES["daily"]:
+                rows = codes == code
+                keys[rows] = PERIODS[_NAMES[code]].np_buckets(ordinals[rows])
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = (index[1:] != index[:-1]) | (keys[1:] != keys[:-1])
+        done = np.bincount(index[first], minlength=len(ids)).tolist()
+
+        rates = []
+        for habit_id, rule, count in zip(ids.tolist(), rules, done):
+            n = rule.bucket(end.toordinal()) - rule.bucket(start.toordinal()) + 1
+            rates.append((habit_id, count, n, count / n if n > 0 else 0.0))
+        return rates
+
+    @timed("archive.completion_counts")
+    def completion_counts(self, start, end, bucket="week"):
+        """
+        Counts completions per habit and calendar week or month, as DatabaseStorage.completion_counts().
+
+        Args:
+            start (date):   First day of range.
+            end (date):     Last day of range (inclusive).
+            bucket (str):   'week' (ISO week, keyed by its Monday) or 'month' (keyed by its 1st day).
+
+        Returns:
+            list [tuple]:   (habit_id, bucket start ISO date, completions), ordered by habit and bucket.
+                            Buckets without completions are omitted.
+        """
+        buckets = {"week": PERIODS["weekly"], "month": PERIODS["monthly"]}
+        if bucket not in buckets:
+            raise ValueError(f"bucket must be one of {tuple(buckets)}")
+        rule = buckets[bucket]
+        habit_ids, ordinals = self._window(start, end)
+        if not len(ordinals):
+            return []
+        keys = rule.np_buckets(ordinals)
+        # Rows are sorted by (habit, date), so each (habit, bucket) group is contiguous
+        starts = np.flatnonzero(np.append(True, (habit_ids[1:] != habit_ids[:-1]) | (keys[1:] != keys[:-1])))
+        counts = np.diff(np.append(starts, len(keys)))
+        return [(habit_id, date.fromordinal(rule.first_day(key)).isoformat(), count)
+                for habit_id, key, count in zip(habit_ids[starts].tolist(), keys[starts].tolist(), counts.tolist())]
+
+
+def _write(path, header, habit_ids, ordinals):
+    """Writes sorted completion columns to an archive file (atomically replaced)."""
+    starts = np.flatnonzero(np.append(True, habit_ids[1:] != habit_ids[:-1])) if len(habit_ids) else np.arange(0)
+    habits = habit_ids[starts]
+    offsets = np.append(starts, len(habit_ids))
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, *header, len(ordinals), len(habits)))
+        for values, dtype in ((habit_ids, "<i8"), (ordinals, "<i4"), (habits, "<i8"), (offsets, "<i8")):
+            file.write(padded(np.ascontiguousarray(values, dtype=dtype).tobytes()))
+    os.replace(tmp, path)
+
+
+def _merge(archive, habit_ids, ordinals):
+    """
+    Merges sorted new rows into the archive's sorted columns in linear time.
+
+    Habits are replaced by their rank among old and new habit ids, so (rank, ordinal) packs into one
+    sortable int64 key and searchsorted finds every new row's insert position in the old rows.
+    """
+    ranks = np.union1d(archive.habits, habit_ids)
+    old_keys = np.repeat(np.searchsorted(ranks, archive.habits), np.diff(archive.offsets)) << 32
+    old_keys |= archive.ordinals.astype(np.int64)
+    new_keys = (np.searchsorted(ranks, habit_ids) << 32) | ordinals
+    positions = np.searchsorted(old_keys, new_keys)
+    return np.insert(archive.habit_ids, positions, habit_ids), np.insert(archive.ordinals, positions, ordinals)
+
+
+@timed("archive.refresh")
+def refresh_archive(storage, path=None):
+    """
+    Updates the completion archive of storage's user and returns it.
+
+    Args:
+        storage (DatabaseStorage):  Storage whose completions are archived.
+        path (str, optional):       Archive file, defaults to archive_path(storage).
+
+    Returns:
+        CompletionArchive:          Current archive. Completions added since the last refresh are merged in,
+                                    it is rebuilt if missing, damaged, of another database/ user or if
+                                    completions were deleted since.
+    """
+    path = path or archive_path(storage)
+    version = storage.completion_version()     # Read before the rows: deletes meanwhile force the next rebuild
+    try:
+        archive = CompletionArchive(path)
+    except (OSError, ValueError):
+        archive = None
+    if archive is not None and (archive.user_id != storage.user_id
+                                or (archive.database_id, archive.deletes) != version):
+        archive = None
+
+    rows = storage.load_completion_rows(archive.watermark if archive is not None else 0)
+    if archive is not None and not rows:
+        return archive
+    rows = np.array(rows, dtype=np.int64).reshape(-1, 3)
+    watermark = max(int(rows[:, 0].max(initial=0)), archive.watermark if archive is not None else 0)
+    habit_ids, ordinals = rows[:, 1], rows[:, 2]
+    if archive is not None:
+        habit_ids, ordinals = _merge(archive, habit_ids, ordinals)
+    _write(path, (*version, watermark, storage.user_id), habit_ids, ordinals)
+    return CompletionArchive(path)
@@ -0,0 +1,169 @@
+"""
+-----------------------------
+Async Database Storage Module
+-----------------------------
+Implements AsyncDatabaseStorage, an asyncio front end of DatabaseStorage for embedding in async services.
+All SQLite work runs on one dedicated executor thread per database (SQLite connections are thread-bound),
+so the event loop never blocks on disk I/O and the thread count stays bounded regardless of load.
+Concurrent save_habit() calls are group-committed: saves queued while a write is running are
+written together in the next transaction.
+-----------------------------
+"""
+
+import asyncio
+import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from db import DatabaseStorage
+
+
+class _ThreadBoundStorage(DatabaseStorage):
+    """DatabaseStorage owned by the executor thread, lazy history loads from other threads are routed to it."""
+
+    def __init__(self, executor, *args, **kwargs):
+        self._executor = executor
+        self._owner_thread = threading.get_ident()
+        super().__init__(*args, **kwargs)
+
+    def _on_owner_thread(self, load, habit_id):
+        """Runs load(habit_id) on the executor thread (blocks the calling thread, e.g. on first use of a lazy habit)."""
+        if threading.get_ident() == self._owner_thread:
+            return load(habit_id)
+        return self._executor.submit(load, habit_id).result()
+
+    def load_completion_ordinals(self, habit_id):
+        """Loads history on the executor thread, see _on_owner_thread()."""
+        return self._on_owner_thread(super().load_completion_ordinals, habit_id)
+
+    def load_completion_bitmap(self, habit_id):
+        """Loads bitmap history on the executor thread, see _on_owner_thread()."""
+        return self._on_owner_thread(super().load_completion_bitmap, habit_id)
+
+
+class AsyncDatabaseStorage:
+    """Awaitable DatabaseStorage API, executed on a single dedicated SQLite thread."""
+
+    def __init__(self, db_name=None, pragmas=None, user_id=DatabaseStorage.DEFAULT_USER_ID):
+        """
+        Initializes new AsyncDatabaseStorage, opening (and migrating) the database on its executor thread.
+
+        Args:
+            db_name (str, optional):    Database file, defaults to 'habits.db'.
+            pragmas (dict, optional):   PRAGMA overrides merged into DatabaseStorage.DEFAULT_PRAGMAS.
+            user_id (int, optional):    User partition all operations are scoped to.
+
+        Note:
+            Habits must not be modified while their save is pending.
+            Lazily loaded habits fetch their history through the executor thread on first use.
+        """
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="habit-db")
+        self._storage = self._executor.submit(_ThreadBoundStorage, self._executor, db_name, pragmas, user_id)
+        self._pending_saves = []    # (habit, asyncio.Future) waiting for the next group commit
+        self._flush_task = None
+
+    def for_user(self, user_id):
+        """
+        Returns async storage view scoped to another user, sharing this storage's thread and connection.
+
+        Args:
+            user_id (int):              User partition of the view.
+
+        Returns:
+            AsyncDatabaseStorage:       View; close the owning storage, not the view.
+        """
+        view = copy.copy(self)
+        view._storage = self._executor.submit(lambda: self._storage.result().for_user(user_id))
+        view._pending_saves = []
+        view._flush_task = None
+        return view
+
+    async def _run(self, method, *args, **kwargs):
+        """Runs DatabaseStorage method (by name) on the executor thread and awaits its result."""
+        def call():
+            return getattr(self._storage.result(), method)(*args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+    async def save_habit(self, habit):
+        """
+        Saves unsaved changes of a habit (see DatabaseStorage.save_habit()).
+
+        Saves requested while another write is running are written together in one transaction;
+        if that transaction fails, every save of the group raises the error.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending_saves.append((habit, future))
+        if self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush_saves())
+        await future
+
+    async def _flush_saves(self):
+        """Writes queued saves group by group until the queue is empty."""
+        try:
+            while self._pending_saves:
+                group, self._pending_saves = self._pending_saves, []
+                try:
+                    await self._run("save_habits", [habit for habit, _ in group])
+                except Exception as error:
+                    for _, future in group:
+                        if not future.done():
+                            future.set_exception(error)
+                else:
+                    for _, future in group:
+                        if not future.done():
+                            future.set_result(None)
+        finally:
+            self._flush_task = None
+
+    async def save_habits(self, habits):
+        """Bulk save of many habits in one transaction (see DatabaseStorage.save_habits())."""
+        await self._run("save_habits", list(habits))
+
+    async def load_habit(self, habit_id):
+        """Loads single habit with history by ID, None if not found."""
+        return await self._run("load_habit", habit_id)
+
+    async def load_habit_ids(self):
+        """Loads all habit IDs of the user."""
+        return await self._run("load_habit_ids")
+
+    async def load_all_habits(self, with_history=False):
+        """Loads all habits of the user (see DatabaseStorage.load_all_habits())."""
+        return await self._run("load_all_habits", with_history=with_history)
+
+    async def delete_habit(self, habit_id):
+        """Deletes habit and its completions, False if not found."""
+        return await self._run("delete_habit", habit_id)
+
+    async def recompute_streaks(self):
+        """Bulk recompute of stored streak summaries."""
+        await self._run("recompute_streaks")
+
+    async def encode_bitmaps(self, habit_ids=None):
+        """Migrates habits to bitmap encoding, returns number of habits migrated."""
+        return await self._run("encode_bitmaps", habit_ids)
+
+    async def decode_bitmaps(self, habit_ids=None):
+        """Migrates bitmap-encoded habits back to row encoding, returns number of habits migrated."""
+        return await self._run("decode_bitmaps", habit_ids)
+
+    async def import_file(self, path, chunk_size=50000):
+        """Imports CSV/ JSONL export file, returns (habits created, completions inserted)."""
+        return await self._run("import_file", path, chunk_size)
+
+    async def export_file(self, path):
+        """Exports habits and completions to CSV/ JSONL file, returns number of records."""
+        return await self._run("export_file", path)
+
+    async def close(self):
+        """Writes pending saves, closes the connection and stops the executor thread."""
+        while self._flush_task is not None:
+            await self._flush_task
+        await self._run("close")
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
@@ -0,0 +1,109 @@
+"""
+--------------------------
+Async Habit Manager Module
+--------------------------
+Implements AsyncHabitManager, the asyncio counterpart of HabitManager for async services.
+In-memory habits, indexes and lookups are shared with HabitManager (and work with analysis.py);
+create/ complete/ delete are coroutines that persist through AsyncDatabaseStorage.
+--------------------------
+"""
+
+from habit import Habit
+from habit_manager import HabitManager
+
+
+class AsyncHabitManager(HabitManager):
+    """HabitManager with awaitable loading and CRUD operations, backed by AsyncDatabaseStorage."""
+
+    def __init__(self, storage=None, user_id=None):
+        """Initializes new AsyncHabitManager object with empty habits list and optional storage.
+
+        Args:
+            storage (AsyncDatabaseStorage):     Async storage backend for persistence (DB)
+            user_id (int, optional):            Scopes the manager to one user's habits (storage.for_user(user_id))
+
+        Note:
+            All in-memory changes happen on the event loop thread, only storage I/O runs on the storage thread.
+            Concurrent complete_habit() calls are group-committed by the storage.
+        """
+        super().__init__(storage, user_id)
+
+    async def load(self, with_history=False):
+        """Replaces in-memory habits with all stored habits of the user."""
+        self.habits = await self.storage.load_all_habits(with_history=with_history)
+
+    async def create_habit(self, name, description, period):
+        """
+        Creates new Habit object, saves it to storage, adds it to in-memory list and returns it.
+
+        Args:
+            name (str):         Habit name.
+            description (str):  Habit description.
+            period (str):       'daily' or 'weekly'.
+
+        Returns:
+            Habit:              New Habit object with assigned ID from storage.
+        """
+        habit = Habit(name=name, description=description, period=period)
+        await self.storage.save_habit(habit)    # Assigns ID before indexing
+        self.add_habit(habit)
+        return habit
+
+    async def complete_habit(self, habit_id):
+        """
+        Checks-off habit by ID as completed today and saves it to storage.
+
+        Args:
+            habit_id:   ID of habit to complete.
+
+        Returns:
+            bool:       True if newly completed
+                        False if already completed today or not found
+        """
+        habit = self._by_id.get(habit_id)
+        if habit is None or not habit.complete_habit():
+            return False
+        self._bump_version()
+        await self.storage.save_habit(habit)
+        return True
+
+    async def complete_habits(self, habit_ids):
+        """
+        Bulk check-off: completes many habits today and saves them in one transaction.
+
+        Args:
+            habit_ids (iterable):   IDs of habits to complete.
+
+        Returns:
+            list [bool]:            Per ID, True if newly completed (see complete_habit()).
+        """
+        completed = []
+        results = []
+        for habit_id in habit_ids:
+            habit = self._by_id.get(habit_id)
+            done = habit is not None and habit.complete_habit()
+            if done:
+                completed.append(habit)
+            results.append(done)
+        if completed:
+            self._bump_version()
+            await self.storage.save_habits(completed)
+        return results
+
+    async def delete_habit(self, habit_id):
+        """
+        Deletes habit by ID from in-memory list and storage.
+
+        Args:
+            habit_id:   ID of habit to delete.
+
+        Returns:
+            bool:       True if deleted
+                        False if not found
+        """
+        habit = self._by_id.get(habit_id)
+        if habit is None:
+            return False
+        self._remove_habit(habit)
+        await self.storage.delete_habit(habit_id)
+        return True
@@ -0,0 +1,570 @@
+"""
+----------------------
+Benchmark Suite Module
+----------------------
+Repeatable timings of storage, streak and analysis hot paths on a seeded synthetic habits.db.
+Results are written as JSON and can be compared against an earlier run to spot regressions.
+
+Usage:
+    python benchmark.py --habits 1000 --years 3 --output bench.json
+    python benchmark.py --habits 1000 --years 3 --compare bench.json
+----------------------
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+import analysis
+from db import DatabaseStorage
+from habit_manager import HabitManager
+from synthetic_data import generate_synthetic_db
+
+BENCHMARKS = {}     # name -> function(db_name, repeat) returning result dict
+
+
+def benchmark(name):
+    """Registers a benchmark function under name."""
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+def measure(func, repeat, ops=1, setup=None):
+    """
+    Times func repeat times (fresh setup() result passed in if given).
+
+    Args:
+        func (callable):            Timed function, receives setup() result if setup given.
+        repeat (int):               Number of timed runs.
+        ops (int):                  Operations per run, for per-operation latency.
+        setup (callable, optional): Untimed preparation per run.
+
+    Returns:
+        dict:                       ops, min_s, median_s, mean_s and per_op_us (from median).
+    """
+    timings = []
+    for _ in range(repeat):
+        args = (setup(),) if setup else ()
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return summarize(timings, ops)
+
+
+def summarize(timings, ops=1):
+    """Returns measure() result dict for a list of run timings in seconds."""
+    median = statistics.median(timings)
+    return {"ops": ops, "min_s": min(timings), "median_s": median, "mean_s": statistics.fmean(timings),
+            "per_op_us": median / ops * 1e6}
+
+
+def _scratch_copy(db_name):
+    """Copies db_name to a temporary file for destructive benchmarks, returns its path."""
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    with sqlite3.connect(db_name) as source, sqlite3.connect(path) as target:
+        source.backup(target)
+    source.close()
+    target.close()
+    return path
+
+
+@benchmark("load_all_habits")
+def bench_load_all_habits(db_name, repeat):
+    with DatabaseStorage(db_name) as storage:
+        return measure(storage.load_all_habits, repeat)
+
+
+@benchmark("load_all_habits_with_history")
+def bench_load_all_habits_with_history(db_name, repeat):
+    with DatabaseStorage(db_name) as storage:
+        return measure(lambda: storage.load_all_habits(with_history=True), repeat)
+
+
+@benchmark("load_history_rows")
+def bench_load_history_rows(db_name, repeat, sample=200):
+    """Lazy history load of `sample` row-encoded habits (one completions row per date)."""
+    with DatabaseStorage(db_name) as storage:
+        habit_ids = storage.load_habit_ids()[:sample]
+        return measure(lambda: [storage.load_habit_summary(habit_id).completion_ordinals() for habit_id in habit_ids],
+                       repeat, ops=len(habit_ids))
+
+
+@benchmark("load_history_bitmap")
+def bench_load_history_bitmap(db_name, repeat, sample=200):
+    """Lazy history load of `sample` bitmap-encoded habits (one BLOB each)."""
+    path = _scratch_copy(db_name)
+    try:
+        with DatabaseStorage(path) as storage:
+            habit_ids = storage.load_habit_ids()[:sample]
+            storage.encode_bitmaps(habit_ids)
+            return measure(lambda: [storage.load_habit_summary(habit_id).completion_bitmap()
+                                    for habit_id in habit_ids], repeat, ops=len(habit_ids))
+    finally:
+        os.remove(path)
+
+
+@benchmark("compute_streak")
+def bench_compute_streak(db_name, repeat):
+    with DatabaseStorage(db_name) as storage:
+        habits = storage.load_all_habits(with_history=True)
+
+    def compute_all():
+        for habit in habits:
+            habit.compute_streak()
+    return measure(compute_all, repeat, ops=len(habits))
+
+
+@benchmark("compute_streak_weekly")
+def bench_compute_streak_weekly(db_name, repeat):
+    """compute_streak() of weekly habits only (ISO week bucket ids, see periods.py)."""
+    with DatabaseStorage(db_name) as storage:
+        habits = [habit for habit in storage.load_all_habits(with_history=True) if habit.period == "weekly"]
+
+    def compute_all():
+        for habit in habits:
+            habit.compute_streak()
+    return measure(compute_all, repeat, ops=len(habits))
+
+
+@benchmark("streak_history")
+def bench_streak_history(db_name, repeat, points=52):
+    """Streak-as-of-date chart of every habit: `points` weekly streak_on() queries over its history."""
+    with DatabaseStorage(db_name) as storage:
+        habits = [habit for habit in storage.load_all_habits(with_history=True) if habit.completion_count]
+
+    def chart_all():
+        for habit in habits:
+            dates = habit.completed_dates
+            first, last = dates[0], dates[-1]
+            step = max((last - first) // points, timedelta(days=1))
+            for i in range(points):
+                habit.streak_on(first + step * i)
+    chart_all()     # Builds run indexes
+    return measure(chart_all, repeat, ops=len(habits) * points)
+
+
+@benchmark("compute_habit_streaks_batch")
+def bench_compute_habit_streaks(db_name, repeat):
+    from streaks import compute_habit_streaks
+    with DatabaseStorage(db_name) as storage:
+        habits = storage.load_all_habits(with_history=True)
+    return measure(lambda: compute_habit_streaks(habits), repeat, ops=len(habits))
+
+
+@benchmark("save_habit")
+def bench_save_habit(db_name, repeat, sample=200):
+    """Check-off + save of `sample` habits (one new completion each)."""
+    path = _scratch_copy(db_name)
+    try:
+        with DatabaseStorage(path) as storage:
+            habits = storage.load_all_habits()[:sample]
+            days = iter(range(1, repeat + 1))
+
+            def complete():
+                day = date.today() + timedelta(days=next(days))
+                for habit in habits:
+                    habit.add_completion(day)
+                return day
+
+            def save_all(_):
+                for habit in habits:
+                    storage.save_habit(habit)
+            return measure(save_all, repeat, ops=len(habits), setup=complete)
+    finally:
+        os.remove(path)
+
+
+@benchmark("save_habit_async")
+def bench_save_habit_async(db_name, repeat, sample=200):
+    """Same check-offs as save_habit, saved by `sample` concurrent coroutines (group commit on one thread)."""
+    from async_db import AsyncDatabaseStorage
+    path = _scratch_copy(db_name)
+    loop = asyncio.new_event_loop()
+    try:
+        storage = AsyncDatabaseStorage(path)
+        habits = loop.run_until_complete(storage.load_all_habits())[:sample]
+        days = iter(range(1, repeat + 1))
+
+        def complete():
+            day = date.today() + timedelta(days=next(days))
+            for habit in habits:
+                habit.add_completion(day)
+            return day
+
+        async def save_all():
+            await asyncio.gather(*(storage.save_habit(habit) for habit in habits))
+        result = measure(lambda _: loop.run_until_complete(save_all()), repeat, ops=len(habits), setup=complete)
+        loop.run_until_complete(storage.close())
+        return result
+    finally:
+        loop.close()
+        os.remove(path)
+
+
+@benchmark("complete_habit_threaded")
+def bench_complete_habit_threaded(db_name, repeat, threads=8):
+    """Check-off of every habit by `threads` worker threads through HabitManager and GroupCommitStorage."""
+    from group_commit import GroupCommitStorage
+    scratch = []
+
+    def setup():
+        path = _scratch_copy(db_name)
+        storage = GroupCommitStorage(path)
+        manager = HabitManager(storage)
+        manager.habits = storage.load_all_habits()
+        scratch.append((storage, path))
+        return manager
+
+    def complete_all(manager):
+        ids = [habit.habit_id for habit in manager.habits]
+
+        def worker(part):
+            for future in [manager.submit_complete(habit_id) for habit_id in part]:
+                future.result()
+        workers = [threading.Thread(target=worker, args=(ids[i::threads],)) for i in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+    try:
+        with DatabaseStorage(db_name) as storage:
+            n_habits = len(storage.load_habit_ids())
+        return measure(complete_all, repeat, ops=n_habits, setup=setup)
+    finally:
+        for storage, path in scratch:
+            storage.close()
+            os.remove(path)
+
+
+@benchmark("delete_habit")
+def bench_delete_habit(db_name, repeat, sample=200):
+    """Deletes `sample` habits per run (fewer on small databases, every run needs its own habits)."""
+    path = _scratch_copy(db_name)
+    try:
+        with DatabaseStorage(path) as storage:
+            habit_ids = storage.load_habit_ids()
+            sample = max(1, min(sample, len(habit_ids) // repeat))
+            ids = iter(habit_ids)
+
+            def delete_batch(batch):
+                for habit_id in batch:
+                    storage.delete_habit(habit_id)
+            return measure(delete_batch, repeat, ops=sample,
+                           setup=lambda: [habit_id for _, habit_id in zip(range(sample), ids)])
+    finally:
+        os.remove(path)
+
+
+@benchmark("load_all_habits_one_user")
+def bench_load_all_habits_one_user(db_name, repeat):
+    """Per-user startup load on a multi-user database (should scale with the user's habits, not the table)."""
+    with DatabaseStorage(db_name) as storage:
+        users = storage.connection.execute("SELECT MAX(user_id) FROM habits").fetchone()[0] + 1
+        view = storage.for_user(users // 2)
+        return measure(view.load_all_habits, repeat, ops=1)
+
+
+@benchmark("load_manager_full")
+def bench_load_manager_full(db_name, repeat):
+    """Startup state without snapshot: habits table load plus manager indexes (snapshot.load_manager())."""
+    from snapshot import load_manager
+    with DatabaseStorage(db_name) as storage:
+        missing = os.path.join(tempfile.gettempdir(), "no-such.snapshot")
+        return measure(lambda: load_manager(storage, missing), repeat, ops=len(storage.load_habit_ids()))
+
+
+@benchmark("load_manager_snapshot")
+def bench_load_manager_snapshot(db_name, repeat):
+    """Startup state restored from a binary snapshot of the previous session (snapshot.load_manager())."""
+    from snapshot import load_manager, save_snapshot
+    fd, path = tempfile.mkstemp(suffix=".snapshot")
+    os.close(fd)
+    try:
+        with DatabaseStorage(db_name) as storage:
+            save_snapshot(load_manager(storage), path)
+            result = measure(lambda: load_manager(storage, path), repeat, ops=len(storage.load_habit_ids()))
+            result["file_bytes"] = os.path.getsize(path)
+            return result
+    finally:
+        os.remove(path)
+
+
+def _manager(db_name):
+    """HabitManager with all habits of db_name loaded (storage closed)."""
+    with DatabaseStorage(db_name) as storage:
+        manager = HabitManager(storage)
+        manager.habits = storage.load_all_habits()
+    return manager
+
+
+@benchmark("analysis.list_all_habits")
+def bench_list_all_habits(db_name, repeat):
+    manager = _manager(db_name)
+    return measure(lambda: analysis.list_all_habits(manager), repeat)
+
+
+@benchmark("analysis.list_habit_by_period")
+def bench_list_habit_by_period(db_name, repeat):
+    manager = _manager(db_name)
+    return measure(lambda: analysis.list_habit_by_period(manager, "weekly"), repeat)
+
+
+@benchmark("analysis.longest_streak_of_all")
+def bench_longest_streak_of_all(db_name, repeat):
+    manager = _manager(db_name)
+    return measure(lambda: analysis.longest_streak_of_all(manager), repeat)
+
+
+@benchmark("analysis.longest_streak_one")
+def bench_longest_streak_one(db_name, repeat):
+    manager = _manager(db_name)
+    habit_id = manager.habits[len(manager.habits) // 2].habit_id
+    return measure(lambda: analysis.longest_streak_one(manager, habit_id), repeat)
+
+
+def _year_window(storage):
+    """Returns (start, end) of the last 365 days with completions in storage."""
+    last = storage.connection.execute("SELECT MAX(completed_dates) FROM completions").fetchone()[0]
+    end = date.fromisoformat(last) if last else date.today()
+    return end - timedelta(days=364), end
+
+
+@benchmark("analysis.completion_rate_sql")
+def bench_completion_rate_sql(db_name, repeat):
+    """Completion rate per habit over one year, aggregated in SQLite."""
+    with DatabaseStorage(db_name) as storage:
+        start, end = _year_window(storage)
+        return measure(lambda: analysis.completion_rate(storage, start, end), repeat)
+
+
+@benchmark("analysis.completion_rate_archive")
+def bench_completion_rate_archive(db_name, repeat):
+    """Completion rate per habit over one year, NumPy over the memory-mapped completion archive."""
+    from archive import refresh_archive
+    fd, path = tempfile.mkstemp(suffix=".archive")
+    os.close(fd)
+    try:
+        with DatabaseStorage(db_name) as storage:
+            start, end = _year_window(storage)
+            archive = refresh_archive(storage, path)
+            return measure(lambda: analysis.completion_rate(storage, start, end, archive=archive), repeat)
+    finally:
+        os.remove(path)
+
+
+@benchmark("archive_build")
+def bench_archive_build(db_name, repeat):
+    """Full export of all completions into a new archive file."""
+    from archive import refresh_archive
+    path = os.path.join(tempfile.gettempdir(), "benchmark-build.archive")
+    with DatabaseStorage(db_name) as storage:
+        result = measure(lambda _: refresh_archive(storage, path), repeat,
+                         setup=lambda: os.path.exists(path) and os.remove(path))
+        result["file_bytes"] = os.path.getsize(path)
+    os.remove(path)
+    return result
+
+
+@benchmark("archive_refresh")
+def bench_archive_refresh(db_name, repeat, sample=200):
+    """Incremental archive refresh after one new completion for each of `sample` habits."""
+    from archive import refresh_archive
+    path = _scratch_copy(db_name)
+    try:
+        with DatabaseStorage(path) as storage:
+            refresh_archive(storage)
+            habits = [storage.load_habit(habit_id) for habit_id in storage.load_habit_ids()[:sample]]
+
+            def complete_next_day():
+                for habit in habits:
+                    habit.add_completion((habit.last_completed or date.today()) + timedelta(days=1))
+                    storage.save_habit(habit)
+            return measure(lambda _: refresh_archive(storage), repeat, ops=len(habits), setup=complete_next_day)
+    finally:
+        os.remove(path)
+        if os.path.exists(f"{path}.user{DatabaseStorage.DEFAULT_USER_ID}.archive"):
+            os.remove(f"{path}.user{DatabaseStorage.DEFAULT_USER_ID}.archive")
+
+
+# Startup regression budget (seconds, median), checked by --budget
+STARTUP_BUDGET_S = {
+    "startup.first_menu": 0.4,     # Interpreter start to first interactive menu (incl. questionary import)
+    "startup.command": 0.2,        # Complete run of a non-interactive command (main.py stats)
+    "startup.snapshot_50k": 0.1,   # Startup state of 50k habits restored from a snapshot (load_manager())
+}
+
+# Runs main_loop() until the first menu would be shown, prints wall-clock time (time.time()) at that point
+_FIRST_MENU_DRIVER = """
+import sys, time
+import questionary
+def first_menu(*args, **kwargs):
+    print(time.time(), flush=True)
+    raise SystemExit(0)
+questionary.select = first_menu
+import main
+main.main_loop(db_name=sys.argv[1])
+"""
+
+
+def _python(*args):
+    """Runs python with args from the project directory, returns CompletedProcess (text output)."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    return subprocess.run([sys.executable, *args], cwd=here, capture_output=True, text=True, check=True,
+                          env={**os.environ, "PYTHONPATH": here})
+
+
+def _budgeted(name, result):
+    """Adds budget_s/ over_budget of benchmark name to its result."""
+    result["budget_s"] = STARTUP_BUDGET_S[name]
+    result["over_budget"] = result["median_s"] > result["budget_s"]
+    return result
+
+
+@benchmark("startup.first_menu")
+def bench_startup_first_menu(db_name, repeat):
+    """Wall clock from process start to the first menu (habits load in the background meanwhile)."""
+    timings = []
+    for _ in range(repeat):
+        start = time.time()
+        shown = float(_python("-c", _FIRST_MENU_DRIVER, db_name).stdout.split()[-1])
+        timings.append(shown - start)
+    return _budgeted("startup.first_menu", summarize(timings))
+
+
+@benchmark("startup.command")
+def bench_startup_command(db_name, repeat):
+    return _budgeted("startup.command", measure(lambda: _python("main.py", "--db", db_name, "stats"), repeat))
+
+
+@benchmark("startup.snapshot_50k")
+def bench_startup_snapshot_50k(db_name, repeat, n_habits=50_000):
+    """Startup state (habits plus manager) of 50k habits from a snapshot, on its own database of that size."""
+    from snapshot import load_manager, save_snapshot
+    workdir = tempfile.mkdtemp(prefix="habit_bench_50k_")
+    try:
+        path = os.path.join(workdir, "habits.db")
+        # Short histories: restoring from a snapshot reads no completions, only the habit count matters
+        generate_synthetic_db(path, n_habits=n_habits, years=0.1, seed=42, end=date(2026, 1, 1))
+        with DatabaseStorage(path) as storage:
+            save_snapshot(load_manager(storage))
+            loaded = []     # Keeps each result alive: freeing 50k habits is not part of startup, setup drops it
+
+            def restore(_):
+                loaded.append(load_manager(storage))
+            return _budgeted("startup.snapshot_50k",
+                             measure(restore, repeat, ops=n_habits, setup=loaded.clear))
+    finally:
+        shutil.rmtree(workdir)
+
+
+@benchmark("startup.imports")
+def bench_startup_imports(db_name, repeat, top=8):
+    """-X importtime of the interactive startup imports: total and slowest top-level modules (cumulative)."""
+    runs = []
+    for _ in range(repeat):
+        modules = {}
+        for line in _python("-X", "importtime", "-c", "import main, questionary").stderr.splitlines():
+            _, cumulative, name = line.split("|")   # "import time: self | cumulative | <indent>name"
+            if cumulative.strip().isdigit() and not name[1:].startswith(" "):     # Top-level imports only
+                modules[name.strip()] = int(cumulative)
+        runs.append(modules)
+    total = [sum(modules.values()) / 1e6 for modules in runs]
+    result = summarize(total)
+    slowest = sorted(runs[-1].items(), key=lambda item: item[1], reverse=True)[:top]
+    result["cumulative_us"] = dict(slowest)
+    return result
+
+
+def run_benchmarks(db_name, repeat=5, only=None):
+    """
+    Runs registered benchmarks against db_name.
+
+    Args:
+        db_name (str):              Database generated by synthetic_data.generate_synthetic_db().
+        repeat (int):               Timed runs per benchmark.
+        only (list [str], optional): Benchmark names to run (default all).
+
+    Returns:
+        dict:                       Benchmark name -> timing result (see measure()).
+    """
+    return {name: func(db_name, repeat) for name, func in BENCHMARKS.items() if not only or name in only}
+
+
+def compare(results, baseline):
+    """Returns lines with median ratio (current/ baseline) per benchmark present in both runs."""
+    lines = []
+    for name, result in results.items():
+        if name in baseline.get("results", {}):
+            ratio = result["median_s"] / max(baseline["results"][name]["median_s"], 1e-12)
+            flag = "  <-- slower" if ratio > 1.2 else ""
+            lines.append(f"{name:40s} {ratio:6.2f}x{flag}")
+    return lines
+
+
+def main(argv=None):
+    """Parses arguments, generates dataset, runs benchmarks and prints/ writes JSON results."""
+    parser = argparse.ArgumentParser(description="Habit Tracker benchmark suite")
+    parser.add_argument("--habits", type=int, default=1000, help="number of synthetic habits")
+    parser.add_argument("--years", type=float, default=3, help="years of completion history")
+    parser.add_argument("--density", type=float, default=0.7, help="share of periods completed")
+    parser.add_argument("--pattern", choices=["uniform", "streaky"], default="streaky")
+    parser.add_argument("--users", type=int, default=1, help="number of users the habits are spread over")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument("--only", nargs="*", help="run only these benchmarks")
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--budget", action="store_true", help="exit with status 1 if a startup budget is exceeded")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="habit_bench_")
+    try:
+        db_name = os.path.join(workdir, "habits.db")
+        start = time.perf_counter()
+        rows = generate_synthetic_db(db_name, n_habits=args.habits, years=args.years, density=args.density,
+                                     pattern=args.pattern, seed=args.seed, end=date(2026, 1, 1),
+                                     users=args.users)
+        generate_s = time.perf_counter() - start
+        report = {
+            "meta": {"habits": args.habits, "users": args.users, "years": args.years, "density": args.density,
+                     "pattern": args.pattern, "seed": args.seed, "repeat": args.repeat,
+                     "completions": rows, "generate_s": generate_s,
+                     "python": platform.python_version(), "sqlite": sqlite3.sqlite_version,
+                     "platform": platform.platform()},
+            "results": run_benchmarks(db_name, args.repeat, args.only),
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    if args.compare:
+        with open(args.compare) as f:
+            print("\n".join(compare(report["results"], json.load(f))), file=sys.stderr)
+    over = [name for name, result in report["results"].items() if result.get("over_budget")]
+    if over:
+        print(f"Over startup budget: {', '.join(over)}", file=sys.stderr)
+        if args.budget:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
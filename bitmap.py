@@ -0,0 +1,248 @@
+"""
+------------------------
+Completion Bitmap Module
+------------------------
+Implements CompletionBitmap, a completion history stored as one bit per day since an anchor date,
+and BitmapHabit, a Habit backed by it: membership tests are O(1) bit tests, current/ longest streaks
+come from scans over runs of set bits. DatabaseStorage stores the bitmap as one BLOB per habit.
+------------------------
+"""
+
+from array import array
+from datetime import date
+from habit import Habit
+from instrumentation import timed
+from periods import period_rule, streaks
+
+# Set bit positions (LSB first) of every byte value, used to iterate bitmaps byte by byte
+_BIT_POSITIONS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+
+class CompletionBitmap:
+    """Sorted set of completion day ordinals, bit i (LSB first within each byte) == day anchor + i."""
+
+    __slots__ = ("anchor", "_bits", "_count")
+
+    def __init__(self, ordinals=()):
+        """
+        Initializes bitmap from day ordinals.
+
+        Args:
+            ordinals (iterable [int]):  Date ordinals (any order, duplicates ignored).
+        """
+        self.anchor = 0
+        self._bits = bytearray()
+        self._count = 0
+        for ordinal in ordinals:
+            self.add(ordinal)
+
+    @classmethod
+    def from_blob(cls, anchor, blob):
+        """
+        Builds bitmap from stored BLOB (see to_blob()).
+
+        Args:
+            anchor (int):       Date ordinal of bit 0.
+            blob (bytes):       Bitmap bytes.
+
+        Returns:
+            CompletionBitmap:   Bitmap over a bytearray copy of blob.
+        """
+        bitmap = cls()
+        bitmap.anchor = anchor
+        bitmap._bits = bytearray(blob)
+        bitmap._count = bin(int.from_bytes(blob, "little")).count("1")
+        return bitmap
+
+    def to_blob(self):
+        """Returns bitmap bytes for storage (trailing empty bytes dropped), anchor is stored alongside."""
+        end = len(self._bits)
+        while end and not self._bits[end - 1]:
+            end -= 1
+        return bytes(self._bits[:end])
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, ordinal):
+        """O(1) bit test."""
+        offset = ordinal - self.anchor
+        return 0 <= offset < len(self._bits) * 8 and bool(self._bits[offset >> 3] >> (offset & 7) & 1)
+
+    def __iter__(self):
+        """Yields ordinals in ascending order (skips empty bytes)."""
+        anchor = self.anchor
+        for i, value in enumerate(self._bits):
+            if value:
+                base = anchor + i * 8
+                for bit in _BIT_POSITIONS[value]:
+                    yield base + bit
+
+    def __getitem__(self, index):
+        """Ordinal(s) by position like a sorted array; last ordinal ([-1]) is found from the end."""
+        if index == -1 and self._count:
+            return self.last()
+        return list(self)[index]
+
+    def __eq__(self, other):
+        if isinstance(other, CompletionBitmap):
+            return self._count == other._count and list(self) == list(other)
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return f"CompletionBitmap({[date.fromordinal(o).isoformat() for o in self]!r})"
+
+    def last(self):
+        """Returns most recent ordinal or None."""
+        for i in range(len(self._bits) - 1, -1, -1):
+            value = self._bits[i]
+            if value:
+                return self.anchor + i * 8 + value.bit_length() - 1
+        return None
+
+    def add(self, ordinal):
+        """
+        Sets bit of ordinal, growing the bitmap at either end as needed.
+
+        Returns:
+            bool:   True if newly added, False if already set.
+        """
+        if not self._count:
+            self.anchor, self._bits = ordinal, bytearray(1)
+        offset = ordinal - self.anchor
+        if offset < 0:
+            grow = (-offset + 7) // 8      # Whole bytes, keeps existing bits byte-aligned
+            self._bits[0:0] = bytes(grow)
+            self.anchor -= grow * 8
+            offset += grow * 8
+        if offset >= len(self._bits) * 8:
+            self._bits.extend(bytes(max(offset // 8 + 1 - len(self._bits), len(self._bits) // 2)))
+        mask = 1 << (offset & 7)
+        if self._bits[offset >> 3] & mask:
+            return False
+        self._bits[offset >> 3] |= mask
+        self._count += 1
+        return True
+
+    append = add    # Array-compatible in-order add (see Habit.add_completion())
+
+    def discard(self, ordinal):
+        """
+        Clears bit of ordinal.
+
+        Returns:
+            bool:   True if removed, False if not set.
+        """
+        if ordinal not in self:
+            return False
+        offset = ordinal - self.anchor
+        self._bits[offset >> 3] &= ~(1 << (offset & 7))
+        self._count -= 1
+        return True
+
+    def before(self, ordinal):
+        """Returns last set ordinal <= ordinal or None (scans bytes backwards)."""
+        offset = min(ordinal - self.anchor, len(self._bits) * 8 - 1)
+        if offset < 0:
+            return None
+        i = offset >> 3
+        value = self._bits[i] & ((2 << (offset & 7)) - 1)
+        while not value:
+            i -= 1
+            if i < 0:
+                return None
+            value = self._bits[i]
+        return self.anchor + i * 8 + value.bit_length() - 1
+
+    def after(self, ordinal):
+        """Returns first set ordinal >= ordinal or None (scans bytes forwards)."""
+        offset = max(ordinal - self.anchor, 0)
+        i = offset >> 3
+        if i >= len(self._bits):
+            return None
+        value = self._bits[i] & (0xFF << (offset & 7)) & 0xFF
+        while not value:
+            i += 1
+            if i == len(self._bits):
+                return None
+            value = self._bits[i]
+        return self.anchor + i * 8 + (value & -value).bit_length() - 1
+
+    def runs(self):
+        """
+        Scans runs of consecutive set bits (consecutive days) with big-integer bit operations.
+
+        Yields:
+            tuple [int, int]:   (first ordinal, length) per run, in ascending order.
+        """
+        value = int.from_bytes(self._bits, "little")
+        ordinal = self.anchor
+        while value:
+            gap = (value & -value).bit_length() - 1     # Trailing zeros before the run
+            value >>= gap
+            length = (~value & (value + 1)).bit_length() - 1   # Trailing ones
+            yield ordinal + gap, length
+            value >>= length
+            ordinal += gap + length
+
+    def streaks(self, period):
+        """
+        Computes current and longest streak (same rules as Habit.compute_streak()).
+
+        Args:
+            period (str):       Habit periodicity, 'daily' takes runs of set bits, others bucket ids (periods.py).
+
+        Returns:
+            tuple [int, int]:   (current_streak, longest_streak), (0, 0) if empty.
+        """
+        if period != "daily":
+            return streaks(period_rule(period).buckets(self))
+        current = longest = 0
+        for _, length in self.runs():
+            current = length
+            longest = max(longest, length)
+        return current, longest
+
+
+class BitmapHabit(Habit):
+    """Habit whose completion history is a CompletionBitmap (O(1) membership, bit-run streak scans)."""
+
+    __slots__ = ()
+
+    ENCODING = "bitmap"
+
+    def _new_history(self, ordinals):
+        """Returns CompletionBitmap over sorted ordinals (or ordinals itself if already a bitmap)."""
+        if isinstance(ordinals, CompletionBitmap):
+            return ordinals
+        return CompletionBitmap(array("i", ordinals))
+
+    def _insert_ordinal(self, ordinal):
+        return self._history().add(ordinal)
+
+    def _delete_ordinal(self, ordinal):
+        return self._history().discard(ordinal)
+
+    def _completion_before(self, ordinal):
+        return self._history().before(ordinal)
+
+    def _completion_after(self, ordinal):
+        return self._history().after(ordinal)
+
+    def completion_ordinals(self):
+        """Returns completion history as sorted array('i') of date ordinals (decoded from the bitmap)."""
+        return array("i", self._history())
+
+    def completion_bitmap(self):
+        """Returns completion history as CompletionBitmap (loaded on demand, do not modify)."""
+        return self._history()
+
+    @timed("bitmap.compute_streak")
+    def compute_streak(self):
+        """Computes current and longest streak from runs of set bits (see Habit.compute_streak())."""
+        bitmap = self._history()
+        self._streak_synced = True
+        self.current_streak, self.longest_streak = bitmap.streaks(self.period)
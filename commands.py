@@ -0,0 +1,147 @@
+"""
+-------------------
+Command Mode Module
+-------------------
+Non-interactive subcommands of main.py for scripts and cron jobs: complete, create, delete, list, stats.
+Each command touches only the rows it needs (no full habit load, no questionary/ tabulate import),
+prints one JSON object to stdout and exits with status 0 (ok) or 1 (error, {"error": ...}).
+
+Usage:
+    python main.py complete Read
+    python main.py create Walk "Walk 5000 steps." --period daily
+    python main.py list --period weekly
+-------------------
+"""
+
+import json
+from datetime import date
+from db import DatabaseStorage, SUMMARY_FIELDS
+from habit import Habit
+from periods import PERIODS
+
+COMMANDS = {}   # name -> function(storage, args) returning JSON-serializable result
+
+
+class CommandError(Exception):
+    """Command failed (unknown/ ambiguous habit, invalid input), reported as {"error": message}."""
+
+
+def command(name):
+    """Registers a command function under name."""
+    def register(func):
+        COMMANDS[name] = func
+        return func
+    return register
+
+
+def add_subcommands(parser):
+    """
+    Adds command mode subcommands to main.py's argument parser.
+
+    Args:
+        parser (argparse.ArgumentParser):   Parser of main.py.
+    """
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND",
+                                       help="run one command and print JSON (omit for interactive menu)")
+
+    complete = subparsers.add_parser("complete", help="check-off a habit")
+    complete.add_argument("habit", help="habit ID or name")
+    complete.add_argument("--date", type=date.fromisoformat, help="completion date YYYY-MM-DD (default today)")
+
+    create = subparsers.add_parser("create", help="create a habit")
+    create.add_argument("name")
+    create.add_argument("description")
+    create.add_argument("--period", choices=list(PERIODS), default="daily")
+
+    delete = subparsers.add_parser("delete", help="delete a habit and its completions")
+    delete.add_argument("habit", help="habit ID or name")
+
+    listing = subparsers.add_parser("list", help="list habits with stored streaks")
+    listing.add_argument("--period", choices=list(PERIODS))
+
+    stats = subparsers.add_parser("stats", help="streak statistics of all habits or one habit")
+    stats.add_argument("habit", nargs="?", help="habit ID or name (default all habits)")
+
+
+def _summary(habit):
+    """Returns JSON dict of a habit's stored summary."""
+    last_completed = habit.last_completed
+    return {"habit_id": habit.habit_id, "name": habit.name, "description": habit.description,
+            "period": habit.period, "current_streak": habit.current_streak, "longest_streak": habit.longest_streak,
+            "last_completed": last_completed.isoformat() if last_completed else None,
+            "completion_count": habit.completion_count}
+
+
+def _load(storage, reference):
+    """
+    Loads habit summary by ID or (unique) name, raises CommandError if not found or ambiguous.
+
+    ASCII-digit references are tried as ID first, then as name (e.g. a habit named '2026').
+    """
+    habit = storage.load_habit_summary(int(reference)) if reference.isascii() and reference.isdigit() else None
+    if habit is None:
+        habit_ids = storage.find_habit_ids(reference)
+        if len(habit_ids) > 1:
+            raise CommandError(f"habit name '{reference}' is ambiguous, use one of IDs {habit_ids}")
+        habit = storage.load_habit_summary(habit_ids[0]) if habit_ids else None
+    if habit is None:
+        raise CommandError(f"habit '{reference}' not found")
+    return habit
+
+
+@command("complete")
+def complete(storage, args):
+    habit = _load(storage, args.habit)
+    completed_date = args.date or date.today()
+    completed = habit.add_completion(completed_date)
+    storage.save_habit(habit)
+    return {**_summary(habit), "completed": completed, "date": completed_date.isoformat()}
+
+
+@command("create")
+def create(storage, args):
+    habit = Habit(args.name, args.description, args.period)
+    storage.save_habit(habit)
+    return _summary(habit)
+
+
+@command("delete")
+def delete(storage, args):
+    habit = _load(storage, args.habit)
+    return {"habit_id": habit.habit_id, "name": habit.name, "deleted": storage.delete_habit(habit.habit_id)}
+
+
+@command("list")
+def list_habits(storage, args):
+    return {"habits": [dict(zip(SUMMARY_FIELDS, row)) for row in storage.habit_summaries(args.period)]}
+
+
+@command("stats")
+def stats(storage, args):
+    if args.habit:
+        return _summary(_load(storage, args.habit))
+    result = storage.habit_stats()
+    if result["longest"] is not None:
+        result["longest"] = dict(zip(SUMMARY_FIELDS, result["longest"]))
+    return result
+
+
+def run(args, db_name=None, out=None):
+    """
+    Runs the command selected in parsed arguments and prints its JSON result.
+
+    Args:
+        args (argparse.Namespace):  Parsed main.py arguments (command, user and command options).
+        db_name (str, optional):    Database file, defaults to 'habits.db'.
+        out (file, optional):       Output stream, defaults to sys.stdout.
+
+    Returns:
+        int:                        Exit status, 0 if ok, 1 on CommandError.
+    """
+    with DatabaseStorage(db_name, user_id=args.user) as storage:
+        try:
+            result, status = COMMANDS[args.command](storage, args), 0
+        except CommandError as error:
+            result, status = {"error": str(error)}, 1
+    print(json.dumps(result), file=out)
+    return status
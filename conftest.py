@@ -0,0 +1,33 @@
+"""
+----------------------
+Shared pytest fixtures
+----------------------
+"""
+
+import pytest
+from datetime import date
+from db import DatabaseStorage
+from sample_data import create_sample_habits_and_completions
+
+class MockStorage:
+    """Mock storage backend to prevent DB writes during testing."""
+    def save_habit(self, habit):
+        """Assign fake ID if new habit."""
+        if habit.habit_id is None:
+            habit.habit_id = 1
+
+    def delete_habit(self, habit_id):
+        pass
+
+@pytest.fixture
+def storage(tmp_path):
+    """DatabaseStorage on a temporary habits.db populated with sample habits."""
+    with DatabaseStorage(str(tmp_path / "habits.db")) as storage:
+        for habit in create_sample_habits_and_completions(today=date(2026, 3, 15)):
+            storage.save_habit(habit)
+        yield storage
+
+@pytest.fixture
+def mock_storage():
+    """Storage stand-in for HabitManager tests (assigns IDs, persists nothing)."""
+    return MockStorage()
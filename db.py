@@ -4,133 +4,1011 @@ Database Storage Module
 -----------------------
 Implements DatabaseStorage class, used for SQLite persistence of habit and completion data.
 Splits static habit data (habits table) and dynamic tracking data (completions table).
+Habits may additionally be bitmap-encoded (completion_bitmaps table, one BLOB per habit), see encode_bitmaps().
 Integrates with HabitManager for CRUD operations in habit tracker.
 -----------------------
 """
 
+import copy
+import csv
+import json
+import os
+import random
 import sqlite3
+from itertools import groupby
+from operator import itemgetter
+import instrumentation
+from bitmap import BitmapHabit, CompletionBitmap
 from habit import Habit
-from datetime import datetime as dt
+from instrumentation import timed
+from periods import PERIODS, UNCHAINED
+from datetime import date, datetime as dt, timedelta
+
+# SQL expression converting stored ISO dates to date ordinals (date.toordinal()) inside SQLite
+_SQL_ORDINAL = "CAST(julianday(completed_dates) - 1721424.5 AS INTEGER)"
+
+
+def _sql_bucket(period, ordinal, iso_date=None, default=UNCHAINED):
+    """
+    Returns SQL CASE expression of the period bucket id (periods.py) of a completion, by the habit's period column.
+
+    Args:
+        period (str):               SQL expression of the habit's period.
+        ordinal (str):              SQL expression of the completion's date ordinal.
+        iso_date (str, optional):   SQL expression of the completion's ISO date text (see Period.sql()).
+        default (Period):           Rule of periods not in PERIODS.
+    """
+    whens = " ".join(f"WHEN '{name}' THEN {rule.sql(ordinal, iso_date)}" for name, rule in PERIODS.items())
+    return f"CASE {period} {whens} ELSE {default.sql(ordinal, iso_date)} END"
+
+# Stored habit summary columns, row layout of habit_summaries() (and load_all_habits() internally)
+SUMMARY_FIELDS = ("habit_id", "name", "description", "period",
+                  "current_streak", "longest_streak", "last_completed", "completion_count", "encoding")
+
+# Record fields of bulk import/ export files (one record per completion)
+EXPORT_FIELDS = ("habit_id", "name", "description", "period", "completed_date")
+
+_MIN_ID = -2 ** 63  # Lowest possible habit_id
+
+def _batch_streaks():
+    """Returns batch streak module (streaks.py) if NumPy is installed, else None (scalar fallback)."""
+    try:
+        import streaks
+    except ImportError:
+        return None
+    return streaks
+
+def _habit_blocks(rows, block_rows):
+    """Yields lists of (habit_id, ordinal) rows of about block_rows each, never splitting one habit's rows."""
+    carry = []
+    while True:
+        block = rows.fetchmany(block_rows)
+        if not block:
+            if carry:
+                yield carry
+            return
+        block = carry + block
+        split = len(block)
+        while split and block[split - 1][0] == block[-1][0]:
+            split -= 1
+        carry = block[split:]   # Last habit may continue in next block
+        if split:
+            yield block[:split]
+
+def _streak_updates(rows, periods):
+    """
+    Computes streak column updates for completion rows of complete habits.
+
+    Args:
+        rows (list [tuple]):    (habit_id, ordinal) rows sorted by habit_id/ ordinal.
+        periods (dict):         habit_id -> period; rows of other habits are skipped.
+
+    Returns:
+        list [tuple]:           (current, longest, last_completed, count, habit_id) per habit.
+    """
+    streaks = _batch_streaks()
+    if streaks is None:
+        updates = []
+        for habit_id, group in groupby(rows, key=itemgetter(0)):
+            if habit_id in periods:
+                habit = Habit("", "", periods[habit_id], habit_id)
+                habit.load_ordinals(row[1] for row in group)
+                updates.append(_streak_summary(habit) + (habit_id,))
+        return updates
+
+    np = streaks.np
+    table = np.array(rows, dtype=np.int64).reshape(-1, 2)
+    habit_ids, habit_index = np.unique(table[:, 0], return_inverse=True)
+    period_codes = [streaks.PERIOD_CODES.get(periods.get(habit_id), len(streaks.PERIOD_CODES))
+                    for habit_id in habit_ids.tolist()]
+    current, longest = streaks.compute_streaks(habit_index, table[:, 1], period_codes)
+    counts = np.bincount(habit_index, minlength=len(habit_ids))
+    last = table[np.cumsum(counts) - 1, 1]
+    return [(c, l, date.fromordinal(o).isoformat(), n, habit_id)
+            for c, l, o, n, habit_id in zip(current.tolist(), longest.tolist(), last.tolist(), counts.tolist(),
+                                            habit_ids.tolist())
+            if habit_id in periods]
+
+def _streak_summary(habit):
+    """Returns materialized streak columns (current, longest, last_completed, count) of a habit."""
+    habit.refresh_streak()
+    last_completed = habit.last_completed
+    return (habit.current_streak, habit.longest_streak,
+            last_completed.isoformat() if last_completed else None, habit.completion_count)
 
 class DatabaseStorage:
-    """Establishes database connection and handles loading/saving of habit data."""
+    """Owns a long-lived, tuned database connection and handles loading/saving of habit data."""
 
     _db_name = 'habits.db'  # _db_name is a protected database name
 
-    def __init__(self):
-        """Initializes new DatabaseStorage object and creates tables."""
+    SCHEMA_VERSION = 6  # Stored in PRAGMA user_version, see _initialize_db()
+
+    DEFAULT_USER_ID = 0     # Partition of single-user databases (and all rows migrated from schema < v3)
+
+    # Connection tuning applied once per connection (override per instance via pragmas argument)
+    DEFAULT_PRAGMAS = {
+        "journal_mode": "WAL",          # Readers don't block the writer, commits append to the log
+        "synchronous": "NORMAL",        # Durable at checkpoints, safe with WAL
+        "cache_size": -16000,           # Page cache in KiB (negative) -> 16 MB
+        "mmap_size": 64 * 1024 * 1024,  # Memory-mapped I/O for reads
+        "temp_store": "MEMORY",         # Temp tables/ sort spills in memory
+    }
+
+    def __init__(self, db_name=None, pragmas=None, user_id=DEFAULT_USER_ID):
+        """
+        Initializes new DatabaseStorage object, opens its connection and creates tables.
+
+        Args:
+            db_name (str, optional):    Database file, defaults to 'habits.db'.
+            pragmas (dict, optional):   PRAGMA overrides merged into DEFAULT_PRAGMAS.
+            user_id (int, optional):    User partition all loads/ saves/ deletes are scoped to.
+        """
+        if db_name is not None:
+            self._db_name = db_name
+        self._pragmas = {**self.DEFAULT_PRAGMAS, **(pragmas or {})}
+        self._conn = None
+        self.user_id = user_id
+        self.known_version = None   # data_version() the loaded habits reflect, see load_all_habits()
         self._initialize_db()
 
+    def for_user(self, user_id):
+        """
+        Returns storage view scoped to another user, sharing this storage's connection.
+
+        Args:
+            user_id (int):      User partition of the view.
+
+        Returns:
+            DatabaseStorage:    View; close the owning storage, not the view.
+        """
+        view = copy.copy(self)
+        view._conn = self.connection
+        view.user_id = user_id
+        return view
+
+    @property
+    def db_name(self):
+        """str: Database file."""
+        return self._db_name
+
+    @property
+    def connection(self):
+        """sqlite3.Connection: Persistent connection, opened and tuned on first use."""
+        if self._conn is None:
+            self._conn = self._connect()
+        return self._conn
+
+    def _connect(self, **kwargs):
+        """Opens new connection tuned with the configured pragmas (kwargs passed to sqlite3.connect)."""
+        factory = instrumentation.InstrumentedConnection if instrumentation.is_enabled() else sqlite3.Connection
+        conn = sqlite3.connect(self._db_name, factory=factory, **kwargs)
+        for pragma, value in self._pragmas.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        return conn
+
+    def close(self):
+        """Closes the persistent connection (reopened lazily on next use)."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def _initialize_db(self):
         """
-        Initializes database tables habits (static) and completions (dynamic) by SQL instructions.
+        Initializes database schema, migrating existing databases in place to SCHEMA_VERSION.
 
-        Uses context manager for auto-closing connection.
+        Schema version is tracked in PRAGMA user_version (0 == legacy/ new database).
+        Missing version steps run their _migrate_to_v<N> methods in one transaction,
+        followed by a fleet-wide streak recompute if a step asked for it.
         """
-        with sqlite3.connect(self._db_name) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                           CREATE TABLE IF NOT EXISTS habits
-                           (
-                               habit_id INTEGER PRIMARY KEY,
-                               name TEXT NOT NULL,
-                               description TEXT NOT NULL,
-                               period TEXT NOT NULL
-                           )
-                           """)
-            cursor.execute("""
-                           CREATE TABLE IF NOT EXISTS completions
-                           (
-                               id INTEGER PRIMARY KEY,
-                               habit_id INTEGER,
-                               completed_dates TEXT,
-                               FOREIGN KEY (habit_id) REFERENCES habits(habit_id)
-                           )
-                           """)
-            conn.commit()
+        conn = self.connection
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == self.SCHEMA_VERSION:
+            return  # Schema is current, skip DDL checks
+        if version > self.SCHEMA_VERSION:
+            raise RuntimeError(f"{self._db_name} has schema version {version}, "
+                               f"this app supports up to {self.SCHEMA_VERSION}")
 
-    def save_habit(self, habit):  # Saves current state of a habit to database
-        """Saves current habit state to database (static metadata + dynamic completions)."""
-        with sqlite3.connect(self._db_name) as conn:
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
             cursor = conn.cursor()
+            recompute = False
+            for target in range(version + 1, self.SCHEMA_VERSION + 1):
+                recompute |= bool(getattr(self, f"_migrate_to_v{target}")(cursor))
+            if recompute:
+                self._recompute_streak_columns(cursor, all_users=True)
+            conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
 
-            # Saves/updates static metadata
-            if habit.habit_id:
-                cursor.execute("""
+    def _migrate_to_v1(self, cursor):
+        """
+        Schema v1: habits (static) and completions (dynamic) tables by SQL instructions.
+
+        Deduplicates legacy completion rows and adds unique index on (habit_id, completed_dates),
+        used for per-habit lookups and INSERT OR IGNORE on save.
+        """
+        cursor.execute("""
+                       CREATE TABLE IF NOT EXISTS habits
+                       (
+                           habit_id INTEGER PRIMARY KEY,
+                           name TEXT NOT NULL,
+                           description TEXT NOT NULL,
+                           period TEXT NOT NULL
+                       )
+                       """)
+        cursor.execute("""
+                       CREATE TABLE IF NOT EXISTS completions
+                       (
+                           id INTEGER PRIMARY KEY,
+                           habit_id INTEGER,
+                           completed_dates TEXT,
+                           FOREIGN KEY (habit_id) REFERENCES habits(habit_id)
+                       )
+                       """)
+        cursor.execute("""
+                       DELETE FROM completions
+                       WHERE id NOT IN (SELECT MIN(id) FROM completions GROUP BY habit_id, completed_dates)
+                       """)
+        cursor.execute("""
+                       CREATE UNIQUE INDEX IF NOT EXISTS idx_completions_habit_date
+                       ON completions (habit_id, completed_dates)
+                       """)
+
+    def _migrate_to_v2(self, cursor):
+        """
+        Schema v2: materialized streak summary on habits rows, kept in step by save_habit().
+
+        Lets load_all_habits() read metadata only; backfilled from existing completions (returns True).
+        """
+        cursor.execute("ALTER TABLE habits ADD COLUMN current_streak INTEGER NOT NULL DEFAULT 0")
+        cursor.execute("ALTER TABLE habits ADD COLUMN longest_streak INTEGER NOT NULL DEFAULT 0")
+        cursor.execute("ALTER TABLE habits ADD COLUMN last_completed TEXT")
+        cursor.execute("ALTER TABLE habits ADD COLUMN completion_count INTEGER NOT NULL DEFAULT 0")
+        return True
+
+    def _migrate_to_v3(self, cursor):
+        """
+        Schema v3: user_id partition on habits and completions (existing rows -> DEFAULT_USER_ID).
+
+        Composite indexes lead with user_id, so per-user loads are index range scans regardless of total users.
+        Replaces idx_completions_habit_date (all completion queries are scoped by user).
+        """
+        cursor.execute(f"ALTER TABLE habits ADD COLUMN user_id INTEGER NOT NULL DEFAULT {self.DEFAULT_USER_ID}")
+        cursor.execute(f"ALTER TABLE completions ADD COLUMN user_id INTEGER NOT NULL DEFAULT {self.DEFAULT_USER_ID}")
+        cursor.execute("""
+                       UPDATE completions
+                       SET user_id = (SELECT user_id FROM habits WHERE habits.habit_id = completions.habit_id)
+                       WHERE habit_id IN (SELECT habit_id FROM habits)
+                       """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_habits_user ON habits (user_id, habit_id)")
+        cursor.execute("""
+                       CREATE UNIQUE INDEX IF NOT EXISTS idx_completions_user_habit_date
+                       ON completions (user_id, habit_id, completed_dates)
+                       """)
+        cursor.execute("DROP INDEX IF EXISTS idx_completions_habit_date")
+
+    def _migrate_to_v4(self, cursor):
+        """
+        Schema v4: optional bitmap encoding of completion histories (habits.encoding 'rows' or 'bitmap').
+
+        Bitmap-encoded habits keep one BLOB (one bit per day since anchor ordinal) in completion_bitmaps,
+        loaded instead of parsing completion rows. Completion rows stay the source of truth for SQL queries,
+        the BLOB is kept in step by save_habit() like the streak summary.
+        """
+        cursor.execute("ALTER TABLE habits ADD COLUMN encoding TEXT NOT NULL DEFAULT 'rows'")
+        cursor.execute("""
+                       CREATE TABLE IF NOT EXISTS completion_bitmaps
+                       (
+                           user_id INTEGER NOT NULL,
+                           habit_id INTEGER NOT NULL,
+                           anchor INTEGER NOT NULL,
+                           bits BLOB NOT NULL,
+                           PRIMARY KEY (user_id, habit_id)
+                       ) WITHOUT ROWID
+                       """)
+
+    def _migrate_to_v5(self, cursor):
+        """
+        Schema v5: meta table with a random database_id and a change counter, bumped by every write of this class.
+
+        Together (data_version()) they tell whether a database changed since a snapshot of it was taken
+        (see snapshot.py). Unlike PRAGMA data_version the counter persists across connections.
+        """
+        cursor.execute("""
+                       CREATE TABLE IF NOT EXISTS meta
+                       (
+                           key TEXT PRIMARY KEY,
+                           value INTEGER NOT NULL
+                       ) WITHOUT ROWID
+                       """)
+        cursor.executemany("INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)",
+                           [("database_id", random.getrandbits(63)), ("changes", 0)])
+
+    def _migrate_to_v6(self, cursor):
+        """
+        Schema v6: completion_deletes counter in meta, bumped with changes whenever completion rows are deleted.
+
+        Inserts only append rows with growing ids, so completion archives (archive.py) can be refreshed from
+        the rows after their last id as long as this counter is unchanged.
+        """
+        cursor.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('completion_deletes', 0)")
+
+    def data_version(self):
+        """
+        Returns stored change version of the database (all users).
+
+        Returns:
+            tuple [int, int]:   (database_id, changes), changes grows with every committed write.
+        """
+        rows = dict(self.connection.execute("SELECT key, value FROM meta WHERE key IN ('database_id', 'changes')"))
+        return rows["database_id"], rows["changes"]
+
+    def completion_version(self):
+        """
+        Returns version of the completion rows' deletions (all users).
+
+        Returns:
+            tuple [int, int]:   (database_id, completion_deletes); while unchanged, completion rows were only added.
+        """
+        rows = dict(self.connection.execute(
+            "SELECT key, value FROM meta WHERE key IN ('database_id', 'completion_deletes')"))
+        return rows["database_id"], rows["completion_deletes"]
+
+    def _bump_changes(self, cursor, deletes=False):
+        """
+        Increments the change counter in the caller's transaction, known_version follows it.
+
+        Args:
+            cursor (sqlite3.Cursor):    Cursor of the write transaction.
+            deletes (bool):             Completion rows are deleted too (bumps completion_deletes as well).
+        """
+        keys = "('changes', 'completion_deletes')" if deletes else "('changes')"
+        cursor.execute(f"UPDATE meta SET value = value + 1 WHERE key IN {keys}")
+        if self.known_version is not None:
+            database_id, changes = self.known_version
+            self.known_version = (database_id, changes + 1)  # Off (and snapshots skipped) if rolled back
+
+    def _grouped_ordinals(self, cursor):
+        """Yields (habit_id, ordinals) for all completions of the user, streamed ordered by habit_id/ date."""
+        rows = cursor.execute(f"""
+            SELECT habit_id, {_SQL_ORDINAL}
+            FROM completions
+            WHERE user_id = ?
+            ORDER BY habit_id, completed_dates
+        """, (self.user_id,))
+        for habit_id, group in groupby(rows, key=itemgetter(0)):
+            yield habit_id, (row[1] for row in group)
+
+    def _recompute_streak_columns(self, cursor, first_id=_MIN_ID, all_users=False, block_rows=200000):
+        """
+        Recomputes materialized streak columns of the user's habits (with habit_id >= first_id) from completions.
+
+        all_users recomputes every partition (fleet-wide, used by migrations).
+        Streams completions in blocks of about block_rows (never splitting a habit), so memory is bounded
+        by the block, not the table. Uses the vectorized batch engine (streaks.py) if NumPy is installed,
+        else Habit.compute_streak() per habit.
+        """
+        if all_users:
+            scope, params = "habit_id >= ?", (first_id,)
+            order = "ORDER BY habit_id, completed_dates"
+        else:
+            scope, params = "user_id = ? AND habit_id >= ?", (self.user_id, first_id)
+            order = "ORDER BY user_id, habit_id, completed_dates"
+        periods = dict(cursor.execute(f"SELECT habit_id, period FROM habits WHERE {scope}", params))
+        cursor.execute(f"""
+                       UPDATE habits
+                       SET current_streak = 0, longest_streak = 0, last_completed = NULL, completion_count = 0
+                       WHERE {scope}
+                       """, params)
+        rows = cursor.connection.execute(f"""
+            SELECT habit_id, {_SQL_ORDINAL}
+            FROM completions
+            WHERE {scope}
+            {order}
+        """, params)
+        for block in _habit_blocks(rows, block_rows):
+            cursor.executemany("""
                                UPDATE habits
-                               SET name = ?, description = ?,period = ?
+                               SET current_streak = ?, longest_streak = ?, last_completed = ?, completion_count = ?
                                WHERE habit_id = ?
-                               """, (habit.name, habit.description, habit.period, habit.habit_id))
-            else:
-                cursor.execute("""
-                               INSERT INTO habits (name, description, period)
-                               VALUES (?, ?, ?)
-                               """, (habit.name, habit.description, habit.period))
-                habit.habit_id = int(cursor.lastrowid) # writes new habit.habit_id as last row of habits table
+                               """, _streak_updates(block, periods))
+
+    def _completion_arrays(self, cursor):
+        """Returns all completions of the user as NumPy arrays (habit_ids, ordinals), sorted by habit_id/ date."""
+        np = _batch_streaks().np
+        rows = cursor.execute(f"""
+            SELECT habit_id, {_SQL_ORDINAL}
+            FROM completions
+            WHERE user_id = ?
+            ORDER BY habit_id, completed_dates
+        """, (self.user_id,)).fetchall()
+        table = np.array(rows, dtype=np.int64).reshape(-1, 2)
+        return table[:, 0], table[:, 1]
+
+    def load_completion_rows(self, after_id=0):
+        """
+        Returns completions of the user added after a completions row id (all for 0), for completion archives.
+
+        Args:
+            after_id (int):     Last completions.id already read.
+
+        Returns:
+            list [tuple]:       (id, habit_id, ordinal) rows ordered by habit_id/ date.
+        """
+        return self.connection.execute(f"""
+            SELECT id, habit_id, {_SQL_ORDINAL}
+            FROM completions
+            WHERE user_id = ? AND id > ?
+            ORDER BY habit_id, completed_dates
+        """, (self.user_id, after_id)).fetchall()
+
+    @timed("db.recompute_streaks")
+    def recompute_streaks(self):
+        """
+        Bulk recompute: refreshes stored streak summaries of all habits of the user in one transaction.
 
-            # Sync completions (insert new only)
+        Use after writing completions outside save_habit() (e.g. imports or manual SQL).
+        Bitmaps of bitmap-encoded habits are re-encoded from their completions as well.
+        """
+        with self.connection as conn:
+            cursor = conn.cursor()
+            self._recompute_streak_columns(cursor)
+            cursor.execute("SELECT habit_id FROM habits WHERE user_id = ? AND encoding = 'bitmap'", (self.user_id,))
+            self._write_bitmaps(cursor, [row[0] for row in cursor.fetchall()])
+            self._bump_changes(cursor)
+
+    @timed("db.save_habit")
+    def save_habit(self, habit):  # Saves current state of a habit to database
+        """
+        Saves unsaved changes of a habit to database (static metadata + dynamic completions).
+
+        Writes only the delta tracked by the habit (see Habit.get_changes()) in one transaction.
+        No-op for clean habits that already have an ID.
+        """
+        if habit.habit_id and not habit.is_dirty:
+            return
+        self._write_habits([habit])
+
+    @timed("db.save_habits")
+    def save_habits(self, habits):
+        """
+        Bulk save: writes unsaved changes of many habits in one transaction (one commit/ fsync).
+
+        Args:
+            habits (iterable [Habit]):  Habits to save, clean habits with an ID are skipped.
+        """
+        dirty = [habit for habit in habits if not habit.habit_id or habit.is_dirty]
+        if dirty:
+            self._write_habits(dirty)
+
+    def _write_habits(self, habits):
+        """Writes habits in one transaction; on failure all changes stay pending and new habits get no ID."""
+        new = [habit for habit in habits if not habit.habit_id]
+        try:
+            with self.connection as conn:
+                cursor = conn.cursor()
+                for habit in habits:
+                    self._write_habit(cursor, habit)
+        except Exception:
+            for habit in new:
+                habit.habit_id = None
+            raise
+        for habit in habits:
+            habit.mark_saved()
+
+    def _write_habit(self, cursor, habit):
+        """Writes metadata, streak summary and completion delta of one habit (caller commits)."""
+        changes = habit.get_changes()   # Taken before _streak_summary(), which may load history
+        self._bump_changes(cursor, deletes=bool(habit.habit_id and (changes.removed or changes.replaced)))
+
+        # Saves/updates static metadata and streak summary
+        summary = _streak_summary(habit)
+        new = not habit.habit_id
+        if new:
+            cursor.execute("""
+                           INSERT INTO habits (user_id, name, description, period,
+                                               current_streak, longest_streak, last_completed, completion_count,
+                                               encoding)
+                           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                           """, (self.user_id, habit.name, habit.description, habit.period) + summary
+                                + (habit.ENCODING,))
+            habit.habit_id = int(cursor.lastrowid) # writes new habit.habit_id as last row of habits table
+            added, removed = habit.completed_dates, ()
+        else:
             cursor.execute("""
-                           SELECT completed_dates
-                           FROM completions
-                           WHERE habit_id = ?
-                           """, (habit.habit_id,))
-            existing_dates = {row[0] for row in cursor.fetchall()}
-
-            for d in habit.completed_dates:
-                date = d.isoformat()
-                if date not in existing_dates:
-                    cursor.execute("""
-                                   INSERT into completions (habit_id, completed_dates)
-                                   VALUES (?, ?)
-                                   """, (habit.habit_id, date))
-            conn.commit()
+                           UPDATE habits
+                           SET name = ?, description = ?,period = ?,
+                               current_streak = ?, longest_streak = ?, last_completed = ?, completion_count = ?
+                           WHERE user_id = ? AND habit_id = ?
+                           """, (habit.name, habit.description, habit.period) + summary
+                                + (self.user_id, habit.habit_id))
+            if changes.replaced:
+                cursor.execute("DELETE FROM completions WHERE user_id = ? AND habit_id = ?",
+                               (self.user_id, habit.habit_id))
+                added, removed = habit.completed_dates, ()
+            else:
+                added = map(date.fromordinal, changes.added)
+                removed = map(date.fromordinal, changes.removed)
+
+        # Sync completion delta (unique index skips already stored dates)
+        cursor.executemany("""
+                           INSERT OR IGNORE INTO completions (user_id, habit_id, completed_dates)
+                           VALUES (?, ?, ?)
+                           """, ((self.user_id, habit.habit_id, d.isoformat()) for d in added))
+        cursor.executemany("""
+                           DELETE FROM completions WHERE user_id = ? AND habit_id = ? AND completed_dates = ?
+                           """, ((self.user_id, habit.habit_id, d.isoformat()) for d in removed))
+
+        # Sync BLOB of bitmap-encoded habits: written from a BitmapHabit, else dropped when completions
+        # changed (load_completion_bitmap() then re-encodes from rows, e.g. for habits loaded before encoding)
+        if new or changes.added or changes.removed or changes.replaced:
+            if habit.ENCODING == "bitmap":
+                bitmap = habit.completion_bitmap()
+                cursor.execute("""
+                               INSERT OR REPLACE INTO completion_bitmaps (user_id, habit_id, anchor, bits)
+                               VALUES (?, ?, ?, ?)
+                               """, (self.user_id, habit.habit_id, bitmap.anchor, bitmap.to_blob()))
+            elif not new:
+                cursor.execute("DELETE FROM completion_bitmaps WHERE user_id = ? AND habit_id = ?",
+                               (self.user_id, habit.habit_id))
 
     # LOADING FROM DATABASE
-    @classmethod
-    def load_habit(cls, habit_id): # Habit retrieval by its ID from storage
+    @timed("db.load_habit")
+    def load_habit(self, habit_id): # Habit retrieval by its ID from storage
         """Retrieves single habit by ID with completions and metadata."""
-        with sqlite3.connect(cls._db_name) as conn:
+        with self.connection as conn:
             cursor = conn.cursor()
 
             # Fetch habit metadata
             cursor.execute("""
-                SELECT name, description, period, habit_id FROM habits WHERE habit_id = ?
-            """, (habit_id,))
+                SELECT name, description, period, habit_id, encoding FROM habits WHERE user_id = ? AND habit_id = ?
+            """, (self.user_id, habit_id))
             result = cursor.fetchone()
             if not result:
                 return None
-            name, description, period, habit_id = result
+            name, description, period, habit_id, encoding = result
+
+            if encoding == "bitmap":    # One BLOB instead of a row per completion
+                habit = BitmapHabit(name=name, description=description, period=period, habit_id=int(habit_id))
+                habit.load_ordinals(self.load_completion_bitmap(habit_id))
+                habit.mark_saved()
+                return habit
 
             habit = Habit(name=result[0], description=result[1], period=result[2], habit_id=int(result[3]))
 
             # Fetch habit completions
             cursor.execute("""
-                SELECT completed_dates FROM completions WHERE habit_id = ?
-            """, (habit_id,))
+                SELECT completed_dates FROM completions WHERE user_id = ? AND habit_id = ?
+            """, (self.user_id, habit_id))
 
             habit.completed_dates = [dt.fromisoformat(row[0]).date() for row in cursor.fetchall()]
+            habit.mark_saved()  # Loaded state equals stored state
 
             return habit
 
+    @timed("db.load_completion_ordinals")
+    def load_completion_ordinals(self, habit_id):
+        """
+        Loads completion history of one habit as sorted date ordinals (index range scan).
+
+        Args:
+            habit_id (int):     ID of habit.
+
+        Returns:
+            list [int]:         Sorted, unique date ordinals.
+        """
+        rows = self.connection.execute(f"""
+            SELECT {_SQL_ORDINAL} FROM completions WHERE user_id = ? AND habit_id = ? ORDER BY completed_dates
+        """, (self.user_id, habit_id))
+        return [row[0] for row in rows]
+
+    @timed("db.load_completion_bitmap")
+    def load_completion_bitmap(self, habit_id):
+        """
+        Loads completion history of a bitmap-encoded habit (one primary key lookup, no per-date parsing).
+
+        Args:
+            habit_id (int):     ID of habit.
+
+        Returns:
+            CompletionBitmap:   Completion history (encoded from completion rows if no BLOB is stored).
+        """
+        row = self.connection.execute("SELECT anchor, bits FROM completion_bitmaps WHERE user_id = ? AND habit_id = ?",
+                                      (self.user_id, habit_id)).fetchone()
+        if row is None:
+            return CompletionBitmap(self.load_completion_ordinals(habit_id))
+        return CompletionBitmap.from_blob(*row)
+
+    def _write_bitmaps(self, cursor, habit_ids):
+        """(Re-)encodes bitmaps of habits from their completion rows (caller commits)."""
+        cursor.executemany("""
+                           INSERT OR REPLACE INTO completion_bitmaps (user_id, habit_id, anchor, bits)
+                           VALUES (?, ?, ?, ?)
+                           """, ((self.user_id, habit_id, bitmap.anchor, bitmap.to_blob())
+                                 for habit_id in habit_ids
+                                 for bitmap in [CompletionBitmap(self.load_completion_ordinals(habit_id))]))
+
+    @timed("db.encode_bitmaps")
+    def encode_bitmaps(self, habit_ids=None):
+        """
+        Migrates habits of the user to bitmap encoding in one transaction.
+
+        Args:
+            habit_ids (list [int], optional):   Habits to migrate (default all habits of the user).
+
+        Returns:
+            int:                                Number of habits migrated (already encoded ones are skipped).
+
+        Note:
+            Habits are loaded as BitmapHabit from then on; completion rows are kept (SQL analytics, export).
+        """
+        with self.connection as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT habit_id FROM habits WHERE user_id = ? AND encoding = 'rows'", (self.user_id,))
+            ids = [row[0] for row in cursor.fetchall()]
+            if habit_ids is not None:
+                ids = sorted(set(ids) & set(habit_ids))
+            self._write_bitmaps(cursor, ids)
+            cursor.executemany("UPDATE habits SET encoding = 'bitmap' WHERE user_id = ? AND habit_id = ?",
+                               ((self.user_id, habit_id) for habit_id in ids))
+            self._bump_changes(cursor)
+        return len(ids)
+
+    @timed("db.decode_bitmaps")
+    def decode_bitmaps(self, habit_ids=None):
+        """
+        Migrates bitmap-encoded habits of the user back to row encoding in one transaction.
+
+        Args:
+            habit_ids (list [int], optional):   Habits to migrate (default all habits of the user).
+
+        Returns:
+            int:                                Number of habits migrated.
+
+        Note:
+            Completion rows are kept in step with the bitmaps, so only the BLOBs are dropped.
+        """
+        with self.connection as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT habit_id FROM habits WHERE user_id = ? AND encoding = 'bitmap'", (self.user_id,))
+            ids = [row[0] for row in cursor.fetchall()]
+            if habit_ids is not None:
+                ids = sorted(set(ids) & set(habit_ids))
+            params = [(self.user_id, habit_id) for habit_id in ids]
+            cursor.executemany("DELETE FROM completion_bitmaps WHERE user_id = ? AND habit_id = ?", params)
+            cursor.executemany("UPDATE habits SET encoding = 'rows' WHERE user_id = ? AND habit_id = ?", params)
+            self._bump_changes(cursor)
+        return len(ids)
+
+    @timed("db.load_habit_ids")
     def load_habit_ids(self):
-        """Gets all habit IDs from database."""
-        with sqlite3.connect(self._db_name) as conn:
+        """Gets all habit IDs of the user from database."""
+        with self.connection as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT habit_id FROM habits")
+            cursor.execute("SELECT habit_id FROM habits WHERE user_id = ? ORDER BY habit_id", (self.user_id,))
             return [(row[0]) for row in cursor.fetchall()]
 
-    def load_all_habits(self):
-        """Loads all habits, populate completions, and recompute streaks."""
-        ids = self.load_habit_ids()
-        habits = []
-        for habit_id in ids:
-            habit = self.load_habit(habit_id)
-            if habit:
-                habit.compute_streak()  # Recompute streak here
-                habits.append(habit)    # Create new in-memory habits list
+    def _summary_habit(self, row):
+        """Builds clean Habit with stored streak summary and lazy history from a SUMMARY_FIELDS row."""
+        (habit_id, name, description, period, current_streak, longest_streak, last_completed, completion_count,
+         encoding) = row
+        habit_class, load = self.history_source(encoding)
+        return habit_class.from_summary(int(habit_id), name, description, period, current_streak, longest_streak,
+                                        date.fromisoformat(last_completed).toordinal() if last_completed else None,
+                                        completion_count, load)
+
+    def history_source(self, encoding):
+        """Returns (habit class, history loader method taking a habit_id) of a stored encoding (habits.encoding)."""
+        if encoding == "bitmap":
+            return BitmapHabit, self.load_completion_bitmap
+        return Habit, self.load_completion_ordinals
+
+    @timed("db.load_habit_summary")
+    def load_habit_summary(self, habit_id):
+        """
+        Loads one habit with its stored streak summary only (one primary key lookup, history loaded on demand).
+
+        Args:
+            habit_id (int):     ID of habit.
+
+        Returns:
+            Habit:              Habit if found
+                                None if not found
+        """
+        row = self.connection.execute(f"""
+            SELECT {', '.join(SUMMARY_FIELDS)} FROM habits WHERE user_id = ? AND habit_id = ?
+        """, (self.user_id, habit_id)).fetchone()
+        return self._summary_habit(row) if row else None
+
+    def find_habit_ids(self, name):
+        """Returns IDs of the user's habits named name (ordered by ID)."""
+        rows = self.connection.execute("SELECT habit_id FROM habits WHERE user_id = ? AND name = ? ORDER BY habit_id",
+                                       (self.user_id, name))
+        return [row[0] for row in rows]
 
-        return habits
+    def habit_summaries(self, period=None):
+        """
+        Reads stored habit summaries without building Habit objects (habits table only).
+
+        Args:
+            period (str, optional):     Only habits of this periodicity.
+
+        Returns:
+            list [tuple]:               One row per habit in SUMMARY_FIELDS order, ordered by ID.
+        """
+        sql = f"SELECT {', '.join(SUMMARY_FIELDS)} FROM habits WHERE user_id = ?"
+        params = (self.user_id,)
+        if period is not None:
+            sql += " AND period = ?"
+            params += (period.lower(),)
+        return self.connection.execute(sql + " ORDER BY habit_id", params).fetchall()
+
+    def habit_stats(self):
+        """
+        Aggregates stored habit summaries in SQL.
+
+        Returns:
+            dict:   habits, completions (counts), periods ({period: habits} for every stored period) and longest
+                    (SUMMARY_FIELDS row of the habit with the historically longest streak, None without habits).
+        """
+        conn = self.connection
+        rows = conn.execute("""
+            SELECT period, COUNT(*), SUM(completion_count)
+            FROM habits WHERE user_id = ?
+            GROUP BY period ORDER BY period
+        """, (self.user_id,)).fetchall()
+        periods = {period: count for period, count, _ in rows}
+        longest = conn.execute(f"""
+            SELECT {', '.join(SUMMARY_FIELDS)} FROM habits WHERE user_id = ?
+            ORDER BY longest_streak DESC, habit_id LIMIT 1
+        """, (self.user_id,)).fetchone()
+        return {"habits": sum(periods.values()), "completions": sum(row[2] for row in rows),
+                "periods": periods, "longest": longest}
+
+    # SQL ANALYTICS (aggregated inside SQLite, only result rows are returned)
+    def _completions_in_range(self, start, end, habit_id, join="JOIN"):
+        """
+        Returns FROM/ WHERE clause and parameters joining the user's habits to their completions in [start, end].
+
+        Driven by the habits table, each habit's completions are read by an index range seek
+        on (user_id, habit_id, completed_dates). join 'LEFT JOIN' keeps habits without completions.
+        """
+        sql = f"""
+            FROM habits h
+            {join} completions c ON c.user_id = h.user_id AND c.habit_id = h.habit_id
+                                AND c.completed_dates >= ? AND c.completed_dates < ?
+            WHERE h.user_id = ?
+        """
+        params = [start.isoformat(), (end + timedelta(days=1)).isoformat(), self.user_id]
+        if habit_id is not None:
+            sql += " AND h.habit_id = ?"
+            params.append(habit_id)
+        return sql, params
+
+    @timed("db.completion_rates")
+    def completion_rates(self, start, end, habit_id=None):
+        """
+        Computes completion rate per habit over a date range with one GROUP BY query.
+
+        Args:
+            start (date):               First day of range.
+            end (date):                 Last day of range (inclusive).
+            habit_id (int, optional):   Only this habit (default all habits of the user).
+
+        Returns:
+            list [tuple]:               (habit_id, name, period, completed periods, periods in range, rate)
+                                        per habit, ordered by ID.
+
+        Note:
+            Periods are buckets of the habit's period (periods.py), unknown periods count days:
+            daily:      completed days/ days in range
+            weekly:     ISO weeks (Monday-Sunday) with at least one completion/ weeks touched by the range
+        """
+        sql, params = self._completions_in_range(start, end, habit_id, join="LEFT JOIN")
+        bucket = _sql_bucket("h.period", _SQL_ORDINAL, "c.completed_dates", default=PERIODS["daily"])
+        rows = self.connection.execute(f"""
+            SELECT h.habit_id, h.name, h.period, COUNT(DISTINCT {bucket})
+            {sql}
+            GROUP BY h.habit_id
+            ORDER BY h.habit_id
+        """, params)
+        rates = []
+        for habit_id, name, period, done in rows:
+            rule = PERIODS.get(period, PERIODS["daily"])
+            periods = rule.bucket(end.toordinal()) - rule.bucket(start.toordinal()) + 1
+            rates.append((habit_id, name, period, done, periods, done / periods if periods > 0 else 0.0))
+        return rates
+
+    @timed("db.completion_counts")
+    def completion_counts(self, start, end, bucket="week", habit_id=None):
+        """
+        Counts completions per habit and calendar week or month with one GROUP BY query.
+
+        Args:
+            start (date):               First day of range.
+            end (date):                 Last day of range (inclusive).
+            bucket (str):               'week' (ISO week, keyed by its Monday) or 'month' (keyed by its 1st day).
+            habit_id (int, optional):   Only this habit (default all habits of the user).
+
+        Returns:
+            list [tuple]:               (habit_id, bucket start ISO date, completions), ordered by habit and bucket.
+                                        Buckets without completions are omitted.
+        """
+        # Integer bucket ids per row (periods.py), converted to dates for result rows only
+        buckets = {"week": PERIODS["weekly"], "month": PERIODS["monthly"]}
+        if bucket not in buckets:
+            raise ValueError(f"bucket must be one of {tuple(buckets)}")
+        rule = buckets[bucket]
+        sql, params = self._completions_in_range(start, end, habit_id)
+        rows = self.connection.execute(f"""
+            SELECT h.habit_id, {rule.sql(_SQL_ORDINAL, "c.completed_dates")} AS bucket, COUNT(*)
+            {sql}
+            GROUP BY h.habit_id, bucket
+            ORDER BY h.habit_id, bucket
+        """, params)
+        return [(habit_id, date.fromordinal(rule.first_day(key)).isoformat(), count) for habit_id, key, count in rows]
 
+    def _streaks_sql(self, habit_id=None):
+        """
+        Returns query and parameters computing (habit_id, current_streak, longest_streak) per completed habit.
+
+        Gaps and islands: each completion gets its period bucket id (periods.py: day, ISO week, month ordinal).
+        One window pass in index order compares it with its neighbours (LAG/ LEAD): a run (island) starts where
+        the id exceeds its predecessor's + 1 and ends where the successor's exceeds it + 1, further completions
+        in the same bucket are neutral. Only start/ end rows remain, so a run's length is its end id - start id + 1
+        (LEAD). Same rules as Habit.compute_streak(); unknown periods never continue a run.
+        """
+        habit_filter, params = "", [self.user_id]
+        if habit_id is not None:
+            habit_filter = "AND h.habit_id = ?"
+            params.append(habit_id)
+        sql = f"""
+            WITH ordinals AS (
+                SELECT c.habit_id, h.period, c.completed_dates, {_SQL_ORDINAL} AS o
+                FROM habits h
+                JOIN completions c ON c.user_id = h.user_id AND c.habit_id = h.habit_id
+                WHERE h.user_id = ? {habit_filter}
+            ),
+            keyed AS (
+                SELECT habit_id, completed_dates, {_sql_bucket("period", "o", "completed_dates")} AS k
+                FROM ordinals
+            ),
+            neighbours AS (
+                SELECT habit_id, completed_dates, k, LAG(k) OVER w AS previous_k, LEAD(k) OVER w AS next_k
+                FROM keyed
+                WINDOW w AS (PARTITION BY habit_id ORDER BY completed_dates)
+            ),
+            bounds AS (
+                SELECT habit_id, completed_dates, k,
+                       previous_k IS NULL OR k > previous_k + 1 AS is_start,
+                       next_k IS NULL OR next_k > k + 1 AS is_end
+                FROM neighbours
+                WHERE previous_k IS NULL OR k > previous_k + 1 OR next_k IS NULL OR next_k > k + 1
+            ),
+            runs AS (
+                SELECT habit_id, is_start,
+                       CASE WHEN is_end THEN 1 ELSE LEAD(k) OVER r - k + 1 END AS length,
+                       CASE WHEN is_end THEN LEAD(k) OVER r ELSE LEAD(k, 2) OVER r END IS NULL AS is_current
+                FROM bounds
+                WINDOW r AS (PARTITION BY habit_id ORDER BY completed_dates)
+            )
+            SELECT habit_id, MAX(CASE WHEN is_start AND is_current THEN length END) AS current_streak,
+                   MAX(CASE WHEN is_start THEN length END) AS longest_streak
+            FROM runs
+            GROUP BY habit_id
+        """
+        return sql, params
+
+    @timed("db.streak_sql")
+    def streak_sql(self, habit_id):
+        """
+        Computes current and longest streak of one habit from its completions inside SQLite.
+
+        Args:
+            habit_id (int):         ID of habit.
+
+        Returns:
+            tuple [int, int]:       (current_streak, longest_streak), (0, 0) without completions,
+                                    None if the habit doesn't exist.
+        """
+        if self.load_habit_summary(habit_id) is None:
+            return None
+        row = self.connection.execute(*self._streaks_sql(habit_id)).fetchone()
+        return (row[1], row[2]) if row else (0, 0)
+
+    @timed("db.streaks_sql")
+    def streaks_sql(self):
+        """
+        Computes current and longest streaks of all habits of the user inside SQLite (one query).
+
+        Returns:
+            dict {int: tuple}:      habit_id -> (current_streak, longest_streak), (0, 0) without completions.
+        """
+        streaks = dict.fromkeys(self.load_habit_ids(), (0, 0))
+        sql, params = self._streaks_sql()
+        streaks.update((habit_id, (current, longest)) for habit_id, current, longest in
+                       self.connection.execute(sql, params))
+        return streaks
+
+    @timed("db.top_streaks_sql")
+    def top_streaks_sql(self, n=10, by="longest"):
+        """
+        Ranks habits by streak computed inside SQLite, only the top n rows are returned.
+
+        Args:
+            n (int):                Number of habits.
+            by (str):               'longest' or 'current' streak.
+
+        Returns:
+            list [tuple]:           (habit_id, name, period, current_streak, longest_streak), best first
+                                    (ties by ID), habits without completions excluded.
+        """
+        columns = {"current": "s.current_streak", "longest": "s.longest_streak"}
+        if by not in columns:
+            raise ValueError(f"by must be one of {tuple(columns)}")
+        sql, params = self._streaks_sql()
+        return self.connection.execute(f"""
+            SELECT h.habit_id, h.name, h.period, s.current_streak, s.longest_streak
+            FROM ({sql}) AS s
+            JOIN habits h ON h.user_id = ? AND h.habit_id = s.habit_id
+            ORDER BY {columns[by]} DESC, h.habit_id
+            LIMIT ?
+        """, params + [self.user_id, n]).fetchall()
+
+    @timed("db.load_all_habits")
+    def load_all_habits(self, with_history=False):
+        """
+        Loads all habits of the user with their stored streak summary (index range scan of the user partition).
+
+        Args:
+            with_history (bool):    Also bulk-load all completion histories (default: lazy per habit).
+
+        Returns:
+            list [Habit]:           Habits ordered by ID.
+
+        Note:
+            Reads habits rows only, cost scales with number of habits. Each habit fetches its
+            completion history on first use via load_completion_ordinals().
+            with_history streams all completions in one query ordered by habit_id and recomputes streaks.
+        """
+        self.known_version = self.data_version()    # Read first: later writes make the version stale, not wrong
+        with self.connection as conn:
+            habits = {}
+            for row in conn.execute(f"""
+                SELECT {', '.join(SUMMARY_FIELDS)} FROM habits WHERE user_id = ? ORDER BY habit_id
+            """, (self.user_id,)):
+                habits[row[0]] = self._summary_habit(row)
+
+            if with_history:
+                for habit in habits.values():
+                    habit.load_ordinals(())
+                streaks = _batch_streaks()
+                if streaks is None:
+                    for habit_id, ordinals in self._grouped_ordinals(conn.cursor()):
+                        habit = habits.get(habit_id)
+                        if habit:
+                            habit.load_ordinals(ordinals)
+                    for habit in habits.values():
+                        habit.compute_streak()  # Recompute streak here
+                else:
+                    np = streaks.np
+                    row_ids, ordinals = self._completion_arrays(conn.cursor())
+                    ordinals = ordinals.astype(np.intc)
+                    starts = np.flatnonzero(np.diff(row_ids, prepend=-1))   # First row of each habit
+                    ends = np.append(starts[1:], len(row_ids))
+                    for start, end in zip(starts.tolist(), ends.tolist()):
+                        habit = habits.get(int(row_ids[start]))
+                        if habit:
+                            habit.load_ordinals(ordinals[start:end].tobytes())
+                    streaks.compute_habit_streaks(list(habits.values()))  # Recompute streaks in one pass
+
+        return list(habits.values())    # Create new in-memory habits list
+
+    @timed("db.delete_habit")
     def delete_habit(self, habit_id):
         """
         Deletes habit by ID from both tables (completions first).
@@ -142,19 +1020,156 @@ class DatabaseStorage:
             bool:               True if deleted
                                 False if not found
         """
-        with sqlite3.connect(self._db_name) as conn:
+        with self.connection as conn:
+            return self._delete_habit(conn.cursor(), habit_id)
+
+    def _delete_habit(self, cursor, habit_id):
+        """Deletes habit and its completions (caller commits), False if not found."""
+        # Verify exists first
+        cursor.execute("SELECT habit_id FROM habits WHERE user_id = ? AND habit_id = ?", (self.user_id, habit_id))
+        if not cursor.fetchone():
+            return False
+
+        # Deletes completions first
+        cursor.execute("DELETE FROM completions WHERE user_id = ? AND habit_id = ?", (self.user_id, habit_id))
+        cursor.execute("DELETE FROM completion_bitmaps WHERE user_id = ? AND habit_id = ?", (self.user_id, habit_id))
+
+        # Deletes habit
+        cursor.execute("DELETE FROM habits WHERE user_id = ? AND habit_id = ?", (self.user_id, habit_id))
+        self._bump_changes(cursor, deletes=True)
+
+        return True
+
+    # BULK IMPORT/ EXPORT
+    @timed("db.import_records")
+    def import_records(self, records, chunk_size=50000):
+        """
+        Imports habits and completions from an iterable of records (e.g. a generator over a file).
+
+        Args:
+            records (iterable [tuple]): Records in EXPORT_FIELDS order; one per completion, empty completed_date
+                                        for habits without completions. Records sharing a source habit_id
+                                        become one new habit.
+            chunk_size (int):           Completions buffered per executemany, bounds memory.
+
+        Returns:
+            tuple [int, int]:           (habits created, completions inserted)
+
+        Note:
+            Runs in one transaction, duplicates are skipped by the unique index.
+            Streak summaries of imported habits are recomputed once at the end.
+        """
+        habit_ids = {}  # source habit_id -> new habit_id
+        chunk = []
+        inserted = 0
+        first_id = None
+        with self.connection as conn:
             cursor = conn.cursor()
+            for source_id, name, description, period, completed in records:
+                key = source_id or name
+                habit_id = habit_ids.get(key)
+                if habit_id is None:
+                    cursor.execute("INSERT INTO habits (user_id, name, description, period) VALUES (?, ?, ?, ?)",
+                                   (self.user_id, name, description, period.lower()))
+                    habit_id = habit_ids[key] = cursor.lastrowid
+                    first_id = first_id or habit_id
+                if completed:
+                    parsed = date.fromisoformat(completed)     # Validates date, keeps canonical strings as is
+                    chunk.append((self.user_id, habit_id, completed if len(completed) == 10 else parsed.isoformat()))
+                    if len(chunk) >= chunk_size:
+                        inserted += self._insert_completions(cursor, chunk)
+                        chunk.clear()
+            inserted += self._insert_completions(cursor, chunk)
+            if first_id is not None:
+                self._recompute_streak_columns(cursor, first_id)
+                self._bump_changes(cursor)
+        return len(habit_ids), inserted
+
+    def _insert_completions(self, cursor, rows):
+        """Inserts (user_id, habit_id, ISO date) rows with one executemany, returns number of new rows."""
+        if not rows:
+            return 0
+        cursor.executemany("INSERT OR IGNORE INTO completions (user_id, habit_id, completed_dates) VALUES (?, ?, ?)",
+                           rows)
+        return cursor.rowcount
+
+    def iter_records(self):
+        """
+        Streams all habits and completions of the user as export records, row by row from one cursor.
+
+        Yields:
+            tuple:  Record in EXPORT_FIELDS order (completed_date None for habits without completions).
+        """
+        cursor = self.connection.execute("""
+            SELECT h.habit_id, h.name, h.description, h.period, c.completed_dates
+            FROM habits h LEFT JOIN completions c ON c.user_id = h.user_id AND c.habit_id = h.habit_id
+            WHERE h.user_id = ?
+            ORDER BY h.habit_id, c.completed_dates
+        """, (self.user_id,))
+        yield from cursor
+
+    @timed("db.import_file")
+    def import_file(self, path, chunk_size=50000):
+        """Imports a CSV or JSONL export file (format by extension), see import_records()."""
+        return self.import_records(read_records(path), chunk_size)
+
+    @timed("db.export_file")
+    def export_file(self, path):
+        """
+        Exports all habits and completions to CSV or JSONL file (format by extension), streaming.
+
+        Args:
+            path (str):     Target file ending in .csv or .jsonl.
+
+        Returns:
+            int:            Number of records written.
+        """
+        file_format = _file_format(path)
+        count = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            if file_format == "csv":
+                writer = csv.writer(f)
+                writer.writerow(EXPORT_FIELDS)
+                for record in self.iter_records():
+                    writer.writerow(record)
+                    count += 1
+            else:
+                for record in self.iter_records():
+                    f.write(json.dumps(dict(zip(EXPORT_FIELDS, record))) + "\n")
+                    count += 1
+        return count
+
+
+def _file_format(path):
+    """Returns 'csv' or 'jsonl' from file extension."""
+    suffix = os.path.splitext(str(path))[1].lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Unsupported file format '{suffix}', use .csv or .jsonl")
 
-            # Verify exists first
-            cursor.execute("SELECT habit_id FROM habits WHERE habit_id = ?", (habit_id,))
-            if not cursor.fetchone():
-                return False
 
-            # Deletes completions first
-            cursor.execute("DELETE FROM completions WHERE habit_id = ?", (habit_id,))
+def read_records(path):
+    """
+    Streams import records from CSV (with header) or JSONL file, one line at a time.
 
-            # Deletes habit
-            cursor.execute("DELETE FROM habits WHERE habit_id = ?", (habit_id,))
+    Args:
+        path (str):     File ending in .csv or .jsonl.
 
-            conn.commit()
-            return True
\ No newline at end of file
+    Yields:
+        tuple:          Record in EXPORT_FIELDS order.
+    """
+    file_format = _file_format(path)
+    with open(path, newline="", encoding="utf-8") as f:
+        if file_format == "csv":
+            reader = csv.reader(f)
+            header = next(reader)
+            columns = [header.index(field) for field in EXPORT_FIELDS]  # Header may reorder fields
+            for row in reader:
+                yield tuple(row[i] for i in columns)
+        else:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield tuple(record.get(field) for field in EXPORT_FIELDS)
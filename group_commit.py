@@ -0,0 +1,170 @@
+"""
+-------------------
+Group Commit Module
+-------------------
+Implements GroupCommitStorage, a thread-safe DatabaseStorage whose writes all go through one writer thread.
+Threads queue saves/ deletes and get concurrent.futures.Future objects back; the writer collects queued
+writes for up to a few milliseconds and commits them together in one transaction (group commit), so
+thousands of check-offs per second cost a handful of commits instead of one each.
+Reads (loads, lazy history) use one connection per thread, WAL lets them run alongside the writer.
+-------------------
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from db import DatabaseStorage
+from instrumentation import timed
+
+_STOP = object()    # Queue sentinel, stops the writer after committing everything queued before it
+
+
+class GroupCommitStorage(DatabaseStorage):
+    """DatabaseStorage safe for concurrent use, with a single group-committing writer thread."""
+
+    def __init__(self, db_name=None, pragmas=None, user_id=DatabaseStorage.DEFAULT_USER_ID,
+                 max_delay=0.002, max_batch=1000):
+        """
+        Initializes new GroupCommitStorage, creates tables and starts the writer thread.
+
+        Args:
+            db_name (str, optional):    Database file, defaults to 'habits.db'.
+            pragmas (dict, optional):   PRAGMA overrides merged into DEFAULT_PRAGMAS.
+            user_id (int, optional):    User partition all operations are scoped to.
+            max_delay (float):          Seconds the writer waits for more writes after the first one of a batch.
+            max_batch (int):            Maximum writes per transaction.
+
+        Note:
+            lock guards habit state between a queued save and its commit; HabitManager shares it
+            for all in-memory changes. Bulk maintenance (recompute_streaks, import) runs on the calling thread.
+        """
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self.lock = threading.RLock()
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        super().__init__(db_name, pragmas, user_id)
+        self._writer = threading.Thread(target=self._run_writer, name="habit-db-writer", daemon=True)
+        self._writer.start()
+
+    @property
+    def connection(self):
+        """sqlite3.Connection: Connection of the calling thread, opened and tuned on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect(check_same_thread=False)   # close() may run on any thread
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self):
+        """Commits queued writes, stops the writer thread and closes the connections of all threads."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_STOP)
+            self._writer.join()
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def _submit(self, work, habits=()):
+        """Queues work(cursor) for the writer, habits are marked saved once it is committed."""
+        if self._closed:
+            raise RuntimeError("GroupCommitStorage is closed")
+        future = Future()
+        self._queue.put((work, list(habits), future))
+        return future
+
+    def save_habit(self, habit):
+        """
+        Queues save of a habit's unsaved changes (see DatabaseStorage.save_habit()) for the next group commit.
+
+        Returns:
+            Future:     Resolves to None once committed, raises the write's error otherwise.
+        """
+        return self.save_habits([habit])
+
+    def save_habits(self, habits):
+        """Queues bulk save of many habits as one write, returns Future (see save_habit())."""
+        habits = [habit for habit in habits if not habit.habit_id or habit.is_dirty]
+
+        def write(cursor):
+            for habit in habits:
+                self._write_habit(cursor, habit)
+        return self._submit(write, habits)
+
+    def delete_habit(self, habit_id):
+        """
+        Queues delete of a habit and its completions for the next group commit.
+
+        Returns:
+            Future:     Resolves to True if deleted, False if not found.
+        """
+        return self._submit(lambda cursor: self._delete_habit(cursor, habit_id))
+
+    def flush(self):
+        """Blocks until all writes queued so far are committed."""
+        self._submit(lambda cursor: None).result()
+
+    def _run_writer(self):
+        """Writer loop: takes the first queued write, gathers more for up to max_delay, commits the batch."""
+        stop = False
+        while not stop:
+            job = self._queue.get()
+            if job is _STOP:
+                return
+            batch = [job]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    job = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if job is _STOP:
+                    stop = True
+                    break
+                batch.append(job)
+            self._commit(batch)
+
+    @timed("db.group_commit")
+    def _commit(self, batch):
+        """
+        Runs a batch of queued writes in one transaction and resolves their futures after the commit.
+
+        Each write runs in its own savepoint, a failing write is rolled back alone and fails only its future.
+        """
+        outcomes = []
+        with self.lock:
+            new = [[habit for habit in habits if not habit.habit_id] for _, habits, _ in batch]
+            try:
+                with self.connection as conn:
+                    cursor = conn.cursor()
+                    cursor.execute("BEGIN IMMEDIATE")
+                    for work, _, future in batch:
+                        cursor.execute("SAVEPOINT write")
+                        try:
+                            outcomes.append((future, work(cursor), None))
+                        except Exception as error:
+                            cursor.execute("ROLLBACK TO write")
+                            outcomes.append((future, None, error))
+                        cursor.execute("RELEASE write")
+            except Exception as error:     # Nothing committed
+                outcomes = [(future, None, error) for _, _, future in batch]
+            for (_, habits, _), new_habits, (_, _, error) in zip(batch, new, outcomes):
+                if error is None:
+                    for habit in habits:
+                        habit.mark_saved()
+                else:
+                    for habit in new_habits:
+                        habit.habit_id = None
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
@@ -3,14 +3,80 @@
 Habit Tracking Module
 ---------------------
 Implements Habit class for completion logging and streak calculation in a Habit Tracker App.
+Completions are stored compactly as a sorted array of day ordinals (date.toordinal()).
+Streaks compare period bucket ids (periods.py), a RunIndex of streak runs answers as-of-date
+streak queries by bisect (built on first query).
 ---------------------
 """
 
-from datetime import timedelta, date
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from collections.abc import Sequence
+from datetime import date
+from instrumentation import timed
+from periods import period_rule, streaks
+from run_index import RunIndex
+
+# Unsaved changes of a habit, consumed by DatabaseStorage.save_habit()
+HabitChanges = namedtuple("HabitChanges", ["metadata", "added", "removed", "replaced"])
+
+
+class CompletionDates(Sequence):
+    """Read-only view of a habit's sorted completion ordinals as datetime.date objects."""
+
+    __slots__ = ("_ordinals",)
+
+    def __init__(self, ordinals):
+        """
+        Initializes view over ordinals array.
+
+        Args:
+            ordinals (array [int]):     Sorted, unique day ordinals.
+        """
+        self._ordinals = ordinals
+
+    def __len__(self):
+        return len(self._ordinals)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [date.fromordinal(o) for o in self._ordinals[index]]
+        return date.fromordinal(self._ordinals[index])
+
+    def __iter__(self):
+        return map(date.fromordinal, self._ordinals)
+
+    def __contains__(self, d):
+        """Bisect-based membership test (O(log n)), O(1) bit test for bitmap histories."""
+        if not isinstance(d, date):
+            return False
+        ordinal = d.toordinal()
+        if not isinstance(self._ordinals, array):
+            return ordinal in self._ordinals
+        i = bisect_left(self._ordinals, ordinal)
+        return i < len(self._ordinals) and self._ordinals[i] == ordinal
+
+    def __eq__(self, other):
+        if isinstance(other, CompletionDates):
+            return self._ordinals == other._ordinals
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"CompletionDates({list(self)!r})"
+
 
 class Habit:
     """Models a single habit and logic of habit completion and streak calculation for daily/ weekly habits."""
 
+    __slots__ = ("_name", "_description", "_period", "habit_id", "current_streak", "longest_streak",
+                 "_ordinals", "_streak_synced", "_metadata_dirty", "_added", "_removed", "_replaced",
+                 "_history_loader", "_last_ordinal", "_count", "_runs", "_on_change")
+
+    ENCODING = "rows"   # Stored completion encoding (BitmapHabit: 'bitmap')
+
     def __init__(self, name, description, period, habit_id=None):
         """
         Initializes new habit object.
@@ -23,16 +89,241 @@ class Habit:
 
         Note:
             Streak starts at 0.
-            completed_dates is empty list.
+            completed_dates is empty.
+            Streak state (last completion, current/longest run) is kept in step with
+            completed_dates, so in-order check-offs update it in O(1).
+            Unsaved changes (metadata, added/ removed completions) are tracked for delta saves.
+            Storage may load only a streak summary, completion history is then fetched on first use.
+            A HabitManager holding the habit sets _on_change, called with the habit after every change
+            (metadata, completions, streaks), so direct edits invalidate its indexes and cached analysis.
         """
+        self._on_change = None
         self.name = name
         self.description = description
-        self.period = period.lower()
+        self.period = period
         self.habit_id = habit_id
         self.current_streak = 0
         self.longest_streak = 0
+        self._added = None
+        self._removed = None
+        self._runs = None
+        self._count = 0
+        self._last_ordinal = None
         self.completed_dates = []
 
+    @classmethod
+    def from_summary(cls, habit_id, name, description, period, current_streak, longest_streak, last_ordinal,
+                     completion_count, history_loader):
+        """
+        Builds clean habit with stored streak summary and lazy history, without __init__ and property setters
+        (bulk restore from storage or snapshot).
+
+        Args:
+            habit_id (int):                 Unique ID.
+            name (str):                     Habit name.
+            description (str):              Habit description.
+            period (str):                   Stored (lowercased) periodicity.
+            current_streak (int):           Stored current streak.
+            longest_streak (int):           Stored longest streak.
+            last_ordinal (int):             Ordinal of most recent completion or None.
+            completion_count (int):         Number of completions.
+            history_loader (callable):      Called with habit_id when the history is first needed, returns its
+                                            sorted, unique ordinals (shared per storage, no closure per habit).
+
+        Returns:
+            Habit:                          Habit of class cls without unsaved changes.
+        """
+        habit = object.__new__(cls)
+        habit._name = name
+        habit._description = description
+        habit._period = period
+        habit.habit_id = habit_id
+        habit.current_streak = current_streak
+        habit.longest_streak = longest_streak
+        habit._ordinals = None
+        habit._history_loader = history_loader
+        habit._last_ordinal = last_ordinal
+        habit._count = completion_count
+        habit._runs = None
+        habit._streak_synced = True
+        habit._metadata_dirty = habit._replaced = False
+        habit._added = habit._removed = None
+        habit._on_change = None
+        return habit
+
+    @property
+    def name(self):
+        """str: Habit name."""
+        return self._name
+
+    @name.setter
+    def name(self, name):
+        self._name = name
+        self._metadata_dirty = True
+        self._changed()
+
+    @property
+    def description(self):
+        """str: Habit description."""
+        return self._description
+
+    @description.setter
+    def description(self, description):
+        self._description = description
+        self._metadata_dirty = True
+        self._changed()
+
+    @property
+    def period(self):
+        """str: 'daily' or 'weekly' (lowercased)."""
+        return self._period
+
+    @period.setter
+    def period(self, period):
+        self._period = period.lower()
+        self._metadata_dirty = True
+        self._streak_synced = False
+        self._runs = None
+        self._changed()
+
+    @property
+    def completed_dates(self):
+        """CompletionDates: Read-only, sorted view of the completion history as dates (loaded on demand)."""
+        return CompletionDates(self._history())
+
+    @completed_dates.setter
+    def completed_dates(self, dates):
+        """Replaces completion history (sorted, duplicates dropped); streak state is resynced on next completion."""
+        self._ordinals = self._new_history(sorted({d.toordinal() for d in dates}))
+        self._history_loader = None
+        self._streak_synced = False
+        self._runs = None
+        self._replaced = True
+        self._added = self._removed = None
+        self._changed()
+
+    def load_ordinals(self, ordinals):
+        """
+        Replaces completion history with day ordinals that are already sorted and unique (e.g. from storage).
+
+        Args:
+            ordinals (iterable [int]):  Sorted, unique date ordinals.
+        """
+        self._ordinals = self._new_history(ordinals)
+        self._history_loader = None
+        self._streak_synced = False
+        self._runs = None
+
+    def _new_history(self, ordinals):
+        """Returns history container for sorted, unique ordinals (array('i'), overridden by BitmapHabit)."""
+        return array("i", ordinals)
+
+    def completion_ordinals(self):
+        """Returns completion history as sorted array('i') of date ordinals (loaded on demand, do not modify)."""
+        return self._history()
+
+    def set_streak(self, current_streak, longest_streak):
+        """Sets streaks computed elsewhere (e.g. batch engine in streaks.py) for the current history."""
+        self.current_streak = current_streak
+        self.longest_streak = longest_streak
+        self._streak_synced = True
+        self._changed()
+
+    @property
+    def history_loaded(self):
+        """bool: True if the completion history is held in memory."""
+        return self._ordinals is not None
+
+    @property
+    def last_completed(self):
+        """date: Most recent completion or None (no history load needed)."""
+        last = self._last()
+        return date.fromordinal(last) if last is not None else None
+
+    @property
+    def completion_count(self):
+        """int: Number of completions (no history load needed)."""
+        return self._count if self._ordinals is None else len(self._ordinals)
+
+    def _last(self):
+        """Returns ordinal of most recent completion or None."""
+        if self._ordinals is None:
+            return self._last_ordinal
+        return self._ordinals[-1] if self._ordinals else None
+
+    def _history(self):
+        """Returns ordinals array, fetching the history from storage on first access."""
+        if self._ordinals is None:
+            self._ordinals = self._new_history(self._history_loader(self.habit_id))
+            self._history_loader = None
+            for ordinal in sorted(self._added or ()):   # Completions not yet saved when history was fetched
+                self._insert_ordinal(ordinal)
+        return self._ordinals
+
+    def _insert_ordinal(self, ordinal):
+        """Inserts ordinal into the history at its sorted position, False if already present."""
+        ordinals = self._history()
+        i = bisect_left(ordinals, ordinal)
+        if i < len(ordinals) and ordinals[i] == ordinal:
+            return False
+        ordinals.insert(i, ordinal)
+        return True
+
+    def _delete_ordinal(self, ordinal):
+        """Deletes ordinal from the history, False if not present."""
+        ordinals = self._history()
+        i = bisect_left(ordinals, ordinal)
+        if i == len(ordinals) or ordinals[i] != ordinal:
+            return False
+        del ordinals[i]
+        return True
+
+    @property
+    def is_dirty(self):
+        """bool: True if the habit has changes not yet written to storage."""
+        return bool(self._metadata_dirty or self._replaced or self._added or self._removed)
+
+    def get_changes(self):
+        """
+        Returns unsaved changes since last load/ save.
+
+        Returns:
+            HabitChanges:   metadata (bool):        Name, description or period changed
+                            added (set [int]):      Ordinals completed since last save
+                            removed (set [int]):    Ordinals removed since last save
+                            replaced (bool):        completed_dates was replaced as a whole
+        """
+        return HabitChanges(self._metadata_dirty, self._added or set(), self._removed or set(), self._replaced)
+
+    def _changed(self):
+        """Notifies the owning HabitManager (if any) that the habit changed."""
+        if self._on_change is not None:
+            self._on_change(self)
+
+    def mark_saved(self):
+        """Marks habit as clean after storage has persisted (or loaded) it."""
+        self._metadata_dirty = False
+        self._replaced = False
+        self._added = self._removed = None
+
+    def _track_added(self, ordinal):
+        """Records completion ordinal as unsaved addition."""
+        if self._removed and ordinal in self._removed:
+            self._removed.discard(ordinal)
+        elif self._added is None:
+            self._added = {ordinal}
+        else:
+            self._added.add(ordinal)
+
+    def _track_removed(self, ordinal):
+        """Records completion ordinal as unsaved removal."""
+        if self._added and ordinal in self._added:
+            self._added.discard(ordinal)
+        elif self._removed is None:
+            self._removed = {ordinal}
+        else:
+            self._removed.add(ordinal)
+
     def complete_habit(self):
         """
         Checks-off a habit as completed today (by default) and update streak.
@@ -41,53 +332,154 @@ class Habit:
             bool:   True if newly added
                     False if already completed today
         """
-        today = date.today()
-        if today not in self.completed_dates:
-            self.completed_dates.append(today)
-            self.compute_streak()
+        return self.add_completion(date.today())
+
+    def add_completion(self, completed_date):
+        """
+        Adds a completion date and updates streak state.
+
+        Args:
+            completed_date (date):  Date of completion.
+
+        Returns:
+            bool:                   True if newly added
+                                    False if already completed on that date
+
+        Note:
+            In-order dates (after last completion) extend the streak in O(1), without loading history.
+            Out-of-order dates are inserted by bisect and fall back to a full compute_streak().
+        """
+        self.refresh_streak()
+
+        ordinal = completed_date.toordinal()
+        last = self._last()
+        if last is None or ordinal > last:
+            self._extend_streak(ordinal, last)
+            if self._ordinals is None:
+                self._last_ordinal = ordinal
+                self._count += 1
+            else:
+                self._ordinals.append(ordinal)
+                if self._runs is not None:
+                    self._runs.append(ordinal)
+            self._track_added(ordinal)
+            self._changed()
             return True
-        else: return False
+        if ordinal == last or not self._insert_ordinal(ordinal):
+            return False
+        self._runs = None       # Rebuilt on next run query
+        self._track_added(ordinal)
+        self.compute_streak()
+        self._changed()
+        return True
+
+    def remove_completion(self, completed_date):
+        """
+        Removes a completion date and recomputes streaks.
+
+        Args:
+            completed_date (date):  Date of completion to remove.
+
+        Returns:
+            bool:                   True if removed
+                                    False if not found
+        """
+        ordinal = completed_date.toordinal()
+        if not self._delete_ordinal(ordinal):
+            return False
+        self._runs = None
+        self._track_removed(ordinal)
+        self.compute_streak()
+        self._changed()
+        return True
+
+    def _run_index(self):
+        """Returns RunIndex of the history, built on first use and extended by in-order completions."""
+        if self._runs is None:
+            self._runs = RunIndex(self._history(), period_rule(self.period).bucket)
+        return self._runs
+
+    def _completion_before(self, ordinal):
+        """Returns last completion ordinal on or before ordinal or None (bisect)."""
+        ordinals = self._history()
+        i = bisect_right(ordinals, ordinal)
+        return ordinals[i - 1] if i else None
+
+    def _completion_after(self, ordinal):
+        """Returns first completion ordinal on or after ordinal or None (bisect)."""
+        ordinals = self._history()
+        i = bisect_left(ordinals, ordinal)
+        return ordinals[i] if i < len(ordinals) else None
 
+    def streak_on(self, day):
+        """
+        Streak as of a date: current streak of the completions up to and including day (O(log n)).
+
+        Args:
+            day (date):     As-of date.
+
+        Returns:
+            int:            Streak compute_streak() would report on the history cut off after day.
+        """
+        return self._run_index().streak_on(day.toordinal(), self._completion_before)
+
+    def longest_streak_between(self, start, end):
+        """
+        Longest streak formed by completions within a window (O(log n)).
+
+        Args:
+            start (date):   First day of window.
+            end (date):     Last day of window (inclusive).
+
+        Returns:
+            int:            Longest streak compute_streak() would report on the completions in the window.
+        """
+        return self._run_index().longest_between(start.toordinal(), end.toordinal(),
+                                                 self._completion_before, self._completion_after)
+
+    def breaks_between(self, start, end):
+        """
+        Number of breaks in a range: streaks broken and restarted by a completion within [start, end] (O(log n)).
+
+        Args:
+            start (date):   First day of range.
+            end (date):     Last day of range (inclusive).
+
+        Returns:
+            int:            Runs (after the first one) starting within the range.
+        """
+        return self._run_index().breaks_between(start.toordinal(), end.toordinal())
+
+    def refresh_streak(self):
+        """Recomputes streaks only if completion history was replaced since the last computation."""
+        if not self._streak_synced:
+            self.compute_streak()
+
+    def _extend_streak(self, ordinal, last):
+        """Extends streak state by a completion after the last one (same rules as compute_streak)."""
+        if last is None:
+            self.current_streak = 1
+        else:
+            bucket = period_rule(self.period).bucket
+            step = bucket(ordinal) - bucket(last)
+            if step == 0:       # Same period as the last completion: streak unchanged
+                return
+            self.current_streak = self.current_streak + 1 if step == 1 else 1
+        self.longest_streak = max(self.longest_streak, self.current_streak)
+
+    @timed("habit.compute_streak")
     def compute_streak(self):
         """
         Computes current and longest streak based on periodicity ('daily' or 'weekly').
 
         Note:
             daily:      Consecutive days
-            weekly:     Consecutive ISO weeks
+            weekly:     Consecutive ISO weeks (Monday-Sunday, across year boundaries),
+                        further completions within a week leave the streak unchanged
 
             Updates     self.current_streak == longest streak ending at most recent completion
                         self.longest_streak == historically longest streak over all completions
         """
-        sorted_dates = sorted(self.completed_dates)
-        if not sorted_dates:
-            self.current_streak = 0
-            self.longest_streak = 0
-            return
-
-        longest_streak = 1
-        current_streak = 1
-
-        if self.period == "daily":
-            expected_delta = timedelta(days=1)
-            for i in range(1, len(sorted_dates)):
-                delta = sorted_dates[i] - sorted_dates[i - 1]
-                if delta == expected_delta:
-                    current_streak += 1
-                    longest_streak = max(longest_streak, current_streak)
-                else:
-                    current_streak = 1
-
-        elif self.period == "weekly":
-           prev_week = sorted_dates[0].isocalendar()[1]
-           for date in sorted_dates[1:]:
-                curr_week = date.isocalendar()[1]
-                if curr_week == prev_week + 1:
-                    current_streak += 1
-                    longest_streak = max(longest_streak, current_streak)
-                else:
-                    current_streak = 1
-                prev_week = curr_week
-
-        self.longest_streak = longest_streak
-        self.current_streak = current_streak
\ No newline at end of file
+        sorted_ordinals = self._history()   # Kept sorted on insert, no re-sort needed
+        self._streak_synced = True
+        self.current_streak, self.longest_streak = streaks(period_rule(self.period).buckets(sorted_ordinals))
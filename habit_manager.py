@@ -7,24 +7,170 @@ Manages list of Habit objects, integrates with storage backend, provides table d
 --------------------
 """
 
+import threading
+from concurrent.futures import Future
 from habit import Habit
-from tabulate import tabulate
+
+
+def _as_future(result):
+    """Returns storage result as Future (queued storages return one, synchronous storages the value itself)."""
+    if isinstance(result, Future):
+        return result
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def _then(future, func):
+    """Returns Future resolving to func(result) once future is done, errors are passed through."""
+    chained = Future()
+
+    def done(finished):
+        try:
+            chained.set_result(func(finished.result()))
+        except Exception as error:
+            chained.set_exception(error)
+    future.add_done_callback(done)
+    return chained
+
 
 class HabitManager:
     """Provides in-memory storage of habits with methods to create, list, delete and retrieve by ID."""
 
-    def __init__(self, storage=None):
+    def __init__(self, storage=None, user_id=None):
         """Initializes new HabitManager object with empty habits list and optional storage.
 
         Args:
-            storage:    Storage backend for persistence (DB)
+            storage:                    Storage backend for persistence (DB)
+            user_id (int, optional):    Scopes the manager to one user's habits (storage.for_user(user_id))
+
+        Note:
+            Habits are kept in insertion order with hash indexes by habit_id, name and period
+            for O(1) lookup and delete. Assigning manager.habits rebuilds the ID index; name/ period
+            indexes are built on their first lookup (startup with many habits doesn't pay for them);
+            add habits via create_habit() or add_habit() (not manager.habits.append).
+            Held habits report their own changes (Habit._on_change), so direct edits such as
+            habit.complete_habit() or a rename also bump version and re-index the habit.
+            version is bumped on every change (create, delete, completion, habits assignment),
+            result_cache holds analysis results for the current version (see analysis.cached).
+            All in-memory changes hold a re-entrant lock (shared with GroupCommitStorage), so the manager
+            is safe for concurrent use with a thread-safe storage. submit_create/ complete/ delete return
+            futures resolved when the write is persisted, create/ complete/ delete_habit wait for them.
         """
+        if storage is not None and user_id is not None:
+            storage = storage.for_user(user_id)
         self.storage = storage  # Initial dependency to storage object
+        self._lock = getattr(storage, "lock", None) or threading.RLock()
+        self.version = 0
+        self.result_cache = {}
+        self._on_habit_change = self._habit_changed     # One bound method, compared on release
+        self._habits = {}
         self.habits = []
 
+    def _bump_version(self):
+        """Marks in-memory data as changed, drops cached analysis results."""
+        self.version += 1
+        self.result_cache.clear()
+
+    def _habit_changed(self, habit):
+        """Called by a held habit after it changed itself: re-indexes it if renamed, drops cached results."""
+        with self._lock:
+            keys = self._keys
+            if keys is not None and keys.get(habit, (habit.name, habit.period)) != (habit.name, habit.period):
+                self._unindex(habit)
+                self._index(habit)
+            self._bump_version()
+
+    def _release(self, habit):
+        """Stops change notifications of a habit no longer held by this manager."""
+        if habit._on_change == self._on_habit_change:
+            habit._on_change = None
+
+    @property
+    def habits(self):
+        """list [Habit]: All habits in insertion order (cached between changes)."""
+        with self._lock:
+            if self._habit_list is None:
+                self._habit_list = list(self._habits)
+            return self._habit_list
+
+    @habits.setter
+    def habits(self, habits):
+        """Replaces in-memory habits, rebuilds the ID index (name/ period indexes follow on first lookup)."""
+        with self._lock:
+            for habit in self._habits:
+                self._release(habit)
+            self._habits = dict.fromkeys(habits)    # Habit -> None, insertion-ordered set with O(1) delete
+            self._by_id = {habit.habit_id: habit for habit in self._habits if habit.habit_id is not None}
+            self._keys = self._by_name = self._by_period = None
+            self._habit_list = None
+            on_change = self._on_habit_change
+            for habit in self._habits:
+                habit._on_change = on_change
+            self._bump_version()
+
+    def _indexes(self):
+        """Returns (by_name, by_period) indexes, built in one pass over all habits on first use."""
+        if self._keys is None:
+            # Habit -> (name, period) it is indexed under, removal uses these even after a rename
+            self._keys = {habit: (habit.name, habit.period) for habit in self._habits}
+            self._by_name = {}
+            self._by_period = {}
+            for habit, (name, period) in self._keys.items():
+                names = self._by_name.get(name)
+                if names is None:
+                    self._by_name[name] = {habit: None}
+                else:
+                    names[habit] = None
+                self._by_period.setdefault(period, {})[habit] = None
+        return self._by_name, self._by_period
+
+    def _index(self, habit):
+        """Adds habit to the name/ period indexes (if built) under its current name and period."""
+        habit._on_change = self._on_habit_change
+        if self._keys is not None:
+            self._keys[habit] = (habit.name, habit.period)
+            self._by_name.setdefault(habit.name, {})[habit] = None
+            self._by_period.setdefault(habit.period, {})[habit] = None
+
+    def _unindex(self, habit):
+        """Removes habit from the name/ period indexes (if built) under the keys it was indexed with."""
+        if self._keys is not None:
+            name, period = self._keys.pop(habit)
+            self._by_name.get(name, {}).pop(habit, None)
+            self._by_period.get(period, {}).pop(habit, None)
+
+    def add_habit(self, habit):
+        """
+        Adds existing Habit object (e.g. loaded from storage) to in-memory habits and indexes.
+
+        Args:
+            habit (Habit):  Habit to add.
+        """
+        with self._lock:
+            if habit in self._habits:
+                self._unindex(habit)
+            self._habits[habit] = None
+            if habit.habit_id is not None:
+                self._by_id[habit.habit_id] = habit
+            self._index(habit)
+            self._habit_list = None
+            self._bump_version()
+
+    def _remove_habit(self, habit):
+        """Removes habit from in-memory habits and indexes."""
+        with self._lock:
+            self._unindex(habit)
+            self._release(habit)
+            del self._habits[habit]
+            if self._by_id.get(habit.habit_id) is habit:
+                del self._by_id[habit.habit_id]
+            self._habit_list = None
+            self._bump_version()
+
     def create_habit(self, name, description, period):
         """
-        Creates new Habit object, add to in-memory list, save to storage and return it.
+        Creates new Habit object, save to storage, add to in-memory list and return it.
 
         Args:
             name (str):         Habit name.
@@ -34,15 +180,82 @@ class HabitManager:
         Returns:
             Habit:              New Habit object with assigned ID from storage.
         """
+        return self.submit_create(name, description, period).result()
+
+    def submit_create(self, name, description, period):
+        """
+        Creates new Habit object, queues its save and adds it to in-memory list once it has an ID.
+
+        Returns:
+            Future:             Resolves to the new Habit (see create_habit()).
+        """
         habit = Habit(
             name=name,
             description=description,
             period=period,
             )
-        self.habits.append(habit)
-        self.storage.save_habit(habit)
+        saved = _as_future(self.storage.save_habit(habit))  # Assigns ID before indexing
 
-        return habit
+        def index(_):
+            self.add_habit(habit)
+            return habit
+        return _then(saved, index)
+
+    def complete_habit(self, habit_id):
+        """
+        Checks-off habit by ID as completed today and saves it to storage.
+
+        Args:
+            habit_id:   ID of habit to complete.
+
+        Returns:
+            bool:       True if newly completed
+                        False if already completed today or not found
+        """
+        return self.submit_complete(habit_id).result()
+
+    def submit_complete(self, habit_id):
+        """
+        Checks-off habit by ID as completed today and queues its save.
+
+        Returns:
+            Future:     Resolves to complete_habit() result once the completion is persisted.
+        """
+        with self._lock:
+            habit = self._by_id.get(habit_id)
+            if habit is None or not habit.complete_habit():
+                return _as_future(False)
+            self._bump_version()
+            saved = _as_future(self.storage.save_habit(habit))
+        return _then(saved, lambda _: True)
+
+    def update_habit(self, habit_id, name=None, description=None, period=None):
+        """
+        Changes habit metadata by ID and saves it to storage (the habit re-indexes itself, see _habit_changed()).
+
+        Args:
+            habit_id:                       ID of habit to update.
+            name (str, optional):           New name.
+            description (str, optional):    New description.
+            period (str, optional):         New periodicity (streaks are recomputed).
+
+        Returns:
+            bool:                           True if updated
+                                            False if not found
+        """
+        with self._lock:
+            habit = self._by_id.get(habit_id)
+            if habit is None:
+                return False
+            if name is not None:
+                habit.name = name
+            if description is not None:
+                habit.description = description
+            if period is not None:
+                habit.period = period
+            saved = _as_future(self.storage.save_habit(habit))
+        saved.result()
+        return True
 
     def list_habits(self):
         """Returns list of all habit names from in-memory storage."""
@@ -59,16 +272,26 @@ class HabitManager:
             bool:       True if deleted
                         False if not found
         """
-        for i, habit in enumerate(self.habits):
-            if habit.habit_id == habit_id:
-                del self.habits[i]
-                self.storage.delete_habit(habit_id)
-                return True
-        return False
+        return self.submit_delete(habit_id).result()
+
+    def submit_delete(self, habit_id):
+        """
+        Removes habit by ID from in-memory list and queues its delete in storage.
+
+        Returns:
+            Future:     Resolves to delete_habit() result once the delete is persisted.
+        """
+        with self._lock:
+            habit = self._by_id.get(habit_id)
+            if habit is None:
+                return _as_future(False)
+            self._remove_habit(habit)
+            deleted = _as_future(self.storage.delete_habit(habit_id))
+        return _then(deleted, lambda _: True)
 
     def get_habit(self, habit_id):
         """
-        Retrieves habit by ID from in-memory list.
+        Retrieves habit by ID from in-memory index.
 
         Args:
             habit_id:   ID of habit to get.
@@ -77,13 +300,21 @@ class HabitManager:
             Habit:      Habit if found
                         None if not found
         """
-        for habit in self.habits:
-            if habit.habit_id == habit_id:
-                return habit
-        return None
+        return self._by_id.get(habit_id)
+
+    def get_habits_by_name(self, name):
+        """Returns list of habits with given name (index lookup)."""
+        with self._lock:
+            return list(self._indexes()[0].get(name, ()))
+
+    def get_habits_by_period(self, period):
+        """Returns list of habits with given periodicity, 'daily' or 'weekly' (index lookup)."""
+        with self._lock:
+            return list(self._indexes()[1].get(period, ()))
 
     def print_habits_table(self):
         """Prints formatted overview table with row indices using tabulate."""
+        from tabulate import tabulate     # Deferred, only the interactive table needs it
         table = [[h.name, h.description, h.period, h.current_streak] for h in self.habits]
         print(tabulate(table,
                         headers=["Name", "Description", "Periodicity", "Current Streak"],
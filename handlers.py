@@ -1,8 +1,13 @@
 """CLI handler functions for habit operations in CLI in main.py."""
 
 import questionary
+from datetime import date, timedelta
+import instrumentation
+from tabulate import tabulate
 from sample_data import print_sample_data
-from analysis import list_all_habits, list_habit_by_period, longest_streak_of_all, longest_streak_one
+from analysis import (list_all_habits_cached as list_all_habits, list_habit_by_period_cached as list_habit_by_period,
+                      longest_streak_of_all_cached as longest_streak_of_all,
+                      longest_streak_one_cached as longest_streak_one, completion_rate)
 
 def _handle_complete(manager):
     """Handle habit completion with user-friendly ID mapping."""
@@ -17,12 +22,11 @@ def _handle_complete(manager):
         habit_id = num_id_mapping.get(number)
         if habit_id:
             habit = manager.get_habit(habit_id)
-            if habit.complete_habit():
+            if manager.complete_habit(habit_id):
                 print(f"Great! Habit {habit.name} is successfully completed today.")
                 print(f"New streak is {habit.current_streak}. Keep it going!")
             else:
                 print(f"Habit {habit.name} was already completed today.")
-            manager.storage.save_habit(habit)
         else:
             print("Enter a valid number.")
     except ValueError:
@@ -76,21 +80,22 @@ def _handle_analyze(manager):
                                  choices=["List Your Habits",
                                           "List Your Habits By Periodicity",
                                           "Calculate Longest Historical Streak Of All Habits",
-                                          "Calculate Longest Historical Streak Of A Single Habit"]).ask()
+                                          "Calculate Longest Historical Streak Of A Single Habit",
+                                          "Completion Rate Of The Last 4 Weeks"]).ask()
 
     if analyse == "List Your Habits":
-        habit_names = list_all_habits(manager.habits)
+        habit_names = list_all_habits(manager)
         habit_text = ", ".join(habit_names)
         print(f"\nYou are currently tracking the habits {habit_text}. That's impressive!\n")
 
     elif analyse == "List Your Habits By Periodicity":
         periodicity = questionary.select("For Which Periodicity?", choices=["daily", "weekly"]).ask()
-        habit_names = list_habit_by_period(manager.habits, periodicity)
+        habit_names = list_habit_by_period(manager, periodicity)
         habit_text = ", ".join(habit_names)
         print(f"\nYour habits {habit_text} are to be completed {periodicity}.\n")
 
     elif analyse == "Calculate Longest Historical Streak Of All Habits":
-        longest = longest_streak_of_all(manager.habits)
+        longest = longest_streak_of_all(manager)
         if longest is None:
             print("No habits to analyze.")
         else:
@@ -105,7 +110,7 @@ def _handle_analyze(manager):
                                           validate=lambda x: x.isdigit()).ask())
             habit_id = num_id_mapping.get(number)
             if habit_id:
-                longest = longest_streak_one(manager.habits, habit_id)
+                longest = longest_streak_one(manager, habit_id)
                 if longest:
                     print(f"\nYour longest historical streak for {longest[0]} was {longest[1]} times in a row. "
                           f"Carry on!\n")
@@ -114,4 +119,26 @@ def _handle_analyze(manager):
             else:
                 print("Enter a valid number.")
         except ValueError:
-            print("Enter a valid number.")
\ No newline at end of file
+            print("Enter a valid number.")
+
+    elif analyse == "Completion Rate Of The Last 4 Weeks":
+        today = date.today()
+        rates = completion_rate(manager, today - timedelta(days=27), today)
+        table = [[h.name, h.period, f"{rates.get(h.habit_id, 0.0):.0%}"] for h in manager.habits]
+        print(tabulate(table, headers=["Name", "Periodicity", "Completion Rate"], tablefmt="github"))
+
+
+def _handle_stats():
+    """Print collected timings per operation (SQL statements, streak computations, analysis calls)."""
+    if not instrumentation.is_enabled():
+        print("Performance stats are disabled. Start with --stats or HABIT_TRACKER_STATS=1.")
+        return
+    stats = instrumentation.snapshot()
+    if not stats:
+        print("No operations timed yet.")
+        return
+    table = [[name, s["count"], round(s["total_s"] * 1e3, 3), round(s["mean_us"], 1), round(s["max_us"], 1)]
+             for name, s in stats.items()]
+    print(tabulate(table,
+                   headers=["Operation", "Calls", "Total [ms]", "Mean [µs]", "Max [µs]"],
+                   tablefmt="github"))
@@ -0,0 +1,160 @@
+"""
+-----------------------
+Instrumentation Module
+-----------------------
+Lightweight timing of storage, streak and analysis hot paths.
+Collects call count, total time and a latency histogram (power-of-two microsecond buckets) per operation.
+
+Disabled by default, a disabled timed() wrapper costs one flag check per call and SQL statements are not
+wrapped at all. Enable with environment variable HABIT_TRACKER_STATS=1 (or main.py --stats) and
+dump stats as JSON on exit with HABIT_TRACKER_STATS_JSON=<path> (or main.py --stats-json <path>).
+-----------------------
+"""
+
+import atexit
+import functools
+import json
+import os
+import sqlite3
+from time import perf_counter
+
+_enabled = os.environ.get("HABIT_TRACKER_STATS", "") not in ("", "0")
+_stats = {}         # operation name -> OperationStats
+_sql_names = {}     # SQL text -> normalized operation name
+
+
+class OperationStats:
+    """Accumulated timings of one operation."""
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        """Initializes empty stats."""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = {}   # bucket b -> count of calls taking < 2**b microseconds (and >= 2**(b-1))
+
+    def add(self, seconds):
+        """Adds one timed call."""
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        bucket = int(seconds * 1e6).bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def to_dict(self):
+        """Returns JSON-serializable summary (times in seconds/ microseconds)."""
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_us": self.total / self.count * 1e6 if self.count else 0.0,
+            "max_us": self.max * 1e6,
+            "histogram_us": {f"<{2 ** b}": n for b, n in sorted(self.buckets.items())},
+        }
+
+
+def is_enabled():
+    """Returns True if timings are being collected."""
+    return _enabled
+
+
+def enable(enabled=True):
+    """Switches collection on/ off (connections opened afterwards pick up SQL timing)."""
+    global _enabled
+    _enabled = enabled
+
+
+def record(name, seconds):
+    """Adds one timing for operation name."""
+    stats = _stats.get(name)
+    if stats is None:
+        stats = _stats[name] = OperationStats()
+    stats.add(seconds)
+
+
+def timed(name):
+    """
+    Decorator timing each call of a function as operation name while collection is enabled.
+
+    Args:
+        name (str):     Operation name, e.g. 'habit.compute_streak'.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def snapshot():
+    """Returns dict operation name -> stats summary, sorted by total time (descending)."""
+    ordered = sorted(_stats.items(), key=lambda item: item[1].total, reverse=True)
+    return {name: stats.to_dict() for name, stats in ordered}
+
+
+def reset():
+    """Clears all collected stats."""
+    _stats.clear()
+
+
+def dump_json(path):
+    """Writes snapshot() as JSON to path."""
+    with open(path, "w") as f:
+        json.dump(snapshot(), f, indent=2)
+
+
+def dump_json_at_exit(path):
+    """Registers dump_json(path) to run on interpreter exit."""
+    atexit.register(dump_json, path)
+
+
+def _sql_name(sql):
+    """Returns operation name for SQL statement (whitespace-normalized, truncated)."""
+    name = _sql_names.get(sql)
+    if name is None:
+        name = _sql_names[sql] = "sql: " + " ".join(sql.split())[:100]
+    return name
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor timing each execute/ executemany per SQL statement (time until first row is ready)."""
+
+    def execute(self, sql, parameters=()):
+        start = perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            record(_sql_name(sql), perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            record(_sql_name(sql), perf_counter() - start)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection factory routing all statements through InstrumentedCursor (used only while enabled)."""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+if os.environ.get("HABIT_TRACKER_STATS_JSON"):
+    _enabled = True
+    dump_json_at_exit(os.environ["HABIT_TRACKER_STATS_JSON"])
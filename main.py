@@ -6,35 +6,67 @@
 Provides interactive habit tracking menu (questionary-based).
 Main entry point for users: Create, complete, delete, and analyze habits.
 Integrates HabitManager (OOP) with handlers (FP-inspired CLI logic).
-Persistence via DatabaseStorage (SQLite).
+Persistence via DatabaseStorage (SQLite), with a binary snapshot of the habits for fast restarts (snapshot.py).
+Subcommands (complete, create, delete, list, stats) run non-interactively with JSON output (commands.py).
 
 ******************
 """
 
 
-import questionary
-from tabulate import tabulate
-from habit_manager import HabitManager
+import argparse
+import sys
+import threading
+import commands
+import instrumentation
 from db import DatabaseStorage
-from sample_data import setup_sample_data
-from handlers import _handle_complete, _handle_create, _handle_delete, _handle_analyze
 
-def main_loop():
-    """CLI main loop with interactive menu translating user choices to HabitManager and Analytics."""
+class HabitLoader(threading.Thread):
+    """Opens storage and loads the user's habits in the background, overlapping the menu library import."""
+
+    def __init__(self, db_name=None, user_id=DatabaseStorage.DEFAULT_USER_ID):
+        """Starts loading habits of user_id from db_name (see result())."""
+        super().__init__(name="habit-loader", daemon=True)
+        self._db_name = db_name
+        self._user_id = user_id
+        self._manager = None
+        self._error = None
+        self.start()
+
+    def run(self):
+        try:
+            from snapshot import load_manager
+            storage = DatabaseStorage(self._db_name, user_id=self._user_id)
+            manager = load_manager(storage)     # Binary snapshot of the last session if the database is unchanged
+            storage.close()     # SQLite connections are thread-bound, reopened by the main thread on next use
+            self._manager = manager
+        except Exception as error:
+            self._error = error
+
+    def result(self):
+        """Waits for loading to finish, returns HabitManager with loaded habits (re-raises loading errors)."""
+        self.join()
+        if self._error is not None:
+            raise self._error
+        return self._manager
+
+def main_loop(user_id=DatabaseStorage.DEFAULT_USER_ID, db_name=None):
+    """CLI main loop with interactive menu translating user choices to HabitManager and Analytics.
+
+    Args:
+        user_id (int):              User whose habits are loaded and edited.
+        db_name (str, optional):    Database file, defaults to 'habits.db'.
+    """
+    # Initialize new session with storage and load stored habits from database,
+    # in the background while questionary (prompt_toolkit) is imported and the first menu is shown
+    loader = HabitLoader(db_name, user_id)
+
+    # Interactive-only imports, command mode never loads questionary/ tabulate
+    import questionary
 
     questionary.print("Welcome To Your Habit Tracking App!", style="bold fg:blue")
 
-    # Initialize new session with storage and load stored habits from database
-    storage = DatabaseStorage()
-    manager = HabitManager(storage)
-    manager.habits = storage.load_all_habits()
-
-    # Load demo data if empty (5 predefined habits, 4 weeks of completion data)
-    if not manager.habits:
-        questionary.print("No Habits Found! Run Your Demo With 5 Predefined Habits!", style="bold fg:red")
-        setup_sample_data(manager)
-
     # Interactive menu loop
+    manager = None
     stop = False
     while not stop:
         choice = questionary.select(
@@ -44,9 +76,20 @@ def main_loop():
                      "Create A New Habit",
                      "Delete A Habit",
                      "Analyze Your Habits",
+                     "Performance Stats",
                      "Exit"]
         ).ask()
 
+        if manager is None:
+            manager = loader.result()
+            from handlers import _handle_complete, _handle_create, _handle_delete, _handle_analyze, _handle_stats
+
+            # Load demo data if empty (5 predefined habits, 4 weeks of completion data)
+            if not manager.habits and choice != "Exit":
+                from sample_data import setup_sample_data
+                questionary.print("No Habits Found! Run Your Demo With 5 Predefined Habits!", style="bold fg:red")
+                setup_sample_data(manager)
+
         # Translates user choices to handles in handles.py
         if choice == "List Your Habits":
             if manager.habits:
@@ -66,9 +109,36 @@ def main_loop():
         elif choice == "Analyze Your Habits":
             _handle_analyze(manager)
 
+        elif choice == "Performance Stats":
+            _handle_stats()
+
         elif choice == "Exit":
             questionary.print("Have A Good One! See You Tomorrow!", style="bold fg:blue")
             stop = True
 
+    from snapshot import save_snapshot
+    save_snapshot(manager)  # Skipped if unsaved or changed by others, next start then loads from the database
+    manager.storage.close()
+
+def parse_args(argv=None):
+    """Parses command line options (user, database, instrumentation) and optional subcommand."""
+    parser = argparse.ArgumentParser(description="Habit Tracker App")
+    parser.add_argument("--user", type=int, default=DatabaseStorage.DEFAULT_USER_ID,
+                        help="user ID whose habits to track (default %(default)s)")
+    parser.add_argument("--db", metavar="PATH", help="database file (default habits.db)")
+    parser.add_argument("--stats", action="store_true",
+                        help="collect performance stats (see 'Performance Stats' menu)")
+    parser.add_argument("--stats-json", metavar="PATH",
+                        help="collect performance stats and write them as JSON to PATH on exit")
+    commands.add_subcommands(parser)
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    main_loop()
+    args = parse_args()
+    if args.stats or args.stats_json:
+        instrumentation.enable()
+    if args.stats_json:
+        instrumentation.dump_json_at_exit(args.stats_json)
+    if args.command:
+        sys.exit(commands.run(args, args.db))
+    main_loop(args.user, args.db)
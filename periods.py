@@ -0,0 +1,178 @@
+"""
+------------------------
+Period Bucketing Module
+------------------------
+Maps dates (as date ordinals) to integer period bucket ids, consecutive periods having consecutive ids:
+day ordinal (daily), ISO week ordinal (weekly, Monday-Sunday, continuous across years), month index
+(monthly) and N-day periods from an anchor date. Streak and analytics code in Python, NumPy and SQL
+share these rules: a streak continues exactly when the next bucket id is the previous one + 1,
+further completions in the same bucket leave it unchanged.
+------------------------
+"""
+
+from datetime import date
+
+_EPOCH_ORDINAL = 719163     # date(1970, 1, 1).toordinal(), day 0 of datetime64[D]
+
+
+class Period:
+    """Bucketing rule of one periodicity: date ordinal -> integer bucket id."""
+
+    __slots__ = ("name", "days", "anchor")
+
+    def __init__(self, name, days, anchor=0):
+        """
+        Initializes bucketing rule.
+
+        Args:
+            name (str):             Period name (habit periodicity).
+            days (int):             Period length in days, None for calendar months.
+            anchor (int):           Date ordinal starting bucket 0 (fixed-length periods only).
+                                    Ordinal 1 (0001-01-01) is a Monday, so anchor 1 with 7 days gives ISO weeks.
+        """
+        self.name = name
+        self.days = days
+        self.anchor = anchor
+
+    def __repr__(self):
+        return f"Period({self.name!r}, {self.days!r}, anchor={self.anchor!r})"
+
+    def bucket(self, ordinal):
+        """Returns bucket id of a date ordinal."""
+        if self.days is None:
+            d = date.fromordinal(ordinal)
+            return d.year * 12 + d.month - 1
+        return (ordinal - self.anchor) // self.days
+
+    def buckets(self, ordinals):
+        """
+        Maps sorted ordinals to bucket ids (non-decreasing).
+
+        Args:
+            ordinals (iterable [int]):  Date ordinals.
+
+        Returns:
+            iterable [int]:             Bucket ids, ordinals itself for days (identity).
+        """
+        if self.days == 1 and self.anchor == 0:
+            return ordinals
+        if self.days is None:
+            return map(self.bucket, ordinals)
+        days, anchor = self.days, self.anchor
+        return ((ordinal - anchor) // days for ordinal in ordinals)
+
+    def first_day(self, bucket):
+        """Returns date ordinal of the first day of a bucket."""
+        if self.days is None:
+            return date(bucket // 12, bucket % 12 + 1, 1).toordinal()
+        return bucket * self.days + self.anchor
+
+    def np_buckets(self, ordinals):
+        """
+        Vectorized buckets(): maps an array of date ordinals to bucket ids.
+
+        Args:
+            ordinals (np.ndarray [int]):    Date ordinals.
+
+        Returns:
+            np.ndarray [int64]:             Bucket ids.
+        """
+        import numpy as np
+        ordinals = np.asarray(ordinals, dtype=np.int64)
+        if self.days is None:
+            months = (ordinals - _EPOCH_ORDINAL).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+            return months + 1970 * 12
+        return (ordinals - self.anchor) // self.days
+
+    def sql(self, ordinal, iso_date=None):
+        """
+        Returns SQLite expression of the bucket id.
+
+        Args:
+            ordinal (str):              SQL expression of the date ordinal (positive).
+            iso_date (str, optional):   SQL expression of the same date as 'YYYY-MM-DD' text, lets monthly
+                                        buckets use cheap substrings instead of date functions.
+        """
+        if self.days is None:
+            if iso_date is not None:
+                return f"(CAST(substr({iso_date}, 1, 4) AS INTEGER) * 12 + CAST(substr({iso_date}, 6, 2) AS INTEGER) - 1)"
+            julian = f"({ordinal}) + 1721424.5"
+            return f"(CAST(strftime('%Y', {julian}) AS INTEGER) * 12 + CAST(strftime('%m', {julian}) AS INTEGER) - 1)"
+        if self.days == 1 and self.anchor == 0:
+            return f"({ordinal})"
+        shift = self.anchor // self.days + 1     # Whole periods keeping the dividend positive (SQL / truncates)
+        return f"((({ordinal}) + {shift * self.days - self.anchor}) / {self.days} - {shift})"
+
+
+def every_n_days(days, anchor=date(2000, 1, 3).toordinal()):
+    """
+    Returns Period of N consecutive days.
+
+    Args:
+        days (int):         Period length.
+        anchor (int):       Date ordinal of a period's first day (default a Monday, 2000-01-03).
+                            Bucket ids of earlier dates are negative.
+    """
+    return Period(f"{days}-day", days, anchor)
+
+
+class _Unchained(Period):
+    """Rule of unknown periods: bucket ids two apart per day, so no completion continues a streak."""
+
+    __slots__ = ()
+
+    def bucket(self, ordinal):
+        return 2 * ordinal
+
+    def buckets(self, ordinals):
+        return (2 * ordinal for ordinal in ordinals)
+
+    def first_day(self, bucket):
+        return bucket // 2
+
+    def np_buckets(self, ordinals):
+        import numpy as np
+        return 2 * np.asarray(ordinals, dtype=np.int64)
+
+    def sql(self, ordinal, iso_date=None):
+        return f"(2 * ({ordinal}))"
+
+
+# Habit periodicities with streak rules
+PERIODS = {
+    "daily": Period("daily", 1),
+    "weekly": Period("weekly", 7, anchor=1),
+    "monthly": Period("monthly", None),
+}
+UNCHAINED = _Unchained("unchained", 1)
+
+
+def period_rule(period):
+    """Returns Period of a habit periodicity, UNCHAINED (no streak beyond 1) for unknown ones."""
+    return PERIODS.get(period, UNCHAINED)
+
+
+def streaks(buckets):
+    """
+    Computes current and longest streak over sorted bucket ids.
+
+    Args:
+        buckets (iterable [int]):   Non-decreasing bucket ids of a habit's completions.
+
+    Returns:
+        tuple [int, int]:           (current_streak, longest_streak) in periods, (0, 0) if empty.
+
+    Note:
+        Next bucket id (+1) continues a streak, a gap resets it to 1,
+        further completions in the same bucket are neutral.
+    """
+    current = longest = 0
+    previous = None
+    for bucket in buckets:
+        if bucket == previous:
+            continue
+        current = current + 1 if previous is not None and bucket == previous + 1 else 1
+        if current > longest:
+            longest = current
+        previous = bucket
+    return current, longest
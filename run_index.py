@@ -0,0 +1,133 @@
+"""
+----------------
+Run Index Module
+----------------
+Implements RunIndex, a sorted index of a habit's streak runs as (start, end) intervals of date ordinals.
+A run is a maximal sequence of completions whose period bucket ids (see periods.py) step by 0 or 1,
+its streak length is the number of buckets it spans.
+Answers as-of-date streak, longest streak within a window and breaks within a range by bisect,
+and is extended in O(log n) as in-order completions arrive (see Habit.streak_on() and friends).
+----------------
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+class RunIndex:
+    """Streak runs of a sorted completion history, with a sparse table of run lengths for range maxima."""
+
+    __slots__ = ("starts", "ends", "_bucket", "_max")
+
+    def __init__(self, ordinals, bucket):
+        """
+        Builds index in one pass over a completion history.
+
+        Args:
+            ordinals (iterable [int]):      Sorted, unique date ordinals.
+            bucket (callable):              bucket(ordinal) -> period bucket id (Period.bucket()).
+        """
+        self.starts = array("i")    # First ordinal per run
+        self.ends = array("i")      # Last ordinal per run
+        self._bucket = bucket
+        self._max = [array("i")]    # _max[k][i] == max run length of runs i..i + 2**k - 1
+        lengths = self._max[0]
+        first = previous = None     # Bucket ids of the last run's first and last completion
+        for ordinal in ordinals:
+            key = bucket(ordinal)
+            if previous is not None and key - previous <= 1:
+                self.ends[-1] = ordinal
+                lengths[-1] = key - first + 1
+            else:
+                self.starts.append(ordinal)
+                self.ends.append(ordinal)
+                lengths.append(1)
+                first = key
+            previous = key
+        k = 1
+        while 1 << k <= len(lengths):
+            below, half = self._max[k - 1], 1 << (k - 1)
+            self._max.append(array("i", (max(below[i], below[i + half])
+                                         for i in range(len(lengths) - (1 << k) + 1))))
+            k += 1
+
+    def append(self, ordinal):
+        """
+        Adds a completion after the last one in O(log n): extends the last run or starts a new one.
+
+        Args:
+            ordinal (int):      Date ordinal, greater than all indexed ordinals.
+        """
+        levels = self._max
+        bucket = self._bucket
+        key = bucket(ordinal)
+        if self.ends and key - bucket(self.ends[-1]) <= 1:
+            self.ends[-1] = ordinal
+            levels[0][-1] = key - bucket(self.starts[-1]) + 1
+            for level in levels[1:]:    # Only the last entry of each level covers the last run
+                level[-1] = max(level[-1], levels[0][-1])
+        else:
+            self.starts.append(ordinal)
+            self.ends.append(ordinal)
+            levels[0].append(1)
+            n = len(levels[0])
+            k = 1
+            while 1 << k <= n:
+                if len(levels) == k:
+                    levels.append(array("i"))
+                i = n - (1 << k)
+                levels[k].append(max(levels[k - 1][i], levels[k - 1][i + (1 << (k - 1))]))
+                k += 1
+
+    def _range_max(self, first, last):
+        """Returns maximum run length of runs first..last (inclusive, first <= last) in O(1)."""
+        k = (last - first + 1).bit_length() - 1
+        return max(self._max[k][first], self._max[k][last - (1 << k) + 1])
+
+    def _span(self, first, last):
+        """Returns number of periods from the one of ordinal first to the one of ordinal last."""
+        return self._bucket(last) - self._bucket(first) + 1
+
+    def streak_on(self, ordinal, before):
+        """
+        Returns the current streak of the history cut off after ordinal (0 before the first completion).
+
+        Args:
+            ordinal (int):      Date ordinal.
+            before (callable):  before(ordinal) -> last completion ordinal <= ordinal.
+        """
+        i = bisect_right(self.starts, ordinal) - 1
+        if i < 0:
+            return 0
+        return self._span(self.starts[i], self.ends[i] if self.ends[i] <= ordinal else before(ordinal))
+
+    def longest_between(self, start, end, before, after):
+        """
+        Returns the longest streak formed by completions within [start, end] (ordinals, inclusive).
+
+        Runs crossing the window edges count only the periods of their completions inside it;
+        runs fully inside come from the sparse table.
+
+        Args:
+            start (int):        First date ordinal of the window.
+            end (int):          Last date ordinal of the window.
+            before (callable):  before(ordinal) -> last completion ordinal <= ordinal.
+            after (callable):   after(ordinal) -> first completion ordinal >= ordinal.
+        """
+        last = bisect_right(self.starts, end) - 1      # Last run starting <= end
+        first = bisect_left(self.ends, start)          # First run ending >= start
+        if start > end or last < first:
+            return 0
+        head = self.starts[first] if self.starts[first] >= start else after(start)
+        tail = self.ends[last] if self.ends[last] <= end else before(end)
+        if first == last:
+            return self._span(head, tail) if head <= tail else 0    # Window between two completions of a run
+        longest = max(self._span(head, self.ends[first]), self._span(self.starts[last], tail))
+        if first + 1 <= last - 1:
+            longest = max(longest, self._range_max(first + 1, last - 1))
+        return longest
+
+    def breaks_between(self, start, end):
+        """Returns number of broken streaks, i.e. runs after the first one starting within [start, end]."""
+        first = max(bisect_left(self.starts, start), 1)
+        return max(bisect_right(self.starts, end) - first, 0)
@@ -35,17 +35,18 @@ def create_sample_habits_and_completions(today=None):
         today = date.today()
 
     # Habit1 (daily): 28 consecutive days - 1 day
-    habit1.completed_dates = [today - timedelta(days=i) for i in range(28, 0, -1)]
-    del habit1.completed_dates[20]
+    habit1_dates = [today - timedelta(days=i) for i in range(28, 0, -1)]
+    del habit1_dates[20]
+    habit1.completed_dates = habit1_dates
 
     # Habit2 (daily): alternate daily (14 completions, streak 1)
     habit2.completed_dates = [today - timedelta(days=i) for i in range(27, 0, -1) if i % 2 == 1]
 
     # Habit3 (daily): 7 on, 7 off, 7 on, 7 off (14 completions, streak 7)
-    habit3.completed_dates = []
-    habit3.completed_dates.extend([today - timedelta(days=i) for i in range(7, 0, -1)])  # Days 1-7
-    habit3.completed_dates.extend([today - timedelta(days=i) for i in range(21, 14, -1)])  # Days 15-21
-    habit3.completed_dates = sorted(habit3.completed_dates)
+    habit3_dates = []
+    habit3_dates.extend([today - timedelta(days=i) for i in range(7, 0, -1)])  # Days 1-7
+    habit3_dates.extend([today - timedelta(days=i) for i in range(21, 14, -1)])  # Days 15-21
+    habit3.completed_dates = sorted(habit3_dates)
 
     # Habit4 (weekly): alternate weekly (2 completions in week 1 and 3, streak 1)
     habit4.completed_dates = [today - timedelta(weeks=3), today - timedelta(weeks=1)]
@@ -71,7 +72,7 @@ def setup_sample_data(manager):
     for habit in habits:
         habit.compute_streak()
         manager.storage.save_habit(habit)
-        manager.habits.append(habit)
+        manager.add_habit(habit)
 
 
 
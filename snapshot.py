@@ -0,0 +1,242 @@
+"""
+---------------
+Snapshot Module
+---------------
+Persists a HabitManager's in-memory state (habits, streak summaries, loaded completion arrays) to a binary
+snapshot file on exit and restores it on the next start instead of querying the habits table (load_manager()).
+The file is read through mmap as a few column arrays. It is only used while DatabaseStorage.data_version()
+still equals the version it was taken at; otherwise load_snapshot() returns None and callers fall back to
+a full DatabaseStorage.load_all_habits().
+
+Layout (little-endian): header, then 8-byte aligned sections
+    habit_id            int64 [n]
+    current_streak      int32 [n]
+    longest_streak      int32 [n]
+    last_completed      int32 [n]   date ordinal, 0 == no completion
+    completion_count    int32 [n]
+    kind                int32 [n]   index of the habit's (period, encoding) pair in text
+    history_length      int32 [n]   -1 == history not loaded (fetched lazily from storage)
+    text                utf-8       name, description per habit, then period, encoding per distinct
+                                    pair, NUL-separated
+    ordinals            int32 [sum of loaded history lengths]
+---------------
+"""
+
+import gc
+import mmap
+import os
+import struct
+import sys
+from array import array
+from habit_manager import HabitManager
+from instrumentation import timed
+
+MAGIC = b"HABSNAP2"
+_HEADER = struct.Struct("<8sqqqqq")   # magic, database_id, changes, user_id, habits, text bytes
+_COLUMNS = ("current_streak", "longest_streak", "last_completed", "completion_count", "kind", "history_length")
+
+
+def snapshot_path(storage):
+    """Returns snapshot file of a storage's database and user, next to the database file."""
+    return f"{storage.db_name}.user{storage.user_id}.snapshot"
+
+
+def _ordinal(day):
+    """Returns date ordinal of day, 0 for None."""
+    return day.toordinal() if day else 0
+
+
+def padded(data):
+    """Returns bytes padded with NULs to a multiple of 8 (section alignment, also used by archive.py)."""
+    return data + bytes(-len(data) % 8)
+
+
+def _section(typecode, values):
+    """Returns little-endian bytes of an array section (8-byte aligned)."""
+    values = array(typecode, values)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return padded(values.tobytes())
+
+
+def _column(view, offset, typecode, count):
+    """
+    Reads an array section, returns (values, offset of next section).
+
+    values is a zero-copy memoryview of the mapped file on little-endian hosts (a byte-swapped array copy
+    otherwise); a section running past the end of the file raises ValueError.
+    """
+    size = array(typecode).itemsize * count
+    if offset + size > len(view):
+        raise ValueError("truncated snapshot section")
+    section = view[offset:offset + size]
+    if sys.byteorder == "big":
+        section = array(typecode, section.tobytes())
+        section.byteswap()
+        return section, offset + size + (-size % 8)
+    return section.cast(typecode), offset + size + (-size % 8)
+
+
+@timed("snapshot.save")
+def save_snapshot(manager, path=None):
+    """
+    Writes manager state to a snapshot file (atomically replaced), if it matches the database.
+
+    Args:
+        manager (HabitManager):     Manager with DatabaseStorage backend.
+        path (str, optional):       Snapshot file, defaults to snapshot_path(manager.storage).
+
+    Returns:
+        bool:                       True if written, False if skipped: unsaved habits, habits not loaded via
+                                    load_all_habits()/ load_snapshot(), or the database changed since.
+    """
+    storage = manager.storage
+    path = path or snapshot_path(storage)
+    habits = manager.habits
+    version = getattr(storage, "known_version", None)
+    if version is None or version != storage.data_version():
+        return False
+    if any(habit.habit_id is None or habit.is_dirty for habit in habits):
+        return False
+    kinds = {}      # (period, encoding) -> index, stored once instead of per habit
+    codes = [kinds.setdefault((habit.period, habit.ENCODING), len(kinds)) for habit in habits]
+    texts = [text for habit in habits for text in (habit.name, habit.description)]
+    texts += [text for kind in kinds for text in kind]
+    if any("\0" in text for text in texts):
+        return False
+    text = "\0".join(texts).encode()
+
+    histories = [habit.completion_ordinals() if habit.history_loaded else None for habit in habits]
+    columns = {
+        "current_streak": [habit.current_streak for habit in habits],
+        "longest_streak": [habit.longest_streak for habit in habits],
+        "last_completed": [_ordinal(habit.last_completed) for habit in habits],
+        "completion_count": [habit.completion_count for habit in habits],
+        "kind": codes,
+        "history_length": [-1 if history is None else len(history) for history in histories],
+    }
+    ordinals = array("i")
+    for history in histories:
+        if history is not None:
+            ordinals.extend(history)
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, version[0], version[1], storage.user_id, len(habits), len(text)))
+        file.write(_section("q", (habit.habit_id for habit in habits)))
+        for name in _COLUMNS:
+            file.write(_section("i", columns[name]))
+        file.write(padded(text))
+        file.write(_section("i", ordinals))
+    os.replace(tmp, path)
+    return True
+
+
+@timed("snapshot.load")
+def load_snapshot(storage, path=None):
+    """
+    Restores habits from a snapshot file if it is current for storage's database and user.
+
+    Args:
+        storage (DatabaseStorage):  Storage the habits are bound to (lazy history loads, saves).
+        path (str, optional):       Snapshot file, defaults to snapshot_path(storage).
+
+    Returns:
+        list [Habit]:               Clean habits in snapshot order (as load_all_habits() returned them),
+                                    None if the file is missing, damaged, of another user or outdated.
+
+    Note:
+        Sets storage.known_version like load_all_habits(), so the state can be snapshotted again on exit.
+    """
+    path = path or snapshot_path(storage)
+    try:
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            habits, version = _restore(storage, buffer)     # Views into buffer are released on return
+    except (OSError, ValueError, struct.error):
+        return None
+    if habits is None:
+        return None
+    storage.known_version = version
+    return habits
+
+
+def _restore(storage, buffer):
+    """
+    Builds habits from a mapped snapshot, returns (habits, (database_id, changes)), habits None if outdated.
+
+    Columns are read as memoryviews over the mapping (no section copies); only the per-habit values the Habit
+    objects hold are materialized. All views are local and die with this frame, before the mapping is closed.
+    """
+    magic, database_id, changes, user_id, n, text_size = _HEADER.unpack_from(buffer)
+    if magic != MAGIC or user_id != storage.user_id or (database_id, changes) != storage.data_version():
+        return None, None
+    view = memoryview(buffer)
+    try:    # Caught here: a propagating traceback would keep the views (and the mapping) alive
+        offset = _HEADER.size
+        habit_ids, offset = _column(view, offset, "q", n)
+        columns = []
+        for _ in _COLUMNS:
+            column, offset = _column(view, offset, "i", n)
+            columns.append(column.tolist())
+        if offset + text_size > len(view):
+            raise ValueError("truncated snapshot text")
+        texts = str(view[offset:offset + text_size], "utf-8").split("\0") if n else []
+        offset += text_size + (-text_size % 8)
+        total = sum(length for length in columns[-1] if length > 0)
+        ordinals, offset = _column(view, offset, "i", total)
+    except ValueError:
+        return None, None
+    pairs = texts[2 * n:]
+    codes = columns[4]
+    if len(pairs) % 2 or offset != len(view) or (n and not 0 <= min(codes) <= max(codes) < len(pairs) // 2):
+        return None, None
+
+    sources = {encoding: storage.history_source(encoding) for encoding in set(pairs[1::2])}
+    periods = pairs[0::2]
+    summaries = zip(habit_ids.tolist(), texts[0:2 * n:2], texts[1:2 * n:2], *columns[:5])
+    if len(sources) == 1:       # Common case: one class/ history loader for all habits
+        (habit_class, load), = sources.values()
+        from_summary = habit_class.from_summary
+        habits = [from_summary(habit_id, name, description, periods[kind], current, longest, last or None, count,
+                               load)
+                  for habit_id, name, description, current, longest, last, count, kind in summaries]
+    else:
+        kinds = [(period, *sources[encoding]) for period, encoding in zip(periods, pairs[1::2])]
+        habits = [habit_class.from_summary(habit_id, name, description, period, current, longest, last or None,
+                                           count, load)
+                  for habit_id, name, description, current, longest, last, count, kind in summaries
+                  for period, habit_class, load in (kinds[kind],)]
+
+    position = 0
+    for habit, current, longest, length in zip(habits, columns[0], columns[1], columns[-1]):
+        if length >= 0:
+            habit.load_ordinals(ordinals[position:position + length])
+            habit.set_streak(current, longest)
+            position += length
+    return habits, (database_id, changes)
+
+
+@timed("snapshot.load_manager")
+def load_manager(storage, path=None):
+    """
+    Returns HabitManager with the habits of storage's user: restored from the snapshot if current,
+    else loaded with storage.load_all_habits().
+
+    The garbage collector is paused meanwhile: tens of thousands of new, acyclic objects would otherwise
+    trigger repeated collections over the growing heap (more than half of the load time). Afterwards the
+    new objects are moved to the oldest generation untraversed (gc.freeze()/ unfreeze()), as they live for
+    the session; else the first allocation after re-enabling collects all of them (~20 ms at 50k habits).
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        manager = HabitManager(storage)
+        habits = load_snapshot(storage, path)
+        manager.habits = habits if habits is not None else storage.load_all_habits()
+        return manager
+    finally:
+        if gc.get_freeze_count() == 0:  # Leave a caller's frozen objects frozen
+            gc.freeze()
+            gc.unfreeze()
+        if enabled:
+            gc.enable()
@@ -0,0 +1,87 @@
+"""
+-------------------
+Batch Streak Module
+-------------------
+Implements vectorized (NumPy) current and longest streak computation for many habits at once.
+Completions of all habits are passed as flat arrays of (habit index, date ordinal); streaks follow
+the same rules as Habit.compute_streak() and are derived with diff/ run-length operations.
+-------------------
+"""
+
+import numpy as np
+from instrumentation import timed
+from periods import PERIODS, UNCHAINED
+
+# Period code per habit periodicity, any other period (code len(PERIOD_CODES)) never continues a streak
+PERIOD_CODES = {period: code for code, period in enumerate(PERIODS)}
+_RULES = (*PERIODS.values(), UNCHAINED)
+
+
+@timed("streaks.compute_streaks")
+def compute_streaks(habit_index, ordinals, period_codes):
+    """
+    Computes current and longest streaks of many habits at once.
+
+    Args:
+        habit_index (array-like [int]):     Habit position (0..n-1) per completion.
+        ordinals (array-like [int]):        Date ordinal per completion, unique per habit.
+                                            Rows must be sorted by (habit_index, ordinal).
+        period_codes (array-like [int]):    PERIOD_CODES value per habit (length n).
+
+    Returns:
+        tuple [np.ndarray, np.ndarray]:     (current_streak, longest_streak) per habit, 0 without completions.
+    """
+    habit_index = np.asarray(habit_index, dtype=np.int64)
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    period_codes = np.asarray(period_codes, dtype=np.int64)
+    n_habits = len(period_codes)
+    current = np.zeros(n_habits, dtype=np.int64)
+    longest = np.zeros(n_habits, dtype=np.int64)
+    if len(ordinals) == 0:
+        return current, longest
+
+    # Period bucket id per completion (periods.py): day, ISO week or month ordinal
+    codes = period_codes[habit_index]
+    keys = ordinals.copy()
+    for code in np.unique(codes).tolist():
+        if code != PERIOD_CODES["daily"]:
+            rows = codes == code
+            keys[rows] = _RULES[min(code, len(PERIOD_CODES))].np_buckets(ordinals[rows])
+
+    # Further completions within a habit's bucket are neutral: keep the first one per bucket
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = (habit_index[1:] != habit_index[:-1]) | (keys[1:] != keys[:-1])
+    habit_index, keys = habit_index[first], keys[first]
+
+    # Completion continues a run if same habit and next bucket id
+    continues = np.zeros(len(keys), dtype=bool)
+    continues[1:] = (habit_index[1:] == habit_index[:-1]) & (keys[1:] == keys[:-1] + 1)
+
+    # Run-length encode: runs start where a completion doesn't continue the previous one
+    run_starts = np.flatnonzero(~continues)
+    run_lengths = np.diff(np.append(run_starts, len(keys)))
+    run_habits = habit_index[run_starts]
+
+    np.maximum.at(longest, run_habits, run_lengths)
+    last_runs = np.flatnonzero(np.append(run_habits[1:] != run_habits[:-1], True))
+    current[run_habits[last_runs]] = run_lengths[last_runs]
+    return current, longest
+
+
+@timed("streaks.compute_habit_streaks")
+def compute_habit_streaks(habits):
+    """
+    Bulk recompute: updates current/ longest streak of Habit objects in one vectorized pass.
+
+    Args:
+        habits (list [Habit]):  Habits with loaded (or lazily loadable) completion histories.
+    """
+    histories = [np.frombuffer(habit.completion_ordinals(), dtype=np.intc) for habit in habits]
+    if not histories:
+        return
+    habit_index = np.repeat(np.arange(len(habits)), [len(h) for h in histories])
+    ordinals = np.concatenate(histories)
+    period_codes = [PERIOD_CODES.get(habit.period, len(PERIOD_CODES)) for habit in habits]
+    current, longest = compute_streaks(habit_index, ordinals, period_codes)
+    for habit, current_streak, longest_streak in zip(habits, current.tolist(), longest.tolist()):
+        habit.set_streak(current_streak, longest_streak)
@@ -0,0 +1,101 @@
+"""
+---------------------
+Synthetic Data Module
+---------------------
+Generates large, reproducible habit datasets for benchmarks and scaling tests.
+Writes N habits x Y years of completions straight into a habits.db (bulk inserts, one transaction).
+Used by benchmark.py, complements the small fixed demo data in sample_data.py.
+---------------------
+"""
+
+import random
+from datetime import date, timedelta
+from db import DatabaseStorage
+
+PATTERNS = ("uniform", "streaky")
+
+
+def generate_completions(rng, period, start, end, density=0.7, pattern="streaky", mean_streak=6):
+    """
+    Generates completion dates of one habit between start and end (inclusive).
+
+    Args:
+        rng (random.Random):    Seeded random generator.
+        period (str):           'daily' or 'weekly'.
+        start (date):           First possible completion.
+        end (date):             Last possible completion.
+        density (float):        Share of periods completed (0..1).
+        pattern (str):          'uniform' (independent periods) or
+                                'streaky' (alternating runs and gaps, geometric lengths).
+        mean_streak (float):    Mean run length for 'streaky' pattern.
+
+    Returns:
+        list [date]:            Sorted completion dates (one per completed period).
+    """
+    step = 1 if period == "daily" else 7
+    n_periods = (end - start).days // step + 1
+    if pattern == "uniform":
+        completed = [rng.random() < density for _ in range(n_periods)]
+    else:
+        completed = []
+        mean_gap = max(mean_streak * (1 - density) / max(density, 1e-9), 1e-9)
+        on = rng.random() < density
+        while len(completed) < n_periods:
+            mean = mean_streak if on else mean_gap
+            length = 1 + int(rng.expovariate(1 / mean)) if mean >= 1 else int(rng.random() < mean)
+            completed.extend([on] * length)
+            on = not on
+        completed = completed[:n_periods]
+
+    dates = []
+    for i, done in enumerate(completed):
+        if done:
+            offset = i * step + (rng.randrange(7) if step == 7 else 0)    # Weekly: random weekday
+            dates.append(min(start + timedelta(days=offset), end))
+    return sorted(set(dates))
+
+
+def generate_synthetic_db(db_name, n_habits=1000, years=3, density=0.7, pattern="streaky", mean_streak=6,
+                          weekly_share=0.3, seed=42, end=None, users=1):
+    """
+    Creates n_habits habits with `years` of completions in database db_name.
+
+    Args:
+        db_name (str):          Target database file (created/ migrated if needed, existing data is kept).
+        n_habits (int):         Number of habits.
+        years (float):          History length in years, ending at end.
+        density (float):        Share of periods completed (0..1).
+        pattern (str):          'uniform' or 'streaky' (see generate_completions()).
+        mean_streak (float):    Mean run length for 'streaky' pattern.
+        weekly_share (float):   Share of weekly habits (rest daily).
+        seed (int):             Random seed, same arguments produce the same database.
+        end (date, optional):   Last day of history, defaults to date.today().
+        users (int):            Number of users (IDs 0..users-1), habits are dealt round-robin.
+
+    Returns:
+        int:                    Number of completion rows written.
+    """
+    if pattern not in PATTERNS:
+        raise ValueError(f"pattern must be one of {PATTERNS}")
+    rng = random.Random(seed)
+    end = end or date.today()
+    start = end - timedelta(days=int(365.25 * years))
+
+    with DatabaseStorage(db_name) as storage:
+        conn = storage.connection
+        with conn:
+            cursor = conn.cursor()
+            first_id = (cursor.execute("SELECT MAX(habit_id) FROM habits").fetchone()[0] or 0) + 1
+            habits = [(i % users, first_id + i, f"Habit {first_id + i}", f"Synthetic habit {first_id + i}",
+                       "weekly" if rng.random() < weekly_share else "daily") for i in range(n_habits)]
+            cursor.executemany("INSERT INTO habits (user_id, habit_id, name, description, period) "
+                               "VALUES (?, ?, ?, ?, ?)", habits)
+            n_rows = 0
+            for user_id, habit_id, _, _, period in habits:
+                dates = generate_completions(rng, period, start, end, density, pattern, mean_streak)
+                cursor.executemany("INSERT INTO completions (user_id, habit_id, completed_dates) VALUES (?, ?, ?)",
+                                   ((user_id, habit_id, d.isoformat()) for d in dates))
+                n_rows += len(dates)
+        for user_id in range(users):
+            storage.for_user(user_id).recompute_streaks()
+    return n_rows
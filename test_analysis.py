@@ -6,6 +6,8 @@ Unit tests for Analytics module
 
 import pytest
 from analysis import list_all_habits, list_habit_by_period, longest_streak_of_all, longest_streak_one
+from analysis import list_habit_by_period_cached, longest_streak_of_all_cached, longest_streak_one_cached
+from habit_manager import HabitManager
 from sample_data import create_sample_habits_and_completions
 
 @pytest.fixture
@@ -41,4 +43,54 @@ def test_longest_streak_of_all(habits):
 def test_longest_streak_one(habits):
     """Test longest_streak_one() returns historically longest streak for specific habit by ID."""
     longest = longest_streak_one(habits, 3)
-    assert longest == ["Cook Meal", 7]
\ No newline at end of file
+    assert longest == ["Cook Meal", 7]
+
+
+def test_cached_analysis_invalidated_by_manager_changes(mock_storage):
+    """Test 5: Cached results are reused on unchanged data and recomputed after create/ complete/ delete."""
+    manager = HabitManager(mock_storage)
+    manager.habits = create_sample_habits_and_completions()
+    for i, h in enumerate(manager.habits, start=1):
+        h.habit_id = i
+        h.compute_streak()
+    manager.habits = list(manager.habits)   # Re-index with IDs
+
+    first = longest_streak_of_all_cached(manager)
+    assert first == ["Read", 20]
+    assert longest_streak_of_all_cached(manager) is first
+    assert list_habit_by_period_cached(manager, "weekly") == ["Meditate", "Swim"]
+
+    manager.delete_habit(1)
+    assert longest_streak_of_all_cached(manager) == ["Cook Meal", 7]
+    assert manager.complete_habit(3) is True      # Cook Meal streak 7 -> 8 (completed up to yesterday)
+    assert longest_streak_one_cached(manager, 3) == ["Cook Meal", 8]
+    assert longest_streak_of_all_cached(manager) == ["Cook Meal", 8]
+
+    version = manager.version
+    manager.create_habit("Yoga", "Stretch for 10min.", "weekly")
+    assert manager.version > version
+    assert list_habit_by_period_cached(manager, "weekly") == ["Meditate", "Swim", "Yoga"]
+
+def test_cached_analysis_follows_direct_habit_changes(mock_storage):
+    """Test 6: Completions and renames made on habits directly (not via the manager) invalidate cached results."""
+    manager = HabitManager(mock_storage)
+    manager.habits = create_sample_habits_and_completions()
+    for i, h in enumerate(manager.habits, start=1):
+        h.habit_id = i
+        h.compute_streak()
+    manager.habits = list(manager.habits)
+
+    cook = manager.get_habit(3)
+    assert longest_streak_one_cached(manager, 3) == ["Cook Meal", 7]
+    assert cook.complete_habit() is True          # Bypasses HabitManager.complete_habit()
+    assert longest_streak_one_cached(manager, 3) == ["Cook Meal", 8]
+
+    assert list_habit_by_period_cached(manager, "daily") == ["Read", "Play Guitar", "Cook Meal"]
+    cook.name = "Bake"
+    assert list_habit_by_period_cached(manager, "daily") == ["Read", "Play Guitar", "Bake"]
+    assert manager.get_habits_by_name("Bake") == [cook] and manager.get_habits_by_name("Cook Meal") == []
+
+    manager.delete_habit(3)
+    version = manager.version
+    cook.name = "Cook Meal"                        # No longer held, no effect on the manager
+    assert manager.version == version
@@ -0,0 +1,71 @@
+"""
+-----------------------------
+Unit Tests for archive module
+-----------------------------
+"""
+
+from datetime import date, timedelta
+import numpy as np
+from analysis import completion_rate, completions_per_period
+from archive import CompletionArchive, archive_path, refresh_archive
+from habit import Habit
+from habit_manager import HabitManager
+
+def _same_columns(archive, other):
+    """True if two archives hold the same columns."""
+    return all(np.array_equal(getattr(archive, name), getattr(other, name))
+               for name in ("habit_ids", "ordinals", "habits", "offsets"))
+
+def test_archive_analytics_match_sql(storage):
+    """Test 1: NumPy analytics over the archive equal the SQL aggregates, history slices are archive views."""
+    storage.save_habit(Habit("Stretch", "Stretch for 5min.", "monthly"))
+    storage.save_habit(Habit("Rest", "No completions yet.", "daily"))
+    habit = storage.load_habit(6)
+    for day in range(40):
+        habit.add_completion(date(2026, 1, 1) + timedelta(days=3 * day))
+    storage.save_habit(habit)
+    manager = HabitManager(storage)
+    manager.habits = storage.load_all_habits()
+    archive = refresh_archive(storage)
+
+    assert list(archive.habits) == [1, 2, 3, 4, 5, 6]
+    assert list(archive.history(6)) == list(habit.completion_ordinals()) and len(archive.history(7)) == 0
+    assert not archive.history(6).flags.owndata
+    for start, end in ((date(2026, 1, 1), date(2026, 3, 31)), (date(2026, 2, 18), date(2026, 3, 4)),
+                       (date(2030, 1, 1), date(2030, 12, 31))):
+        assert completion_rate(manager, start, end, archive=archive) == completion_rate(manager, start, end)
+        assert completion_rate(storage, start, end, archive=archive) == completion_rate(storage, start, end)
+        for bucket in ("week", "month"):
+            assert (completions_per_period(manager, start, end, bucket, archive=archive)
+                    == completions_per_period(manager, start, end, bucket))
+
+def test_archive_refresh_is_incremental(storage, tmp_path):
+    """Test 2: Refresh reads only new completion rows and equals a rebuild; deletions or other users rebuild."""
+    archive = refresh_archive(storage)
+    habit = storage.load_habit(2)
+    habit.add_completion(date(2026, 3, 16))
+    storage.save_habit(habit)
+    storage.save_habit(Habit("Stretch", "Stretch for 5min.", "daily"))
+    habit = storage.load_habit(6)
+    habit.add_completion(date(2026, 3, 16))
+    storage.save_habit(habit)
+
+    statements = []
+    storage.connection.set_trace_callback(statements.append)
+    refreshed = refresh_archive(storage)
+    storage.connection.set_trace_callback(None)
+    assert any(f"id > {archive.watermark}" in s for s in statements)
+    assert len(refreshed) == len(archive) + 2 and refreshed.watermark > archive.watermark
+    rebuilt = refresh_archive(storage, str(tmp_path / "rebuilt.archive"))
+    assert _same_columns(refreshed, rebuilt)
+    assert refresh_archive(storage).path == archive_path(storage)
+
+    habit = storage.load_habit(1)                # Deleted rows: new ids alone can't tell
+    habit.remove_completion(habit.completed_dates[0])
+    storage.save_habit(habit)
+    storage.delete_habit(4)
+    refreshed = refresh_archive(storage)
+    assert refreshed.deletes == storage.completion_version()[1]
+    assert 4 not in refreshed.habits and len(refreshed) == len(rebuilt) - 1 - len(rebuilt.history(4))
+    assert len(refresh_archive(storage.for_user(7), archive_path(storage))) == 0
+    assert CompletionArchive(archive_path(storage)).user_id == 7
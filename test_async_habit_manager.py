@@ -0,0 +1,63 @@
+"""
+--------------------------------------
+Unit Tests for AsyncHabitManager class
+--------------------------------------
+"""
+
+import asyncio
+import threading
+import pytest
+import instrumentation
+from datetime import date, timedelta
+from analysis import longest_streak_of_all
+from async_db import AsyncDatabaseStorage
+from async_habit_manager import AsyncHabitManager
+from habit import Habit
+
+def test_concurrent_completions_are_group_committed(tmp_path):
+    """Test 1: Concurrent check-offs are written in few transactions on one thread and survive a reload."""
+    async def scenario():
+        async with AsyncDatabaseStorage(str(tmp_path / "habits.db")) as storage:
+            manager = AsyncHabitManager(storage)
+            for i in range(50):
+                await manager.create_habit(f"Habit {i}", "Synthetic habit", "daily")
+            instrumentation.enable()
+            instrumentation.reset()
+            try:
+                results = await asyncio.gather(*(manager.complete_habit(h.habit_id) for h in manager.habits))
+                saves = instrumentation.snapshot()["db.save_habits"]["count"]
+            finally:
+                instrumentation.enable(False)
+                instrumentation.reset()
+            assert all(results) and saves < 50
+
+            reloaded = AsyncHabitManager(storage)
+            await reloaded.load()
+            assert [h.current_streak for h in reloaded.habits] == [1] * 50
+            assert longest_streak_of_all(reloaded)[1] == 1
+            assert reloaded.habits[0].completed_dates == [date.today()]     # Lazy history via storage thread
+            assert await reloaded.complete_habits([h.habit_id for h in reloaded.habits[:3]]) == [False] * 3
+            assert await reloaded.delete_habit(reloaded.habits[0].habit_id)
+            assert len(await storage.load_habit_ids()) == 49
+        return threading.active_count()
+
+    threads = threading.active_count()
+    assert asyncio.run(scenario()) == threads     # Executor thread stopped on close
+
+def test_failed_group_commit_raises_for_all(tmp_path):
+    """Test 2: A failing transaction raises for every save of its group and keeps changes unsaved."""
+    async def scenario():
+        async with AsyncDatabaseStorage(str(tmp_path / "habits.db")) as storage:
+            good = Habit("Read", "Read for 15min.", "daily")
+            bad = Habit("Walk", None, "daily")      # Violates NOT NULL description
+            bad.add_completion(date.today() - timedelta(days=1))
+            results = await asyncio.gather(storage.save_habit(good), storage.save_habit(bad),
+                                           return_exceptions=True)
+            assert all(isinstance(r, Exception) for r in results)
+            assert good.is_dirty and bad.is_dirty
+            assert await storage.load_all_habits() == []
+            bad.description = "Walk 5000 steps."
+            await storage.save_habits([good, bad])
+            assert [h.name for h in await storage.load_all_habits()] == ["Read", "Walk"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,69 @@
+"""
+-----------------------------------------------------
+Unit Tests for CompletionBitmap and BitmapHabit class
+-----------------------------------------------------
+"""
+
+import random
+from datetime import date, timedelta
+from bitmap import BitmapHabit, CompletionBitmap
+from habit import Habit
+
+def test_bitmap_habit_matches_list_habit():
+    """Test 1: Random adds/ removes give equal histories, membership and compute_streak() results."""
+    rng = random.Random(3)
+    for period in ["daily", "weekly"] * 10:
+        habit = Habit("Read", "Read for 15min.", period)
+        bitmap_habit = BitmapHabit("Read", "Read for 15min.", period)
+        start = date(2024, 12, 1) + timedelta(days=rng.randrange(60))
+        for _ in range(300):
+            d = start + timedelta(days=rng.randrange(400))
+            if rng.random() < 0.8:
+                assert habit.add_completion(d) == bitmap_habit.add_completion(d)
+            else:
+                assert habit.remove_completion(d) == bitmap_habit.remove_completion(d)
+            assert (habit.current_streak, habit.longest_streak) == \
+                   (bitmap_habit.current_streak, bitmap_habit.longest_streak)
+        habit.compute_streak()
+        bitmap_habit.compute_streak()
+        assert (habit.current_streak, habit.longest_streak) == \
+               (bitmap_habit.current_streak, bitmap_habit.longest_streak)
+        assert bitmap_habit.completed_dates == habit.completed_dates
+        assert bitmap_habit.completion_ordinals() == habit.completion_ordinals()
+        assert bitmap_habit.last_completed == habit.last_completed
+        assert all((d in bitmap_habit.completed_dates) == (d in habit.completed_dates)
+                   for d in (start + timedelta(days=i) for i in range(-5, 410)))
+
+        bitmap = bitmap_habit.completion_bitmap()
+        assert CompletionBitmap.from_blob(bitmap.anchor, bitmap.to_blob()) == bitmap
+        assert sum(length for _, length in bitmap.runs()) == len(bitmap)
+
+def test_storage_migrates_bitmaps_both_ways(storage):
+    """Test 2: Encoded habits load from BLOBs, saves keep BLOB and rows in step, decoding restores row loads."""
+    stale = storage.load_habit(2)                  # Loaded before encoding
+    expected = {h.habit_id: list(h.completed_dates) for h in storage.load_all_habits(with_history=True)}
+    assert storage.encode_bitmaps([1, 2, 3]) == 3 and storage.encode_bitmaps() == 2
+
+    statements = []
+    storage.connection.set_trace_callback(statements.append)
+    habits = storage.load_all_habits()
+    assert all(isinstance(h, BitmapHabit) for h in habits)
+    assert {h.habit_id: list(h.completed_dates) for h in habits} == expected
+    assert not any("FROM completions" in s for s in statements)
+    storage.connection.set_trace_callback(None)
+
+    read = storage.load_habit_summary(1)
+    assert read.add_completion(date(2026, 3, 15)) and not read.history_loaded
+    storage.save_habit(read)
+    assert stale.add_completion(date(2026, 3, 16))
+    storage.save_habit(stale)                      # Plain Habit drops the BLOB, rows stay current
+    for habit_id, d in [(1, date(2026, 3, 15)), (2, date(2026, 3, 16))]:
+        habit = storage.load_habit(habit_id)
+        assert isinstance(habit, BitmapHabit) and habit.completed_dates[-1] == d
+        assert habit.completion_ordinals().tolist() == storage.load_completion_ordinals(habit_id)
+
+    assert storage.decode_bitmaps() == 5
+    habits = storage.load_all_habits()
+    assert not any(isinstance(h, BitmapHabit) for h in habits)
+    assert storage.connection.execute("SELECT COUNT(*) FROM completion_bitmaps").fetchone()[0] == 0
+    assert habits[0].completed_dates[-1] == date(2026, 3, 15) and habits[0].current_streak == 8
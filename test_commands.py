@@ -0,0 +1,65 @@
+"""
+------------------------------------------------
+Unit Tests for command mode and startup of main.py
+------------------------------------------------
+"""
+
+import io
+import json
+import os
+import subprocess
+import sys
+from datetime import date
+from commands import run
+from main import HabitLoader, parse_args
+
+def _run(db_name, *argv):
+    """Runs main.py subcommand argv against db_name, returns (exit status, parsed JSON output)."""
+    out = io.StringIO()
+    status = run(parse_args(list(argv)), db_name, out)
+    return status, json.loads(out.getvalue())
+
+def test_commands_touch_only_needed_rows(storage):
+    """Test 1: complete/ create/ delete/ list/ stats print JSON and never read the whole completions table."""
+    db_name = storage.db_name
+    statements = []
+    storage.connection.set_trace_callback(statements.append)
+    assert storage.load_habit_summary(1).habit_id == 1
+    assert not any("completions" in s for s in statements)
+    storage.connection.set_trace_callback(None)
+
+    status, result = _run(db_name, "complete", "Read", "--date", "2026-03-15")
+    assert status == 0 and result["completed"] and result["current_streak"] == 8
+    assert _run(db_name, "complete", "1", "--date", "2026-03-15")[1]["completed"] is False
+    status, result = _run(db_name, "create", "Walk", "Walk 5000 steps.", "--period", "weekly")
+    assert status == 0 and result["habit_id"] == 6 and result["period"] == "weekly"
+    assert [h["name"] for h in _run(db_name, "list", "--period", "weekly")[1]["habits"]] == ["Meditate", "Swim", "Walk"]
+    status, result = _run(db_name, "stats")
+    assert (result["habits"], result["periods"], result["longest"]["name"]) == (6, {"daily": 3, "weekly": 3}, "Read")
+    assert _run(db_name, "delete", "Walk") == (0, {"habit_id": 6, "name": "Walk", "deleted": True})
+    assert _run(db_name, "delete", "Walk") == (1, {"error": "habit 'Walk' not found"})
+    _run(db_name, "create", "2026", "Numeric name.")    # Not an ID (7), found by name
+    assert _run(db_name, "complete", "2026", "--date", "2026-03-15")[1]["name"] == "2026"
+    assert _run(db_name, "stats", "\u00b9") == (1, {"error": "habit '\u00b9' not found"})    # Non-ASCII digit
+    status, result = _run(db_name, "create", "Pay Rent", "Transfer the rent.", "--period", "monthly")
+    assert status == 0 and result["period"] == "monthly"
+    assert [h["name"] for h in _run(db_name, "list", "--period", "monthly")[1]["habits"]] == ["Pay Rent"]
+    assert _run(db_name, "stats")[1]["periods"] == {"daily": 4, "monthly": 1, "weekly": 2}
+
+def test_command_mode_skips_interactive_imports(tmp_path):
+    """Test 2: Running a subcommand never imports questionary or tabulate."""
+    script = ("import sys, main; main.commands.run(main.parse_args(['list']), 'habits.db'); "
+              "print(sorted({'questionary', 'tabulate'} & set(sys.modules)))")
+    output = subprocess.run([sys.executable, "-c", script], cwd=str(tmp_path), capture_output=True, text=True,
+                            env={**os.environ, "PYTHONPATH": os.path.dirname(os.path.abspath(__file__))}).stdout
+    assert output.splitlines() == ['{"habits": []}', "[]"]
+
+def test_habit_loader_loads_in_background(storage):
+    """Test 3: Habits loaded on the loader thread are usable (lazy history, saves) from the main thread."""
+    db_name = storage.db_name
+    manager = HabitLoader(db_name).result()
+    assert len(manager.habits) == 5 and not manager.habits[0].history_loaded
+    assert manager.habits[0].completed_dates[-1] == date(2026, 3, 14)
+    assert manager.delete_habit(manager.habits[0].habit_id)
+    manager.storage.close()
+    assert HabitLoader(db_name, user_id=3).result().habits == []
@@ -0,0 +1,189 @@
+"""
+------------------------------------
+Unit Tests for DatabaseStorage class
+------------------------------------
+"""
+
+import pytest
+import random
+import sqlite3
+from datetime import date
+from db import DatabaseStorage
+from habit import Habit
+
+def test_load_all_habits_matches_single_loads(storage):
+    """Test 1: Bulk load_all_habits() returns the same habits, dates and streaks as load_habit() per ID."""
+    habits = storage.load_all_habits()
+    assert [h.habit_id for h in habits] == storage.load_habit_ids()
+    for habit in habits:
+        single = storage.load_habit(habit.habit_id)
+        single.compute_streak()
+        assert (habit.name, habit.description, habit.period) == (single.name, single.description, single.period)
+        assert habit.completed_dates == single.completed_dates
+        assert (habit.current_streak, habit.longest_streak) == (single.current_streak, single.longest_streak)
+    assert habits[0].completed_dates[0] == date(2026, 2, 15)
+
+def test_persistent_connection_is_tuned(tmp_path):
+    """Test 2: Storage reuses one connection with configured pragmas and reopens it after close()."""
+    storage = DatabaseStorage(str(tmp_path / "habits.db"), pragmas={"cache_size": -4000})
+    conn = storage.connection
+    assert storage.connection is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1    # NORMAL
+    assert conn.execute("PRAGMA cache_size").fetchone()[0] == -4000
+    storage.close()
+    assert storage.load_all_habits() == []
+    assert storage.connection is not conn
+    storage.close()
+
+def test_legacy_database_is_migrated(tmp_path):
+    """Test 3: Unversioned habits.db gets deduplicated, uniquely indexed completions and user_version set."""
+    db_name = str(tmp_path / "habits.db")
+    with sqlite3.connect(db_name) as conn:
+        conn.execute("CREATE TABLE habits (habit_id INTEGER PRIMARY KEY, name TEXT NOT NULL, "
+                     "description TEXT NOT NULL, period TEXT NOT NULL)")
+        conn.execute("CREATE TABLE completions (id INTEGER PRIMARY KEY, habit_id INTEGER, completed_dates TEXT)")
+        conn.execute("INSERT INTO habits VALUES (1, 'Read', 'Read for 15min.', 'daily')")
+        conn.executemany("INSERT INTO completions (habit_id, completed_dates) VALUES (1, ?)",
+                         [("2026-01-01",), ("2026-01-02",), ("2026-01-01",)])
+    conn.close()
+
+    with DatabaseStorage(db_name) as storage:
+        conn = storage.connection
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == DatabaseStorage.SCHEMA_VERSION
+        assert conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0] == 2
+        habit = storage.load_habit(1)
+        habit.add_completion(date(2026, 1, 3))
+        storage.save_habit(habit)
+        storage.save_habit(habit)
+        assert conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0] == 3
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT completed_dates FROM completions "
+                            "WHERE user_id = 0 AND habit_id = 1").fetchall()
+        assert "idx_completions_user_habit_date" in plan[0][-1]
+
+def test_save_habit_writes_only_delta(storage):
+    """Test 4: save_habit() is a no-op for clean habits and writes only added/ removed completions."""
+    habit = storage.load_habit(1)
+    statements = []
+    storage.connection.set_trace_callback(statements.append)
+    storage.save_habit(habit)
+    assert statements == []
+
+    habit.add_completion(date(2026, 3, 20))
+    habit.remove_completion(habit.completed_dates[0])
+    assert habit.is_dirty
+    storage.save_habit(habit)
+    assert not habit.is_dirty
+    assert not any("SELECT" in s for s in statements)
+    assert sum("UPDATE habits" in s for s in statements) == 1     # Streak summary only
+    storage.connection.set_trace_callback(None)
+
+    reloaded = storage.load_habit(1)
+    assert reloaded.completed_dates == habit.completed_dates
+
+def test_load_all_habits_is_lazy(storage):
+    """Test 5: Startup loads stored streak summaries only, history is fetched on first use."""
+    habits = storage.load_all_habits()
+    assert not any(h.history_loaded for h in habits)
+    swim = habits[4]
+    assert (swim.current_streak, swim.longest_streak, swim.completion_count) == (4, 4, 4)
+    assert swim.last_completed == date(2026, 3, 15)
+
+    assert swim.add_completion(date(2026, 3, 22)) is True     # In-order check-off, no history needed
+    storage.save_habit(swim)
+    assert not swim.history_loaded
+
+    reloaded = storage.load_all_habits()[4]
+    assert (reloaded.current_streak, reloaded.longest_streak, reloaded.completion_count) == (5, 5, 5)
+    assert len(reloaded.completed_dates) == 5 and reloaded.history_loaded
+    reloaded.compute_streak()
+    assert (reloaded.current_streak, reloaded.longest_streak) == (5, 5)
+
+def test_recompute_streaks_matches_habits(storage):
+    """Test 6: Bulk recompute_streaks() and with_history loading agree with compute_streak() per habit."""
+    storage.connection.execute("UPDATE habits SET current_streak = 99, longest_streak = 99")
+    storage.recompute_streaks()
+    summaries = [(h.current_streak, h.longest_streak, h.completion_count) for h in storage.load_all_habits()]
+    loaded = storage.load_all_habits(with_history=True)
+    assert [(h.current_streak, h.longest_streak, h.completion_count) for h in loaded] == summaries
+    for habit in loaded:
+        habit.compute_streak()
+    assert [(h.current_streak, h.longest_streak, h.completion_count) for h in loaded] == summaries
+
+@pytest.mark.parametrize("suffix", [".csv", ".jsonl"])
+def test_export_import_round_trip(storage, tmp_path, suffix):
+    """Test 7: Streamed export and chunked import reproduce habits, completions and streak summaries."""
+    storage.save_habit(Habit("Stretch", "Stretch for 5min.", "daily"))     # Habit without completions
+    path = str(tmp_path / f"export{suffix}")
+    assert storage.export_file(path) == 27 + 14 + 14 + 2 + 4 + 1     # One record per completion (+ empty habit)
+    with DatabaseStorage(str(tmp_path / "imported.db")) as target:
+        assert target.import_file(path, chunk_size=7) == (6, 61)
+        imported = target.load_all_habits()
+        original = storage.load_all_habits()
+        assert [(h.name, h.period, h.current_streak, h.longest_streak, h.completion_count) for h in imported] == \
+               [(h.name, h.period, h.current_streak, h.longest_streak, h.completion_count) for h in original]
+        assert imported[2].completed_dates == original[2].completed_dates
+
+def test_users_are_isolated(storage):
+    """Test 8: Habits and completions of one user are invisible to (and untouched by) another user's storage."""
+    other = storage.for_user(7)
+    assert other.load_all_habits() == [] and other.load_habit(1) is None
+    habit = Habit("Walk", "Walk 5000 steps.", "daily")
+    habit.add_completion(date(2026, 3, 14))
+    other.save_habit(habit)
+    assert not other.delete_habit(1)
+    assert [h.name for h in other.load_all_habits()] == ["Walk"]
+    assert habit.habit_id not in storage.load_habit_ids() and len(storage.load_habit_ids()) == 5
+    assert storage.load_habit(habit.habit_id) is None and not storage.delete_habit(habit.habit_id)
+    storage.recompute_streaks()
+    assert other.load_all_habits()[0].current_streak == 1
+    plan = storage.connection.execute("EXPLAIN QUERY PLAN SELECT habit_id FROM habits WHERE user_id = 7").fetchall()
+    assert "idx_habits_user" in plan[0][-1]
+
+def test_sql_completion_analytics_match_python(storage):
+    """Test 9: SQL completion rates and per-week/ month counts match the loaded histories, via index seeks."""
+    start, end = date(2026, 2, 20), date(2026, 3, 10)
+    habits = {h.habit_id: h for h in storage.load_all_habits(with_history=True)}
+    for habit_id, name, period, done, periods, rate in storage.completion_rates(start, end):
+        dates = [d for d in habits[habit_id].completed_dates if start <= d <= end]
+        if period == "weekly":
+            assert (done, periods) == (len({d.isocalendar()[:2] for d in dates}), 4)
+        else:
+            assert (done, periods) == (len(dates), 19)
+        assert rate == done / periods
+    for bucket, key in [("week", lambda d: d.toordinal() - d.weekday()), ("month", lambda d: (d.year, d.month))]:
+        expected = {}
+        for habit in habits.values():
+            for d in habit.completed_dates:
+                if start <= d <= end:
+                    expected[habit.habit_id, key(d)] = expected.get((habit.habit_id, key(d)), 0) + 1
+        rows = storage.completion_counts(start, end, bucket)
+        assert {(habit_id, key(date.fromisoformat(b))): n for habit_id, b, n in rows} == expected
+        assert all(date.fromisoformat(b).day == 1 if bucket == "month" else date.fromisoformat(b).weekday() == 0
+                   for _, b, _ in rows)
+    sql, params = storage._completions_in_range(start, end, None, join="LEFT JOIN")
+    plan = " ".join(row[-1] for row in storage.connection.execute(f"EXPLAIN QUERY PLAN SELECT 1 {sql}", params))
+    assert "COVERING INDEX idx_completions_user_habit_date (user_id=? AND habit_id=? AND completed_dates>?" in plan
+
+def test_sql_streaks_match_compute_streak(storage):
+    """Test 10: Gaps-and-islands streaks in SQL (one, top-N, all habits) match compute_streak(), across years."""
+    rng = random.Random(7)
+    for i in range(30):
+        habit = Habit(f"Random {i}", "Randomized habit", rng.choice(["daily", "weekly", "monthly"]))
+        start = date(2024, 12, 1).toordinal() + rng.randrange(60)
+        density = rng.choice([0.6, 0.05])
+        for ordinal in range(start, start + 500):
+            if rng.random() < density:
+                habit.add_completion(date.fromordinal(ordinal))
+        storage.save_habit(habit)
+    storage.save_habit(Habit("Stretch", "Stretch for 5min.", "daily"))     # Habit without completions
+    expected = {}
+    for habit in storage.load_all_habits(with_history=True):
+        habit.compute_streak()
+        expected[habit.habit_id] = (habit.current_streak, habit.longest_streak)
+    assert storage.streaks_sql() == expected
+    assert all(storage.streak_sql(habit_id) == streaks for habit_id, streaks in expected.items())
+    assert storage.streak_sql(12345) is None
+    top = storage.top_streaks_sql(5, by="current")
+    assert [row[3] for row in top] == sorted((c for c, _ in expected.values()), reverse=True)[:5]
+    assert [row[4] for row in storage.top_streaks_sql(3)] == sorted((l for _, l in expected.values()), reverse=True)[:3]
@@ -0,0 +1,61 @@
+"""
+---------------------------------------
+Unit Tests for GroupCommitStorage class
+---------------------------------------
+"""
+
+import threading
+import instrumentation
+from datetime import date
+from group_commit import GroupCommitStorage
+from habit import Habit
+from habit_manager import HabitManager
+
+def test_concurrent_check_offs_are_group_committed(tmp_path):
+    """Test 1: Check-offs from many threads are all persisted in far fewer transactions than writes."""
+    db_name = str(tmp_path / "habits.db")
+    storage = GroupCommitStorage(db_name, max_delay=0.005)
+    manager = HabitManager(storage)
+    created = [manager.submit_create(f"Habit {i}", "Synthetic habit", "daily") for i in range(400)]
+    habit_ids = [future.result().habit_id for future in created]
+    assert sorted(habit_ids) == sorted(h.habit_id for h in manager.habits)
+
+    instrumentation.enable()
+    instrumentation.reset()
+    results = []
+    try:
+        def worker(ids):
+            futures = [manager.submit_complete(habit_id) for habit_id in ids]
+            results.extend(future.result() for future in futures)
+        threads = [threading.Thread(target=worker, args=(habit_ids[i::8],)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        commits = instrumentation.snapshot()["db.group_commit"]["count"]
+    finally:
+        instrumentation.enable(False)
+        instrumentation.reset()
+    assert results == [True] * 400 and commits < 100
+    assert not any(h.is_dirty for h in manager.habits)
+    assert manager.delete_habit(habit_ids[0]) and not manager.delete_habit(habit_ids[0])
+    storage.close()
+
+    with GroupCommitStorage(db_name) as reopened:
+        habits = reopened.load_all_habits()
+        assert len(habits) == 399
+        assert all(h.last_completed == date.today() and h.current_streak == 1 for h in habits)
+
+def test_failed_write_fails_only_its_future(tmp_path):
+    """Test 2: A failing write is rolled back alone, other writes of the same batch are committed."""
+    storage = GroupCommitStorage(str(tmp_path / "habits.db"), max_delay=0.05)
+    good = Habit("Read", "Read for 15min.", "daily")
+    bad = Habit("Walk", None, "daily")      # Violates NOT NULL description
+    futures = [storage.save_habit(good), storage.save_habit(bad), storage.delete_habit(12345)]
+    assert futures[0].result() is None and futures[2].result() is False
+    assert isinstance(futures[1].exception(), Exception)
+    assert not good.is_dirty and good.habit_id is not None
+    assert bad.is_dirty and bad.habit_id is None
+    storage.close()
+    with GroupCommitStorage(str(tmp_path / "habits.db")) as reopened:
+        assert [h.name for h in reopened.load_all_habits()] == ["Read"]
@@ -5,8 +5,11 @@ Unit Tests for Habit Class
 """
 
 import pytest
-from datetime import date
+import random
+from datetime import date, timedelta
+from bitmap import BitmapHabit
 from habit import Habit
+from periods import period_rule
 
 def test_habit_creation():
     """Test 1: Habit initialization with all attributes and period normalization."""
@@ -49,4 +52,80 @@ def test_habit_completion():
                              ]
     habit.complete_habit()
     assert habit.completed_dates[-1] == date.today()
-    assert habit.current_streak > 0
\ No newline at end of file
+    assert habit.current_streak > 0
+
+@pytest.mark.parametrize("period", ["daily", "weekly"])
+def test_incremental_streak_matches_compute_streak(period):
+    """Test 5: In-order and out-of-order add_completion() match a full compute_streak()."""
+    rng = random.Random(7)
+    day = date(2024, 1, 1)
+    dates = []
+    for _ in range(300):
+        day += timedelta(days=rng.choice([1, 1, 1, 2, 7, 8]))
+        dates.append(day)
+    tail = dates[250:]          # Tail arrives out of order
+    rng.shuffle(tail)
+    dates[250:] = tail
+    assert any(d < max(dates[:i]) for i, d in enumerate(dates[251:], start=251))
+
+    habit = Habit("Habit", "Description", period)
+    reference = Habit("Habit", "Description", period)
+    for d in dates:
+        assert habit.add_completion(d) is True
+        reference.completed_dates = list(habit.completed_dates)
+        reference.compute_streak()
+        assert (habit.current_streak, habit.longest_streak) == \
+               (reference.current_streak, reference.longest_streak)
+    assert habit.add_completion(dates[10]) is False
+
+    habit.remove_completion(dates[-1])
+    reference.completed_dates = dates[:-1]
+    reference.compute_streak()
+    assert (habit.current_streak, habit.longest_streak) == \
+           (reference.current_streak, reference.longest_streak)
+
+
+def test_completed_dates_view_is_sorted_and_read_only():
+    """Test 6: completed_dates is a sorted, de-duplicated, read-only view with bisect membership."""
+    habit = Habit("Habit", "Description", "daily")
+    habit.completed_dates = [date(2025, 12, 11), date(2025, 12, 10), date(2025, 12, 11)]
+    assert habit.completed_dates == [date(2025, 12, 10), date(2025, 12, 11)]
+    assert date(2025, 12, 11) in habit.completed_dates
+    assert date(2025, 12, 12) not in habit.completed_dates
+    with pytest.raises(TypeError):
+        habit.completed_dates[0] = date(2025, 1, 1)
+    with pytest.raises(AttributeError):
+        habit.completed_dates.append(date(2025, 12, 12))
+
+@pytest.mark.parametrize("habit_class", [Habit, BitmapHabit])
+def test_run_index_queries_match_compute_streak(habit_class):
+    """Test 7: streak_on/ longest_streak_between/ breaks_between match compute_streak() on filtered histories."""
+    rng = random.Random(11)
+    for period in ["daily", "weekly", "monthly"] * 2:
+        habit = habit_class("Habit", "Description", period)
+        bucket = period_rule(period).bucket
+        start = date(2024, 12, 1)
+        for i in range(500):
+            d = start + timedelta(days=i if i % 50 else rng.randrange(500))   # Mostly in order
+            if rng.random() < 0.6:
+                habit.add_completion(d)
+            elif i % 97 == 0:
+                habit.remove_completion(rng.choice(habit.completed_dates) if habit.completed_dates else d)
+            if i % 40 == 0:
+                habit.streak_on(d)                                              # Index extended from here on
+
+        def streaks(dates):
+            reference = Habit("Habit", "Description", period)
+            reference.completed_dates = dates
+            reference.compute_streak()
+            return reference.current_streak, reference.longest_streak, \
+                   sum(bucket(b.toordinal()) - bucket(a.toordinal()) > 1 for a, b in zip(dates, dates[1:]))
+
+        dates = list(habit.completed_dates)
+        for _ in range(60):
+            first = start + timedelta(days=rng.randrange(-10, 520))
+            last = first + timedelta(days=rng.randrange(0, 200))
+            assert habit.streak_on(first) == streaks([d for d in dates if d <= first])[0]
+            assert habit.longest_streak_between(first, last) == streaks([d for d in dates if first <= d <= last])[1]
+            restarts = streaks([d for d in dates if d <= last])[2] - streaks([d for d in dates if d < first])[2]
+            assert habit.breaks_between(first, last) == restarts
@@ -5,22 +5,14 @@ Unit Tests for HabitManager class
 """
 
 import pytest
+from habit import Habit
 from habit_manager import HabitManager
-
-class MockStorage:
-    """Mock storage backend to prevent DB writes during testing."""
-    def save_habit(self, habit):
-        """Assign fake ID if new habit."""
-        if habit.habit_id is None:
-            habit.habit_id = 1
-
-    def delete_habit(self, habit_id):
-        pass
+from analysis import list_habit_by_period, longest_streak_one
 
 @pytest.fixture
-def manager():
+def manager(mock_storage):
     """HabitManager with mock storage."""
-    return HabitManager(MockStorage())
+    return HabitManager(mock_storage)
 
 def test_create_habit_adds_to_list(manager):
     """Test 1: create_habit() adds new habit to in-memory list."""
@@ -46,3 +38,36 @@ def test_get_habit(manager):
     """Test 3: get_habit() returns None for non-existent ID."""
     assert manager.get_habit(99) is None
 
+
+def test_indexes_follow_habits_assignment_and_delete(manager):
+    """Test 5: Assigning manager.habits rebuilds ID/ name/ period indexes, delete_habit keeps them consistent."""
+    habits = [Habit("Read", "Read for 15min.", "daily", 1),
+              Habit("Swim", "Swim for 60min.", "weekly", 2),
+              Habit("Cook Meal", "Prepare a healthy meal", "daily", 3)]
+    manager.habits = habits
+    assert manager.get_habit(2) is habits[1]
+    assert manager.get_habits_by_name("Read") == [habits[0]]
+    assert manager.get_habits_by_period("daily") == [habits[0], habits[2]]
+
+    assert manager.delete_habit(1) is True
+    assert manager.delete_habit(1) is False
+    assert manager.habits == [habits[1], habits[2]]
+    assert manager.get_habits_by_period("daily") == [habits[2]]
+    assert list_habit_by_period(manager, "daily") == ["Cook Meal"]
+    assert longest_streak_one(manager, 2) == ["Swim", 0]
+
+def test_renamed_habit_is_reindexed_and_deletable(manager):
+    """Test 6: update_habit() re-indexes name/ period, habits renamed directly are still deleted cleanly."""
+    habits = [Habit("Read", "Read for 15min.", "daily", 1),
+              Habit("Swim", "Swim for 60min.", "weekly", 2)]
+    manager.habits = habits
+    assert manager.update_habit(1, name="Read More", period="weekly") is True
+    assert manager.update_habit(9, name="Missing") is False
+    assert manager.get_habits_by_name("Read") == [] and manager.get_habits_by_name("Read More") == [habits[0]]
+    assert manager.get_habits_by_period("daily") == []
+    assert set(manager.get_habits_by_period("weekly")) == set(habits)
+
+    habits[1].name = "Swim Laps"    # Renamed behind the manager's back
+    assert manager.delete_habit(1) is True and manager.delete_habit(2) is True
+    assert manager.habits == [] and manager.get_habits_by_name("Swim") == []
+    assert manager.get_habits_by_period("weekly") == []
@@ -0,0 +1,50 @@
+"""
+--------------------------------------
+Unit Tests for instrumentation module
+--------------------------------------
+"""
+
+import json
+import pytest
+import instrumentation
+from analysis import longest_streak_of_all
+from db import DatabaseStorage
+from sample_data import create_sample_habits_and_completions
+
+@pytest.fixture
+def stats():
+    """Enables collection for one test, disables and clears afterwards."""
+    instrumentation.reset()
+    instrumentation.enable()
+    yield instrumentation
+    instrumentation.enable(False)
+    instrumentation.reset()
+
+def test_disabled_collects_nothing(tmp_path):
+    """Test 1: Without enabling, no timings are recorded and connections are plain sqlite3."""
+    instrumentation.reset()
+    with DatabaseStorage(str(tmp_path / "habits.db")) as storage:
+        for habit in create_sample_habits_and_completions():
+            habit.compute_streak()
+            storage.save_habit(habit)
+        assert type(storage.connection).__name__ == "Connection"
+    assert instrumentation.snapshot() == {}
+
+def test_enabled_times_sql_streaks_and_analysis(stats, tmp_path):
+    """Test 2: SQL statements, streak computations and analysis calls are counted, dumped as JSON."""
+    habits = create_sample_habits_and_completions()
+    with DatabaseStorage(str(tmp_path / "habits.db")) as storage:
+        for habit in habits:
+            habit.compute_streak()
+            storage.save_habit(habit)
+    longest_streak_of_all(habits)
+
+    snapshot = stats.snapshot()
+    assert snapshot["habit.compute_streak"]["count"] == 5
+    assert snapshot["db.save_habit"]["count"] == 5
+    assert snapshot["analysis.longest_streak_of_all"]["count"] == 1
+    assert any(name.startswith("sql: INSERT INTO habits") and s["count"] == 5 for name, s in snapshot.items())
+    assert sum(snapshot["habit.compute_streak"]["histogram_us"].values()) == 5
+
+    stats.dump_json(tmp_path / "stats.json")
+    assert json.loads((tmp_path / "stats.json").read_text()) == snapshot
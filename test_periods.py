@@ -0,0 +1,64 @@
+"""
+-----------------------------
+Unit Tests for periods module
+-----------------------------
+"""
+
+import sqlite3
+from datetime import date, timedelta
+from habit import Habit
+from periods import PERIODS, UNCHAINED, every_n_days, period_rule, streaks
+
+def test_bucket_edges_across_year_boundaries():
+    """Test 1: Week/ month/ N-day bucket ids are consecutive across years, incl. ISO week 53 -> week 1."""
+    weekly, monthly = PERIODS["weekly"], PERIODS["monthly"]
+    days = [date(1999, 12, 20) + timedelta(days=i) for i in range(365 * 30)]
+    for previous, following in zip(days, days[1:]):
+        step = weekly.bucket(following.toordinal()) - weekly.bucket(previous.toordinal())
+        assert step == (following.weekday() == 0)                   # New ISO week exactly on Mondays
+        step = monthly.bucket(following.toordinal()) - monthly.bucket(previous.toordinal())
+        assert step == (following.day == 1)
+    for d in days[::97]:
+        o = d.toordinal()
+        assert date.fromordinal(weekly.first_day(weekly.bucket(o))) == d - timedelta(days=d.weekday())
+        assert date.fromordinal(monthly.first_day(monthly.bucket(o))) == d.replace(day=1)
+    # 2020 and 2026 have 53 ISO weeks: week 52 -> 53 -> week 1 of the next year are consecutive buckets
+    for year in (2020, 2026):
+        weeks = [date.fromisocalendar(year, 52, 1), date.fromisocalendar(year, 53, 7), date(year + 1, 1, 4)]
+        assert [weekly.bucket(d.toordinal()) - weekly.bucket(weeks[0].toordinal()) for d in weeks] == [0, 1, 2]
+    three_days = every_n_days(3)
+    assert [three_days.bucket(date(2000, 1, d).toordinal()) for d in range(1, 10)] == [-1, -1, 0, 0, 0, 1, 1, 1, 2]
+    assert period_rule("yearly") is UNCHAINED
+
+def test_streak_rules_same_bucket_neutral():
+    """Test 2: Same-week completions keep weekly streaks, December/ January weeks and months continue them."""
+    assert streaks([]) == (0, 0)
+    assert streaks([5, 5, 6, 6, 6, 8, 9, 9]) == (2, 2)
+    assert streaks([1, 2, 3, 3, 7]) == (1, 3)
+
+    weekly = Habit("Swim", "Swim for 60min.", "weekly")
+    for d in [date(2026, 12, 21), date(2026, 12, 22), date(2026, 12, 29), date(2027, 1, 4), date(2027, 1, 10)]:
+        weekly.add_completion(d)                                    # ISO weeks 52, 52, 53, 1, 1
+        assert (weekly.current_streak, weekly.longest_streak) == \
+               streaks(PERIODS["weekly"].buckets(weekly.completion_ordinals()))
+    assert (weekly.current_streak, weekly.longest_streak) == (3, 3)
+    weekly.remove_completion(date(2026, 12, 29))
+    assert (weekly.current_streak, weekly.longest_streak) == (1, 1)
+    assert weekly.streak_on(date(2026, 12, 31)) == 1 and weekly.longest_streak_between(date(2026, 12, 20),
+                                                                                        date(2027, 1, 31)) == 1
+    monthly = Habit("Review", "Monthly review.", "monthly")
+    for d in [date(2025, 11, 30), date(2025, 12, 1), date(2025, 12, 31), date(2026, 1, 1), date(2026, 3, 1)]:
+        monthly.add_completion(d)
+    assert (monthly.current_streak, monthly.longest_streak) == (1, 3)
+    assert monthly.streak_on(date(2026, 2, 28)) == 3 and monthly.breaks_between(date(2026, 1, 1), date(2026, 12, 31)) == 1
+
+def test_sql_buckets_match_python_buckets():
+    """Test 3: SQLite bucket expressions (ordinal and ISO date text forms) equal Period.bucket() per day."""
+    connection = sqlite3.connect(":memory:")
+    days = [date(1999, 12, 20) + timedelta(days=i) for i in range(0, 365 * 30, 3)]
+    for rule in [*PERIODS.values(), every_n_days(10), UNCHAINED]:
+        expected = [rule.bucket(d.toordinal()) for d in days]
+        for iso_date in (None, ":d"):
+            sql = f"SELECT {rule.sql(':o', iso_date)}"
+            assert [connection.execute(sql, {"o": d.toordinal(), "d": d.isoformat()}).fetchone()[0]
+                    for d in days] == expected
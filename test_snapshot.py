@@ -0,0 +1,70 @@
+"""
+------------------------------
+Unit Tests for snapshot module
+------------------------------
+"""
+
+from datetime import date
+from bitmap import BitmapHabit
+from db import DatabaseStorage
+from habit import Habit
+from habit_manager import HabitManager
+from snapshot import load_manager, load_snapshot, save_snapshot, snapshot_path
+
+def _state(habits):
+    """Comparable state of habits: class, metadata, streak summary, loaded history."""
+    return [(type(h), h.habit_id, h.name, h.description, h.period, h.current_streak, h.longest_streak,
+             h.last_completed, h.completion_count, h.history_loaded, h.is_dirty,
+             list(h.completion_ordinals()) if h.history_loaded else None) for h in habits]
+
+def test_snapshot_round_trip(storage):
+    """Test 1: Restored habits equal the saved state without reading habits/ completions, edits keep it current."""
+    storage.save_habit(Habit("Stretch", "Stretch for 5min.", "daily"))
+    storage.encode_bitmaps([2])
+    manager = HabitManager(storage)
+    manager.habits = storage.load_all_habits()
+    manager.habits[0].completion_ordinals()     # Loaded histories are stored, others stay lazy
+    manager.habits[1].completion_ordinals()
+    assert save_snapshot(manager)
+    expected = _state(manager.habits)
+
+    statements = []
+    storage.connection.set_trace_callback(statements.append)
+    restored = load_snapshot(storage)
+    storage.connection.set_trace_callback(None)
+    assert _state(restored) == expected and isinstance(restored[1], BitmapHabit)
+    assert not any("habits" in s or "completions" in s for s in statements)
+    assert restored[2].completed_dates == manager.habits[2].completed_dates     # Lazy history from storage
+
+    manager = load_manager(storage)
+    manager.complete_habit(1)
+    manager.delete_habit(5)
+    assert save_snapshot(manager)                # Own writes keep the snapshot current
+    assert _state(load_manager(storage).habits) == _state(manager.habits)
+
+def test_snapshot_falls_back_when_outdated(storage):
+    """Test 2: Writes by other connections, other users, unsaved or damaged state never restore stale habits."""
+    db_name = storage.db_name
+    manager = load_manager(storage)
+    assert save_snapshot(manager) and load_snapshot(storage) is not None
+    assert load_snapshot(storage.for_user(7), snapshot_path(storage)) is None
+
+    with DatabaseStorage(db_name) as other:      # e.g. a `main.py complete` run meanwhile
+        habit = other.load_habit(3)
+        habit.add_completion(date(2026, 3, 16))
+        other.save_habit(habit)
+    assert load_snapshot(storage) is None
+    assert not save_snapshot(manager)            # Loaded before the other write
+    manager = load_manager(storage)              # Falls back to a full load
+    assert manager.get_habit(3).last_completed == date(2026, 3, 16)
+
+    manager.get_habit(1).add_completion(date(2026, 3, 16))
+    assert not save_snapshot(manager)            # Unsaved change
+    manager.storage.save_habit(manager.get_habit(1))
+    assert save_snapshot(manager)
+    path = snapshot_path(storage)
+    with open(path, "r+b") as file:
+        file.truncate(100)
+    assert load_snapshot(storage) is None
+    open(path, "wb").close()
+    assert load_snapshot(storage) is None
@@ -0,0 +1,40 @@
+"""
+-------------------------------
+Unit Tests for streaks module
+-------------------------------
+"""
+
+import random
+import pytest
+from datetime import date, timedelta
+from habit import Habit
+from periods import PERIODS, every_n_days
+from streaks import compute_habit_streaks
+
+def random_habit(rng, period):
+    """Habit with random completion history (mix of consecutive days, gaps, week and year boundaries)."""
+    habit = Habit("Habit", "Description", period)
+    day = date(2023, 12, 1) + timedelta(days=rng.randrange(60))
+    dates = []
+    for _ in range(rng.randrange(0, 80)):
+        dates.append(day)
+        day += timedelta(days=rng.choice([1, 1, 2, 3, 6, 7, 8, 14]))
+    habit.completed_dates = dates
+    return habit
+
+def test_vectorized_buckets_match_scalar_buckets():
+    """Test 1: Vectorized bucket ids equal Period.bucket() per date for every rule, across year boundaries."""
+    ordinals = [(date(1999, 12, 20) + timedelta(days=i)).toordinal() for i in range(800)]
+    for rule in [*PERIODS.values(), every_n_days(3)]:
+        assert rule.np_buckets(ordinals).tolist() == [rule.bucket(o) for o in ordinals]
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_streaks_match_compute_streak(seed):
+    """Test 2: Property test - batch engine gives identical streaks to scalar compute_streak() per habit."""
+    rng = random.Random(seed)
+    habits = [random_habit(rng, rng.choice(["daily", "weekly", "monthly"])) for _ in range(200)]
+    compute_habit_streaks(habits)
+    batch = [(h.current_streak, h.longest_streak) for h in habits]
+    for h in habits:
+        h.compute_streak()
+    assert batch == [(h.current_streak, h.longest_streak) for h in habits]
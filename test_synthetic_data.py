@@ -0,0 +1,31 @@
+"""
+-------------------------------------
+Unit Tests for synthetic_data module
+-------------------------------------
+"""
+
+import random
+import sqlite3
+from datetime import date
+from synthetic_data import generate_completions, generate_synthetic_db
+
+def test_generate_synthetic_db_is_reproducible(tmp_path):
+    """Test 1: Same seed writes identical databases with stored streak summaries."""
+    dumps = []
+    for name in ("a.db", "b.db"):
+        db_name = str(tmp_path / name)
+        rows = generate_synthetic_db(db_name, n_habits=20, years=1, seed=7, end=date(2026, 1, 1))
+        with sqlite3.connect(db_name) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0] == rows
+            assert conn.execute("SELECT SUM(completion_count) FROM habits").fetchone()[0] == rows
+            dumps.append(conn.execute("SELECT habit_id, completed_dates FROM completions ORDER BY 1, 2").fetchall())
+        conn.close()
+    assert dumps[0] == dumps[1]
+
+def test_generate_completions_density():
+    """Test 2: Completed share follows density, weekly habits complete at most once per week."""
+    rng = random.Random(1)
+    daily = generate_completions(rng, "daily", date(2020, 1, 1), date(2025, 12, 31), density=0.6, pattern="uniform")
+    assert 0.55 < len(daily) / 2192 < 0.65
+    weekly = generate_completions(rng, "weekly", date(2020, 1, 1), date(2025, 12, 31), density=1.0)
+    assert len(weekly) == 314